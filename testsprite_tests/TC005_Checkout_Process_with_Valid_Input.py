@@ -1,15 +1,19 @@
 import unittest
-from unittest.mock import patch, MagicMock
+
+import pytest
+
+# /api/checkout has no route in app/api: this checks harness.stub_backend's checkout contract, not the app
+pytestmark = pytest.mark.stub_contract
+
 
 class TestCheckoutProcessWithValidInput(unittest.TestCase):
-    @patch('requests.post')
-    def test_checkout_process_with_valid_input(self, mock_post):
-        # Mock the checkout API response to simulate a successful checkout completion
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"orderId": "12345", "status": "success", "message": "Order placed successfully"}
-        mock_post.return_value = mock_response
+    @pytest.fixture(autouse=True)
+    def _use_stub_backend(self, api, stub_server):
+        # Pooled session against the local stand-in for the app's API routes
+        self.api = api
+        self.backend = stub_server.backend
 
+    def test_checkout_process_with_valid_input(self):
         # Sample valid payment and shipping details payload
         checkout_payload = {
             "payment": {
@@ -33,16 +37,9 @@ class TestCheckoutProcessWithValidInput(unittest.TestCase):
                 {"productId": "stroller-002", "quantity": 2}
             ]
         }
+        stock_before = {pid: self.backend.products[pid]["stockQuantity"] for pid in ("stroller-001", "stroller-002")}
 
-        # The base URL for the checkout endpoint
-        endpoint = "http://localhost:8080/api/checkout"
-
-        # Perform the mocked POST request
-        import requests
-        response = requests.post(endpoint, json=checkout_payload, timeout=30)
-
-        # Assert that the mocked post was called with the correct parameters
-        mock_post.assert_called_once_with(endpoint, json=checkout_payload, timeout=30)
+        response = self.api.post("/api/checkout", json=checkout_payload)
 
         # Validate the response status code and content
         self.assertEqual(response.status_code, 200)
@@ -51,12 +48,14 @@ class TestCheckoutProcessWithValidInput(unittest.TestCase):
         self.assertEqual(data["status"], "success")
         self.assertEqual(data["message"], "Order placed successfully")
 
-        # Since backend is not available, focus on client-side success states
-        # Simulating UI success message rendering check (mock)
-        ui_success_message = "Thank you for your order! Your order ID is 12345."
-        expected_message = f"Thank you for your order! Your order ID is {data['orderId']}."
-        self.assertEqual(ui_success_message, expected_message)
+        # The order exists as pending and stock was decremented per cart line
+        order = self.backend.orders[data["orderId"]]
+        self.assertEqual(order["status"], "pending")
+        self.assertEqual(order["total_amount"], round(999.99 + 2 * 549.5, 2))
+        for line in checkout_payload["cart"]:
+            pid = line["productId"]
+            self.assertEqual(self.backend.products[pid]["stockQuantity"], stock_before[pid] - line["quantity"])
+
 
-# Execute the test
-test = TestCheckoutProcessWithValidInput()
-test.test_checkout_process_with_valid_input()
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -1,10 +1,11 @@
 from unittest.mock import patch
-import requests
 
 BASE_URL = "http://localhost:8080"
 
 @patch("requests.post")
 def test_user_registration_happy_path(mock_post):
+    import requests
+
     # Arrange
     registration_endpoint = f"{BASE_URL}/api/register"
     registration_payload = {
@@ -28,4 +29,8 @@ def test_user_registration_happy_path(mock_post):
     assert json_resp["message"] == "Registration successful"
     assert "userId" in json_resp and isinstance(json_resp["userId"], str)
 
-test_user_registration_happy_path()
+
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main([__file__, "-q"]))
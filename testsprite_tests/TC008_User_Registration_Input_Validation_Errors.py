@@ -1,59 +1,57 @@
-from playwright.sync_api import sync_playwright, Route, Request
+from __future__ import annotations
 
-def test_user_registration_input_validation_errors():
-    base_url = "http://localhost:8080"
-    
-    def mock_api_response(route: Route, request: Request):
-        # Always return a dummy 200 OK response with empty json for any API call
-        route.fulfill(status=200, content_type="application/json", body='{}')
+from typing import TYPE_CHECKING
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        context = browser.new_context()
-        page = context.new_page()
+from harness.config import BASE_URL
+from harness.routing import json_handler, route_api
 
-        # Intercept all network requests and mock responses
-        page.route("**/*", mock_api_response)
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
 
-        # Navigate to the registration page
-        page.goto(f"{base_url}/register")
 
-        # Attempt to submit empty registration form to trigger validation errors
-        submit_button_selector = "button[type=submit]"
-        page.click(submit_button_selector)
+def test_user_registration_input_validation_errors(page: Page):
+    # Always return a dummy 200 OK response with empty json for any API call
+    route_api(page, json_handler({}))
 
-        # Verify validation errors appear for required fields
-        # Common registration fields: username, email, password, confirm password
-        # Checking for visible validation error texts or error indicators
+    # Navigate to the registration page
+    page.goto(f"{BASE_URL}/register")
 
-        # Check username validation error
-        assert page.locator("text=Username is required").is_visible() or page.locator("[aria-invalid='true'][name='username']").is_visible()
+    # Attempt to submit empty registration form to trigger validation errors
+    submit_button_selector = "button[type=submit]"
+    page.click(submit_button_selector)
 
-        # Check email validation error
-        assert page.locator("text=Email is required").is_visible() or page.locator("[aria-invalid='true'][name='email']").is_visible()
+    # Verify validation errors appear for required fields
+    # Common registration fields: username, email, password, confirm password
+    # Checking for visible validation error texts or error indicators
 
-        # Check password validation error
-        assert page.locator("text=Password is required").is_visible() or page.locator("[aria-invalid='true'][name='password']").is_visible()
+    # Check username validation error
+    assert page.locator("text=Username is required").is_visible() or page.locator("[aria-invalid='true'][name='username']").is_visible()
 
-        # Check confirm password validation error
-        assert page.locator("text=Confirm password is required").is_visible() or page.locator("[aria-invalid='true'][name='confirmPassword']").is_visible()
+    # Check email validation error
+    assert page.locator("text=Email is required").is_visible() or page.locator("[aria-invalid='true'][name='email']").is_visible()
 
-        # Now fill invalid email and mismatched passwords to test other validation errors
-        page.fill("input[name='username']", "testuser")
-        page.fill("input[name='email']", "invalidemail")
-        page.fill("input[name='password']", "password1")
-        page.fill("input[name='confirmPassword']", "password2")
-        page.click(submit_button_selector)
+    # Check password validation error
+    assert page.locator("text=Password is required").is_visible() or page.locator("[aria-invalid='true'][name='password']").is_visible()
 
-        # Email format validation error
-        assert page.locator("text=Invalid email address").is_visible() or page.locator("[aria-invalid='true'][name='email']").is_visible()
+    # Check confirm password validation error
+    assert page.locator("text=Confirm password is required").is_visible() or page.locator("[aria-invalid='true'][name='confirmPassword']").is_visible()
 
-        # Password mismatch validation error
-        mismatch_error_text = page.locator("text=Passwords do not match")
-        assert mismatch_error_text.is_visible()
+    # Now fill invalid email and mismatched passwords to test other validation errors
+    page.fill("input[name='username']", "testuser")
+    page.fill("input[name='email']", "invalidemail")
+    page.fill("input[name='password']", "password1")
+    page.fill("input[name='confirmPassword']", "password2")
+    page.click(submit_button_selector)
 
-        # Close context and browser
-        context.close()
-        browser.close()
+    # Email format validation error
+    assert page.locator("text=Invalid email address").is_visible() or page.locator("[aria-invalid='true'][name='email']").is_visible()
 
-test_user_registration_input_validation_errors()
\ No newline at end of file
+    # Password mismatch validation error
+    mismatch_error_text = page.locator("text=Passwords do not match")
+    assert mismatch_error_text.is_visible()
+
+
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -1,42 +1,34 @@
 import unittest
-from unittest.mock import patch
-import requests
 
-BASE_URL = "http://localhost:8080"
+import pytest
+
+from harness.fixtures import CUSTOMER_CREDENTIALS
+
+# the stand-in's own sb-access-token cookie: this checks harness.stub_backend's login contract, not the app
+pytestmark = pytest.mark.stub_contract
 
 
 class TestUserLoginSuccess(unittest.TestCase):
-    @patch('requests.post')
-    def test_user_login_success(self, mock_post):
-        # Mocked successful login response
-        mock_response = unittest.mock.Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "token": "dummy_jwt_token",
-            "user": {
-                "id": "user-123",
-                "email": "registereduser@example.com",
-                "name": "Registered User"
-            }
-        }
-        mock_post.return_value = mock_response
+    @pytest.fixture(autouse=True)
+    def _use_stub_backend(self, api):
+        self.api = api
 
-        login_url = f"{BASE_URL}/api/login"
+    def test_user_login_success(self):
+        import requests
+
+        # Storefront login is a Supabase password grant; the stub backend stands in for GoTrue
+        login_url = "/auth/v1/token?grant_type=password"
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
-        payload = {
-            "email": "registereduser@example.com",
-            "password": "ValidPassword123!"
-        }
+        payload = dict(CUSTOMER_CREDENTIALS)
 
         try:
-            response = requests.post(
+            response = self.api.post(
                 login_url,
                 json=payload,
                 headers=headers,
-                timeout=30
             )
         except requests.RequestException as e:
             self.fail(f"Network request failed unexpectedly: {e}")
@@ -44,10 +36,13 @@ class TestUserLoginSuccess(unittest.TestCase):
         # Assertions to verify login success flow
         self.assertEqual(response.status_code, 200)
         response_data = response.json()
-        self.assertIn("token", response_data)
+        self.assertIn("access_token", response_data)
         self.assertIn("user", response_data)
         self.assertEqual(response_data["user"]["email"], payload["email"])
 
+        # The issued token authenticates follow-up requests
+        self.assertIn("sb-access-token", self.api.cookies)
+
 
-test = TestUserLoginSuccess()
-test.test_user_login_success()
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
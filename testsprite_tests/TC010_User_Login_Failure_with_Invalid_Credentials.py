@@ -1,10 +1,11 @@
-import requests
 from unittest.mock import patch, Mock
-from requests.exceptions import RequestException
 
 BASE_URL = "http://localhost:8080"
 
 def test_user_login_failure_with_invalid_credentials():
+    import requests
+    from requests.exceptions import RequestException
+
     login_url = f"{BASE_URL}/api/auth/login"
     invalid_payload = {
         "email": "invaliduser@example.com",
@@ -40,4 +41,7 @@ def test_user_login_failure_with_invalid_credentials():
         assert resp_json["error"] == "Invalid credentials"
 
 
-test_user_login_failure_with_invalid_credentials()
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -1,98 +1,63 @@
-from unittest.mock import patch, MagicMock
+from __future__ import annotations
 
-# Simulate a frontend test verifying UI rendering and client-side states by mocking API calls
+from typing import TYPE_CHECKING
 
-def test_admin_dashboard_order_management_mock():
-    """
-    Test Case TC012: Admin Dashboard Order Management
-
-    This test mocks backend API responses to verify that an admin user can view and update orders 
-    efficiently with no unauthorized access and that the UI reflects success states properly.
-    """
-
-    # Mock data representing a successful order list fetch and order update
-    dummy_orders_response = {
-        "orders": [
-            {
-                "id": "order123",
-                "status": "pending",
-                "items": [
-                    {"productId": "prod1", "quantity": 2},
-                    {"productId": "prod2", "quantity": 1}
-                ],
-                "total": 299.99
-            },
-            {
-                "id": "order456",
-                "status": "shipped",
-                "items": [
-                    {"productId": "prod3", "quantity": 1}
-                ],
-                "total": 149.99
-            }
-        ]
-    }
-
-    dummy_update_order_response = {
-        "id": "order123",
-        "status": "completed",
-        "items": [
-            {"productId": "prod1", "quantity": 2},
-            {"productId": "prod2", "quantity": 1}
-        ],
-        "total": 299.99
-    }
-
-    # Mock function to replace the GET request for fetching orders
-    def mock_get_orders(*args, **kwargs):
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_resp.json.return_value = dummy_orders_response
-        return mock_resp
-
-    # Mock function to replace the PUT request for updating an order
-    def mock_put_order(*args, **kwargs):
-        mock_resp = MagicMock()
-        mock_resp.status_code = 200
-        mock_resp.json.return_value = dummy_update_order_response
-        return mock_resp
+from harness.fixtures import ADMIN_CREDENTIALS
 
-    # Assuming the frontend calls requests.get and requests.put to interact with backend APIs,
-    # we patch these calls here to provide mock responses.
+if TYPE_CHECKING:
+    from harness.api_client import ApiSession
 
-    import requests
 
-    with patch('requests.get', side_effect=mock_get_orders) as mock_get, \
-         patch('requests.put', side_effect=mock_put_order) as mock_put:
-
-        # Simulate admin user fetching order list
-        response = requests.get("http://localhost:8080/admin/orders", timeout=30)
-        assert response.status_code == 200
-        orders_data = response.json()
-        assert "orders" in orders_data
-        assert isinstance(orders_data["orders"], list)
-        assert len(orders_data["orders"]) > 0
-
-        # Validate UI would render these orders (simulation)
-        for order in orders_data["orders"]:
-            assert "id" in order
-            assert "status" in order
-            assert "items" in order
-            assert "total" in order
-
-        # Simulate admin user updating an order status
-        update_payload = {"status": "completed"}
-        response_update = requests.put("http://localhost:8080/admin/orders/order123", json=update_payload, timeout=30)
-        assert response_update.status_code == 200
-        updated_order = response_update.json()
-        assert updated_order["id"] == "order123"
-        assert updated_order["status"] == "completed"
-
-        # Simulate UI success feedback based on mocked response
-        assert updated_order["status"] == update_payload["status"]
+def test_admin_dashboard_order_management(api: ApiSession):
+    """
+    Test Case TC012: Admin Dashboard Order Management
 
-        # Verify the mocks were called as expected
-        mock_get.assert_called_once_with("http://localhost:8080/admin/orders", timeout=30)
-        mock_put.assert_called_once_with("http://localhost:8080/admin/orders/order123", json=update_payload, timeout=30)
+    Verifies against the local stub backend that an admin user can view and update orders,
+    that status changes follow the allowed transitions, and that the change is persisted.
+    """
 
-test_admin_dashboard_order_management_mock()
\ No newline at end of file
+    # Admin login sets the session cookie used by the /api/admin routes
+    login = api.post("/api/admin/login", json=ADMIN_CREDENTIALS)
+    assert login.status_code == 200
+    assert login.json()["user"]["role"] == "admin"
+
+    # Admin user fetching order list
+    response = api.get("/api/admin/orders", params={"page": 1, "pageSize": 25})
+    assert response.status_code == 200
+    orders_data = response.json()
+    assert "rows" in orders_data
+    assert isinstance(orders_data["rows"], list)
+    assert len(orders_data["rows"]) > 0
+    assert orders_data["total"] >= len(orders_data["rows"])
+
+    # Validate UI would render these orders
+    for order in orders_data["rows"]:
+        assert "id" in order
+        assert "status" in order
+        assert "items" in order
+        assert "total_amount" in order
+
+    # Filtering by status only returns matching orders
+    pending = api.get("/api/admin/orders", params={"status": "pending"}).json()["rows"]
+    assert pending and all(order["status"] == "pending" for order in pending)
+    order_id = pending[0]["id"]
+
+    # Admin user moving a pending order to processing
+    update_payload = {"status": "processing"}
+    response_update = api.patch(f"/api/admin/orders/{order_id}", json=update_payload)
+    assert response_update.status_code == 200
+    updated_order = response_update.json()["order"]
+    assert updated_order["id"] == order_id
+    assert updated_order["status"] == update_payload["status"]
+
+    # The change is persisted, and invalid transitions are rejected
+    assert api.get(f"/api/admin/orders/{order_id}").json()["status"] == "processing"
+    rejected = api.patch(f"/api/admin/orders/{order_id}", json={"status": "pending"})
+    assert rejected.status_code == 400
+    assert "shipped" in rejected.json()["allowed"]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main([__file__, "-q"]))
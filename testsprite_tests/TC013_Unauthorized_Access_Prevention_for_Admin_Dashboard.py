@@ -1,39 +1,47 @@
 import unittest
-from unittest.mock import patch, MagicMock
+
+import pytest
+
+from harness.fixtures import CUSTOMER_CREDENTIALS
+
 
 class TestUnauthorizedAccessAdminDashboard(unittest.TestCase):
-    @patch('requests.get')
-    def test_unauthorized_access_prevention_for_admin_dashboard(self, mock_get):
-        # Mock the GET request to the Admin Dashboard endpoint to simulate a 403 Forbidden for non-admin user
-        mock_response_forbidden = MagicMock()
-        mock_response_forbidden.status_code = 403
-        mock_response_forbidden.json.return_value = {"error": "Access denied: admin only"}
-        
-        # Mock a 200 response as dummy success for all API calls per instructions (though backend is not real)
-        mock_response_ok = MagicMock()
-        mock_response_ok.status_code = 200
-        mock_response_ok.json.return_value = {"message": "Success"}
-
-        # Setup mock to return 403 for Admin Dashboard access by non-admin user
-        mock_get.return_value = mock_response_forbidden
-        
-        import requests
+    @pytest.fixture(autouse=True)
+    def _use_stub_backend(self, api):
+        self.api = api
 
-        base_url = "http://localhost:8080"
-        admin_dashboard_url = f"{base_url}/admin/dashboard"
+    def test_unauthorized_access_prevention_for_admin_dashboard(self):
+        import requests
 
         try:
-            # Attempt to access Admin Dashboard as non-admin
-            response = requests.get(admin_dashboard_url, timeout=30)
-            # Assert that the response status code indicates forbidden access (simulate client side block)
-            self.assertEqual(response.status_code, 403)
-            self.assertIn("Access denied", response.json().get("error", ""))
+            # Anonymous requests to admin APIs are rejected outright
+            response = self.api.get("/api/admin/stats")
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json().get("error"), "Unauthorized")
+
+            # Anonymous visits to the dashboard are redirected to the admin login
+            page = self.api.get("/admin/dashboard", allow_redirects=False)
+            self.assertIn(page.status_code, (302, 307))
+            self.assertEqual(page.headers["Location"], "/admin/login")
+
+            # A signed-in customer is authenticated but not authorized
+            login = self.api.post("/auth/v1/token?grant_type=password", json=CUSTOMER_CREDENTIALS)
+            self.assertEqual(login.status_code, 200)
+
+            for path in ("/api/admin/stats", "/api/admin/orders", "/api/admin/products"):
+                response = self.api.get(path)
+                self.assertEqual(response.status_code, 403, path)
+                self.assertEqual(response.json().get("error"), "Forbidden")
+
+            # The customer cannot use the admin login either
+            admin_login = self.api.post("/api/admin/login", json=CUSTOMER_CREDENTIALS)
+            self.assertEqual(admin_login.status_code, 403)
+
+            page = self.api.get("/admin/dashboard", allow_redirects=False)
+            self.assertEqual(page.headers["Location"], "/")
         except requests.RequestException as e:
             self.fail(f"RequestException occurred: {e}")
 
-        # Now simulate the UI behavior assuming frontend received a "forbidden" response:
-        # With no backend, we assume UI blocks UI rendering or redirects on forbidden.
-        # Since direct UI testing is not possible here, we assert mock was called correctly.
-        mock_get.assert_called_with(admin_dashboard_url, timeout=30)
 
-unittest.main(argv=[''], exit=False)
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -1,58 +1,63 @@
-from unittest.mock import patch, MagicMock
+from __future__ import annotations
 
+from typing import TYPE_CHECKING
 
-def test_local_development_environment_setup_verification():
-    """
-    Validate that the local development environment can be set up, built,
-    and deployed successfully using provided instructions and tooling.
-    Since backend is not available, all API/network requests are mocked to
-    return dummy successful 200 responses to verify client-side rendering and navigation.
-    """
-
-    # Mock responses for all network calls that the frontend may make during navigation and rendering.
-    dummy_response = MagicMock()
-    dummy_response.status_code = 200
-    dummy_response.json.return_value = {}
-
-    # Patch 'requests.get' and 'requests.post' to simulate successful API calls.
-    with patch("requests.get", return_value=dummy_response) as mock_get, \
-         patch("requests.post", return_value=dummy_response) as mock_post:
-
-        # Simulate environment setup verification steps
-        # Since this is a UI and local env setup verification without backend,
-        # Here we simulate visiting pages and verify the mock calls succeed and UI can be rendered.
-
-        # Example: simulate Home Page 'API' call
-        resp_home = mock_get("http://localhost:8080/api/home")
-        assert resp_home.status_code == 200
+import pytest
 
-        # Simulate Shop Page API call
-        resp_shop = mock_get("http://localhost:8080/api/shop")
-        assert resp_shop.status_code == 200
+from harness.fixtures import ADMIN_CREDENTIALS, CUSTOMER_CREDENTIALS
 
-        # Simulate Product Details Page API call
-        resp_product = mock_get("http://localhost:8080/api/product/1")
-        assert resp_product.status_code == 200
+if TYPE_CHECKING:
+    from harness.api_client import ApiSession
 
-        # Simulate Cart actions API call
-        resp_cart = mock_get("http://localhost:8080/api/cart")
-        assert resp_cart.status_code == 200
+# /api/health, /api/cart and /api/checkout have no route in app/api: this checks harness.stub_backend, not the app
+pytestmark = pytest.mark.stub_contract
 
-        # Simulate Checkout API call
-        resp_checkout = mock_post("http://localhost:8080/api/checkout", json={"payment": "valid"})
-        assert resp_checkout.status_code == 200
-
-        # Simulate User Login API call
-        resp_login = mock_post("http://localhost:8080/api/login", json={"username": "user", "password": "pass"})
-        assert resp_login.status_code == 200
-
-        # Simulate Admin Dashboard API call
-        resp_admin = mock_get("http://localhost:8080/api/admin/dashboard")
-        assert resp_admin.status_code == 200
-
-        # Verify that mocked methods were called expected number of times at least once
-        assert mock_get.call_count >= 5
-        assert mock_post.call_count >= 2
 
+def test_local_development_environment_setup_verification(api: ApiSession):
+    """
+    Validate that the local test stack comes up and every API surface the suite relies on
+    answers through one pooled session: storefront checkout, customer and admin login,
+    and the admin dashboard data routes.
+    """
 
-test_local_development_environment_setup_verification()
+    # The stand-in backend is up
+    resp_health = api.get("/api/health")
+    assert resp_health.status_code == 200
+    assert resp_health.json()["status"] == "ok"
+
+    # Cart and checkout
+    resp_cart = api.get("/api/cart")
+    assert resp_cart.status_code == 200
+
+    resp_checkout = api.post("/api/checkout", json={
+        "payment": {"cardNumber": "4111111111111111"},
+        "shipping": {
+            "fullName": "Dev Check",
+            "addressLine1": "1 Local St",
+            "city": "Cairo",
+            "postalCode": "11511",
+            "country": "EG",
+            "phoneNumber": "0100000000",
+        },
+        "cart": [{"productId": "feeding-001", "quantity": 1}],
+    })
+    assert resp_checkout.status_code == 200
+
+    # Customer login
+    resp_login = api.post("/auth/v1/token?grant_type=password", json=CUSTOMER_CREDENTIALS)
+    assert resp_login.status_code == 200
+
+    # Admin login and dashboard data
+    resp_admin_login = api.post("/api/admin/login", json=ADMIN_CREDENTIALS)
+    assert resp_admin_login.status_code == 200
+    for path in ("/api/admin/stats", "/api/admin/orders", "/api/admin/products"):
+        resp_admin = api.get(path)
+        assert resp_admin.status_code == 200, path
+
+    stats = api.get("/api/admin/stats").json()
+    assert stats["orders_today_count"] >= 1
+    assert len(stats["orders_last_7_days"]) == 7
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -1,104 +1,122 @@
+from __future__ import annotations
+
 import asyncio
-from playwright.async_api import async_playwright, Route, Request
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from harness.a11y import scan_accessibility_async
+from harness.artifacts import ArtifactStore, AsyncContextCapture
+from harness.browser_pool import AsyncBrowserPool
+from harness.config import AXE_ENABLED, BASE_URL
+from harness.layout import set_viewport_and_settle_async, wait_for_layout_settle_async
+from harness.matrix import Target
+from harness.routing import async_json_handler, route_api_async
 
-BASE_URL = "http://localhost:8080"
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
 
 
-async def test_ui_responsiveness_and_accessibility_compliance():
+def test_ui_responsiveness_and_accessibility_compliance(
+    async_browser_pool: AsyncBrowserPool, artifact_store: Optional[ArtifactStore], browser_target: Target
+):
     """
     Verify that UI components across pages are responsive and meet accessibility standards.
     All network requests are mocked to return successful dummy 200 responses.
     """
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            viewport={"width": 1280, "height": 720},
-            color_scheme="light",
-            locale="en-US",
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                       "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
-        )
-
-        page = await context.new_page()
-
-        async def route_all_requests(route: Route, request: Request):
-            # Mock all API network requests with a 200 dummy response.
-            if request.method in ("GET", "POST", "PUT", "DELETE", "PATCH"):
-                # Return an empty JSON object as dummy data
-                await route.fulfill(
-                    status=200,
-                    content_type="application/json",
-                    body='{}'
-                )
-            else:
-                await route.continue_()
-
-        # Intercept all requests to mock API calls.
-        await page.route("**/*", route_all_requests)
-
-        # List of key pages to visit according to PRD to verify responsiveness and accessibility
-        pages_to_test = [
-            "/",                 # Home Page
-            "/shop",             # Shop Page
-            "/product/1",        # Product Details Page (using dummy id)
-            "/cart",             # Cart Page
-            "/checkout",         # Checkout Page
-            "/login",            # Login Page
-            "/register",         # Register Page
-            "/admin/dashboard",  # Admin Dashboard
-        ]
-
-        for path in pages_to_test:
-            await page.goto(f"{BASE_URL}{path}", timeout=30000)
-            # Wait for network idle to ensure UI is fully loaded with mocked responses
-            await page.wait_for_load_state("networkidle")
-
-            # Check viewport responsiveness by asserting width and height of viewport
-            viewport_size = page.viewport_size
-            assert viewport_size is not None, f"Viewport size is None on {path}"
-            assert viewport_size["width"] >= 320, f"Viewport width is too small on {path}"
-            assert viewport_size["height"] >= 480, f"Viewport height is too small on {path}"
-
-            # Basic accessibility checks:
-            # 1. Check that main landmarks (role="main") exists
-            main = await page.locator('[role="main"]').first
-            main_count = await main.count()
-            assert main_count > 0, f"Main landmark not found on {path}"
-
-            # 2. Check that all images have alt attributes for accessibility
-            images = page.locator('img')
-            images_count = await images.count()
-            for i in range(images_count):
-                alt = await images.nth(i).get_attribute('alt')
-                assert alt is not None and alt.strip() != "", f"Image at index {i} missing alt attribute on {path}"
-
-            # 3. Check that all buttons and links have discernible text
-            buttons = page.locator('button')
-            for i in range(await buttons.count()):
-                btn_text = (await buttons.nth(i).inner_text()).strip()
-                assert btn_text != "", f"Button at index {i} has no text on {path}"
-
-            links = page.locator('a')
-            for i in range(await links.count()):
-                link_text = (await links.nth(i).inner_text()).strip()
-                assert link_text != "", f"Link at index {i} has no text on {path}"
-
-            # 4. Run built-in accessibility snapshot (Lightweight check)
-            snapshot = await page.accessibility.snapshot()
-            assert snapshot, f"Accessibility snapshot failed or empty on {path}"
-
-            # 5. Check UI responsiveness at different viewport widths
-            for width in [320, 768, 1024, 1280]:
-                await page.set_viewport_size({"width": width, "height": 720})
-                # Wait a moment for layout adjustments
-                await asyncio.sleep(0.5)
-                # Check that main content is visible after resize
-                visible_main = await main.is_visible()
-                assert visible_main, f"Main content not visible at viewport width {width} on {path}"
-
-        await context.close()
-        await browser.close()
-
-
-asyncio.run(test_ui_responsiveness_and_accessibility_compliance())
\ No newline at end of file
+    async_browser_pool.run(check_responsiveness_and_accessibility(async_browser_pool, artifact_store, browser_target))
+
+
+# List of key pages to visit according to PRD to verify responsiveness and accessibility
+PAGES_TO_TEST = [
+    "/",                 # Home Page
+    "/shop",             # Shop Page
+    "/product/1",        # Product Details Page (using dummy id)
+    "/cart",             # Cart Page
+    "/checkout",         # Checkout Page
+    "/login",            # Login Page
+    "/register",         # Register Page
+    "/admin/dashboard",  # Admin Dashboard
+]
+
+# Swept on the plain desktop target only; a device target keeps its own viewport
+VIEWPORT_WIDTHS = [320, 768, 1024, 1280]
+
+# Pages are checked in parallel, each in its own context; this bounds how many
+# are open at once so the dev server is not flooded with cold compiles.
+PAGE_CONCURRENCY = 4
+
+CONTEXT_OPTIONS = dict(
+    color_scheme="light",
+    locale="en-US",
+)
+
+# Used when the target has no device descriptor
+DESKTOP_OPTIONS = dict(
+    viewport={"width": 1280, "height": 720},
+    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+               "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+)
+
+
+async def check_responsiveness_and_accessibility(
+    pool: AsyncBrowserPool, store: Optional[ArtifactStore] = None, target: Optional[Target] = None
+):
+    # A device descriptor (viewport, user agent, touch) replaces the desktop viewport and UA
+    browser, device = await pool.target(target or Target())
+    options = {**CONTEXT_OPTIONS, **(device or DESKTOP_OPTIONS)}
+    widths = () if device else VIEWPORT_WIDTHS
+    slots = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+    async def check(path: str):
+        async with slots:
+            # trace/HAR/screenshots are kept per failing page when artifacts are enabled
+            async with AsyncContextCapture(store, f"TC015{path}").open(browser, **options) as context:
+                await check_page(context, path, widths)
+
+    results = await asyncio.gather(*(check(path) for path in PAGES_TO_TEST), return_exceptions=True)
+    failures = [f"{path}: {result}" for path, result in zip(PAGES_TO_TEST, results) if isinstance(result, BaseException)]
+    assert not failures, "Responsiveness/accessibility failures:\n" + "\n".join(failures)
+
+
+async def check_page(context: BrowserContext, path: str, widths: Sequence[int] = VIEWPORT_WIDTHS):
+    page = await context.new_page()
+
+    # Mock API network requests with a 200 dummy response (an empty JSON object);
+    # pages and their assets are served by the app itself.
+    await route_api_async(page, async_json_handler({}))
+
+    await page.goto(f"{BASE_URL}{path}", timeout=30000)
+    # API calls are answered in-process, so once the DOM stops changing the UI is fully rendered
+    await wait_for_layout_settle_async(page)
+
+    # Check viewport responsiveness by asserting width and height of viewport
+    viewport_size = page.viewport_size
+    assert viewport_size is not None, f"Viewport size is None on {path}"
+    if widths:  # a device's own viewport can be smaller, e.g. a phone in landscape
+        assert viewport_size["width"] >= 320, f"Viewport width is too small on {path}"
+        assert viewport_size["height"] >= 480, f"Viewport height is too small on {path}"
+
+    # Basic accessibility checks, gathered in one in-page pass:
+    # 1. a main landmark exists, 2. every image has alt text,
+    # 3. every button and link has a discernible (accessible) name
+    report = await scan_accessibility_async(page, axe=AXE_ENABLED)
+    assert not report.violations, report.summary()
+    main = page.locator('main, [role="main"]').first
+
+    # 4. Run built-in accessibility snapshot (Lightweight check)
+    snapshot = await page.accessibility.snapshot()
+    assert snapshot, f"Accessibility snapshot failed or empty on {path}"
+
+    # 5. Check UI responsiveness at different viewport widths (at the device's own viewport on a device)
+    assert await main.is_visible(), f"Main content not visible at {viewport_size['width']}px on {path}"
+    for width in widths:
+        # Wait for the layout to stop reflowing rather than a fixed delay
+        await set_viewport_and_settle_async(page, width, 720)
+        # Check that main content is visible after resize
+        visible_main = await main.is_visible()
+        assert visible_main, f"Main content not visible at viewport width {width} on {path}"
+
+
+if __name__ == "__main__":
+    import pytest
+
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,183 @@
+"""Pytest fixtures shared by the TC* cases.
+
+Browsers are session-scoped (one per engine per worker process); contexts
+and pages are created fresh for every test so cases stay isolated. With a
+browser/device matrix (``harness.matrix``) every browser case is
+parametrized over ``browser_target``, and with ``--throttle`` every
+``page`` case over ``throttle_profile`` (``harness.throttle``).
+"""
+import pytest
+
+from harness.artifacts import ArtifactStore, ContextCapture
+from harness.browser_pool import AsyncBrowserPool, BrowserPool, headless_from_env
+from harness.config import ARTIFACTS_ENABLED, PROFILE_MODE
+from harness.fixtures import default_mock_api
+from harness.matrix import DEFAULT_TARGET, targets_from_env
+from harness.stub_server import StubServer
+from harness.throttle import apply_throttle, parse_profile, profiles_from_env, supports_throttling
+
+FAILED_KEY = pytest.StashKey[bool]()
+
+
+@pytest.fixture(scope="session")
+def browser_pool():
+    pool = BrowserPool(headless=headless_from_env())
+    yield pool
+    pool.close()
+
+
+def pytest_generate_tests(metafunc):
+    targets = targets_from_env()
+    if targets and "browser_target" in metafunc.fixturenames:
+        metafunc.parametrize("browser_target", targets, ids=[t.id for t in targets])
+    profiles = profiles_from_env()
+    if profiles and "throttle_profile" in metafunc.fixturenames:
+        metafunc.parametrize("throttle_profile", profiles, ids=profiles)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "throttle(profile): run the test's page under a harness.throttle profile")
+    config.addinivalue_line(
+        "markers", "stub_contract: checks harness.stub_backend routes that have no counterpart in app/api"
+    )
+    if PROFILE_MODE:
+        from harness.profiler import PYTHON_MODE, StepProfiler
+
+        config.pluginmanager.register(StepProfiler(python=PROFILE_MODE == PYTHON_MODE), "testsprite-step-profiler")
+
+
+@pytest.fixture
+def browser_target():
+    """Engine and device to run on; parametrized when a matrix is configured."""
+    return DEFAULT_TARGET
+
+
+@pytest.fixture
+def browser(browser_pool, browser_target):
+    return browser_pool.target(browser_target)[0]
+
+
+@pytest.fixture
+def device_options(browser_pool, browser_target):
+    """``new_context`` options of the target's device descriptor (empty without a device)."""
+    return browser_pool.target(browser_target)[1]
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if outcome.get_result().failed:
+        item.stash[FAILED_KEY] = True
+
+
+@pytest.fixture(scope="session")
+def artifact_store():
+    """Where failing tests leave trace/HAR/screenshots; ``None`` unless TESTSPRITE_ARTIFACTS is set."""
+    return ArtifactStore() if ARTIFACTS_ENABLED else None
+
+
+@pytest.fixture
+def context(browser, device_options, artifact_store, request):
+    capture = ContextCapture(artifact_store, request.node.nodeid)
+    context = browser.new_context(**device_options, **capture.context_options())
+    capture.start(context)
+    yield context
+    capture.finish(context, failed=request.node.stash.get(FAILED_KEY, False))
+
+
+@pytest.fixture
+def throttle_profile(request):
+    """Throttle spec for ``page``: the test's ``throttle`` marker, unless ``--throttle`` parametrizes it."""
+    marker = request.node.get_closest_marker("throttle")
+    return marker.args[0] if marker else None
+
+
+@pytest.fixture
+def page(context, throttle_profile):
+    page = context.new_page()
+    if throttle_profile is None:
+        yield page
+        return
+    if not supports_throttling(page):
+        pytest.skip(f"throttle profile {throttle_profile} needs Chromium (CDP)")
+    session = apply_throttle(page, parse_profile(throttle_profile))
+    yield page
+    session.detach()
+
+
+@pytest.fixture(scope="session")
+def auth_states():
+    """Signed-in storage state per role (admin, customer, anonymous), shared by all shards."""
+    from harness.auth_state import AuthStates
+
+    return AuthStates()
+
+
+@pytest.fixture
+def role_context(browser, device_options, auth_states, artifact_store, request):
+    """Factory: ``role_context("admin")`` opens a context that starts signed in as that role."""
+    opened = []
+
+    def open_context(role: str):
+        capture = ContextCapture(artifact_store, f"{request.node.nodeid}-{role}")
+        context = browser.new_context(
+            storage_state=auth_states.path(role), **device_options, **capture.context_options()
+        )
+        capture.start(context)
+        opened.append((capture, context))
+        return context
+
+    yield open_context
+    for capture, context in opened:
+        capture.finish(context, failed=request.node.stash.get(FAILED_KEY, False))
+
+
+@pytest.fixture
+def admin_page(role_context):
+    return role_context("admin").new_page()
+
+
+@pytest.fixture
+def page_perf(page, throttle_profile, request):
+    """Load metrics for ``page``; attached before the test's first ``goto``."""
+    from harness.perf import PagePerf
+
+    return PagePerf(page, profile=throttle_profile, label=request.node.nodeid)
+
+
+@pytest.fixture(scope="session")
+def mock_api():
+    """Canned API responses, serialized once for the whole session."""
+    return default_mock_api()
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """Local stand-in for the app's API routes, one per worker."""
+    server = StubServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def api_session(stub_server):
+    from harness.api_client import ApiSession
+
+    session = ApiSession(stub_server.base_url)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def api(stub_server, api_session):
+    """Pooled client against a freshly seeded stub backend, with no cookies."""
+    stub_server.backend.reset()
+    api_session.cookies.clear()
+    return api_session
+
+
+@pytest.fixture(scope="session")
+def async_browser_pool():
+    pool = AsyncBrowserPool(headless=headless_from_env())
+    yield pool
+    pool.close()
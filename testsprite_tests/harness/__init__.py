@@ -0,0 +1,6 @@
+"""Shared infrastructure for the TestSprite TC* suite.
+
+The TC scripts stay thin: browser lifecycle, network mocking and other
+plumbing live here and are handed to tests through the fixtures in
+``conftest.py``.
+"""
@@ -0,0 +1,140 @@
+"""Single-round-trip accessibility scan.
+
+Checking each ``img``/``button``/``a`` via locators costs one protocol
+round trip per element, which adds up to seconds on a shop page with
+hundreds of cards. :data:`SCAN_SCRIPT` walks the DOM once inside the page
+and returns every violation, plus landmark counts, in one payload.
+
+Rules:
+
+* ``img-alt``: an ``img`` whose ``alt`` is missing or blank.
+* ``button-name`` / ``link-name``: an accessible name that is empty,
+  after ``aria-labelledby``, ``aria-label``, text content, nested image
+  ``alt`` and ``title``.
+* ``landmark-main``: no ``main`` landmark on the page.
+
+With ``axe=True`` (see :data:`harness.config.AXE_ENABLED`) axe-core is
+injected and its violations are merged in with an ``axe:`` rule prefix.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from harness.config import AXE_SOURCE_PATH
+
+SCAN_SCRIPT = """
+() => {
+  const text = el => (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim();
+  const accessibleName = el => {
+    const ids = (el.getAttribute('aria-labelledby') || '').split(/\\s+/).filter(Boolean);
+    const labelled = ids.map(id => document.getElementById(id)).filter(Boolean).map(text).join(' ').trim();
+    if (labelled) return labelled;
+    const label = (el.getAttribute('aria-label') || '').trim();
+    if (label) return label;
+    const own = text(el);
+    if (own) return own;
+    for (const img of el.querySelectorAll('img[alt]')) if (img.alt.trim()) return img.alt.trim();
+    return (el.getAttribute('title') || '').trim();
+  };
+  const describe = el => {
+    let target = el.tagName.toLowerCase();
+    if (el.id) target += '#' + el.id;
+    else if (el.classList.length) target += '.' + [...el.classList].slice(0, 2).join('.');
+    return { target, html: el.outerHTML.slice(0, 160) };
+  };
+  const violations = [];
+  const images = document.querySelectorAll('img');
+  for (const img of images) {
+    const alt = img.getAttribute('alt');
+    if (alt === null || !alt.trim()) violations.push({ rule: 'img-alt', ...describe(img) });
+  }
+  const buttons = document.querySelectorAll('button');
+  for (const el of buttons) if (!accessibleName(el)) violations.push({ rule: 'button-name', ...describe(el) });
+  const links = document.querySelectorAll('a');
+  for (const el of links) if (!accessibleName(el)) violations.push({ rule: 'link-name', ...describe(el) });
+  const landmarks = {
+    main: document.querySelectorAll('main, [role="main"]').length,
+    navigation: document.querySelectorAll('nav, [role="navigation"]').length,
+    banner: document.querySelectorAll('header, [role="banner"]').length,
+    contentinfo: document.querySelectorAll('footer, [role="contentinfo"]').length,
+  };
+  if (!landmarks.main) violations.push({ rule: 'landmark-main', target: 'document', html: '' });
+  return {
+    url: location.href,
+    landmarks,
+    checked: { images: images.length, buttons: buttons.length, links: links.length },
+    violations,
+  };
+}
+"""
+
+AXE_SCRIPT = """
+() => axe.run(document, { resultTypes: ['violations'] }).then(result =>
+  result.violations.flatMap(v => v.nodes.map(node => ({
+    rule: 'axe:' + v.id,
+    target: node.target.join(' '),
+    html: node.html.slice(0, 160),
+  })))
+)
+"""
+
+
+@dataclass
+class Violation:
+    rule: str
+    target: str
+    html: str = ""
+
+
+@dataclass
+class A11yReport:
+    url: str
+    landmarks: Dict[str, int]
+    checked: Dict[str, int]
+    violations: List[Violation] = field(default_factory=list)
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "A11yReport":
+        violations = [Violation(**v) for v in payload.pop("violations")]
+        return cls(violations=violations, **payload)
+
+    def by_rule(self) -> Dict[str, List[Violation]]:
+        grouped = defaultdict(list)
+        for violation in self.violations:
+            grouped[violation.rule].append(violation)
+        return dict(grouped)
+
+    def summary(self, per_rule: int = 3) -> str:
+        lines = [f"{len(self.violations)} accessibility violation(s) on {self.url}"]
+        for rule, items in self.by_rule().items():
+            shown = ", ".join(v.target for v in items[:per_rule])
+            more = f" (+{len(items) - per_rule} more)" if len(items) > per_rule else ""
+            lines.append(f"  {rule}: {len(items)} -- {shown}{more}")
+        return "\n".join(lines)
+
+
+def axe_source() -> Path:
+    if not AXE_SOURCE_PATH.is_file():
+        raise FileNotFoundError(
+            f"axe-core not found at {AXE_SOURCE_PATH}; install it or set TESTSPRITE_AXE_PATH"
+        )
+    return AXE_SOURCE_PATH
+
+
+def scan_accessibility(page, axe: bool = False) -> A11yReport:
+    report = A11yReport.from_payload(page.evaluate(SCAN_SCRIPT))
+    if axe:
+        source = axe_source()
+        page.add_script_tag(path=str(source))
+        report.violations += [Violation(**v) for v in page.evaluate(AXE_SCRIPT)]
+    return report
+
+
+async def scan_accessibility_async(page, axe: bool = False) -> A11yReport:
+    report = A11yReport.from_payload(await page.evaluate(SCAN_SCRIPT))
+    if axe:
+        source = axe_source()
+        await page.add_script_tag(path=str(source))
+        report.violations += [Violation(**v) for v in await page.evaluate(AXE_SCRIPT)]
+    return report
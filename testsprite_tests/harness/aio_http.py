@@ -0,0 +1,181 @@
+"""Small keep-alive HTTP/1.1 client on asyncio streams.
+
+The load and stress tools need thousands of concurrent requests from one
+process without adding a dependency. :class:`AsyncHttpPool` keeps a
+bounded set of persistent connections to one origin. It handles
+``Content-Length``, chunked and read-to-close bodies, and keeps a cookie
+jar so a login carries over to later requests, as with
+``requests.Session``.
+"""
+import asyncio
+import json as jsonlib
+import ssl
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.body or b"null")
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHttpPool:
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 64,
+        timeout: float = 30.0,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        url = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.host = url.hostname or "localhost"
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self._ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self._host_header = url.netloc
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.cookies: Dict[str, str] = {}
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self._ssl)
+        return _Connection(reader, writer)
+
+    def _encode(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> bytes:
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self._host_header}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _read_response(self, conn: _Connection, method: str) -> HttpResponse:
+        reader = conn.reader
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                name = name.strip().lower()
+                if name == "set-cookie":
+                    self._store_cookie(value.strip())
+                headers[name] = value.strip()
+        if headers.get("connection", "").lower() == "close":
+            conn.reusable = False
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            conn.reusable = False
+        return HttpResponse(status, headers, body)
+
+    def _store_cookie(self, header: str):
+        jar = SimpleCookie()
+        jar.load(header)
+        for name, morsel in jar.items():
+            self.cookies[name] = morsel.value
+
+    def _prepare(
+        self, path: str, params: Optional[Mapping[str, Any]], json: Any, headers: Optional[Mapping[str, str]]
+    ) -> Tuple[str, Dict[str, str], bytes]:
+        target = path if path.startswith("/") else "/" + path
+        if params:
+            query = urlencode({k: v for k, v in params.items() if v is not None})
+            if query:
+                target += ("&" if "?" in target else "?") + query
+        merged = {**self.headers, **(headers or {})}
+        body = b""
+        if json is not None:
+            body = jsonlib.dumps(json, separators=(",", ":")).encode("utf-8")
+            merged.setdefault("Content-Type", "application/json")
+        merged["Content-Length"] = str(len(body))
+        if self.cookies:
+            merged.setdefault("Cookie", "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        return target, merged, body
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Mapping[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> HttpResponse:
+        method = method.upper()
+        target, merged, body = self._prepare(path, params, json, headers)
+        payload = self._encode(method, target, merged, body)
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                try:
+                    return await self._exchange(conn, payload, method)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # closed by the server while idle in the pool; retry once on a fresh connection
+                    pass
+            return await self._exchange(await self._connect(), payload, method)
+
+    async def _exchange(self, conn: _Connection, payload: bytes, method: str) -> HttpResponse:
+        try:
+            conn.writer.write(payload)
+            await conn.writer.drain()
+            response = await asyncio.wait_for(self._read_response(conn, method), self.timeout)
+        except BaseException:
+            conn.close()
+            raise
+        if conn.reusable:
+            self._idle.append(conn)
+        else:
+            conn.close()
+        return response
+
+    async def get(self, path: str, **kwargs) -> HttpResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> HttpResponse:
+        return await self.request("POST", path, **kwargs)
+
+    async def close(self):
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+    async def __aenter__(self) -> "AsyncHttpPool":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
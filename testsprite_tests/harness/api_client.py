@@ -0,0 +1,29 @@
+"""Pooled HTTP client for the API-level TC cases.
+
+Imports ``requests`` at module level, so conftest only imports this module
+inside fixtures to keep test collection cheap.
+"""
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ApiSession(requests.Session):
+    """``requests.Session`` that resolves relative paths against ``base_url``.
+
+    One adapter with a sized pool is mounted for http/https so every test in
+    the session reuses the same keep-alive connections.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = 16, timeout: float = 30):
+        super().__init__()
+        self.base_url = base_url.rstrip("/") + "/"
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, urljoin(self.base_url, url.lstrip("/")), *args, **kwargs)
@@ -0,0 +1,218 @@
+"""Managed Next.js server for a test run, warmed up before the first case.
+
+Under ``next dev`` the first request to a route compiles it on demand, which
+can take longer than a case's 30 s ``goto`` timeout. :class:`AppServer`
+starts the app on a free port, either ``next dev`` or ``next start``
+(which runs ``next build`` first when there is no build, or when the app
+sources changed since the last one: the build is stamped with
+``harness.result_cache.app_hash``). It waits until
+the port answers, then requests every route in the test plan's ``routes``
+lists once, so compilation and the data caches are warm before the cases
+measure anything::
+
+    python -m harness.runner --serve dev
+    python -m harness.app_server start      # serve until Ctrl-C
+
+The runner hands the server's URL to its shards as ``TESTSPRITE_BASE_URL``
+and stops the server when the run ends. The server's output goes to
+``tmp/results/app_server.log``.
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from harness.config import APP_SERVER_LOG_PATH, REPO_ROOT
+from harness.plan import load_plan
+from harness.ports import free_port
+from harness.result_cache import app_hash
+
+DEV = "dev"
+START = "start"
+MODES = (DEV, START)
+
+ROUTES_KEY = "routes"
+
+READY_TIMEOUT = 120  # seconds for the port to answer
+BUILD_TIMEOUT = 900
+WARM_TIMEOUT = 180  # per route; a cold route under ``next dev`` compiles first
+
+BUILD_STAMP = "testsprite-app-hash"  # in .next/, next to BUILD_ID
+
+
+def plan_routes(plan: Optional[Dict[str, dict]] = None) -> List[str]:
+    """Every path listed under ``routes`` in the plan, once, in plan order."""
+    plan = plan if plan is not None else load_plan()
+    routes: List[str] = []
+    for entry in plan.values():
+        for route in entry.get(ROUTES_KEY, []):
+            if route not in routes:
+                routes.append(route)
+    return routes
+
+
+def next_command(repo_root: Path = REPO_ROOT) -> List[str]:
+    local = repo_root / "node_modules" / ".bin" / "next"
+    return [str(local)] if local.exists() else ["npx", "--no-install", "next"]
+
+
+class AppServer:
+    """One ``next dev`` / ``next start`` process on ``port`` (a free one by default)."""
+
+    def __init__(self, mode: str = DEV, port: Optional[int] = None, repo_root: Path = REPO_ROOT,
+                 log_path: Path = APP_SERVER_LOG_PATH):
+        if mode not in MODES:
+            raise ValueError(f"Unknown server mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.port = port or free_port()
+        self.repo_root = repo_root
+        self.log_path = log_path
+        self._proc: Optional[subprocess.Popen] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    @property
+    def pid(self) -> Optional[int]:
+        """The server's process id, which is also its process group id."""
+        return self._proc.pid if self._proc is not None else None
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _env(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env.setdefault("NODE_OPTIONS", "--max-old-space-size=4096")  # as in the package.json dev script
+        env["PORT"] = str(self.port)
+        return env
+
+    def build(self):
+        """``next build``, as the package.json build script runs it, stamped with the app hash it built."""
+        env = self._env()
+        env["IS_BUILD"] = "true"
+        built = app_hash(self.repo_root)
+        with open(self.log_path, "ab") as log:
+            subprocess.run(
+                [*next_command(self.repo_root), "build"],
+                cwd=self.repo_root, env=env, stdout=log, stderr=subprocess.STDOUT, timeout=BUILD_TIMEOUT, check=True,
+            )
+        (self.repo_root / ".next" / BUILD_STAMP).write_text(built, encoding="utf-8")
+
+    def build_is_current(self) -> bool:
+        """Whether ``.next`` holds a build of the app sources as they are now."""
+        next_dir = self.repo_root / ".next"
+        try:
+            stamp = (next_dir / BUILD_STAMP).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return False
+        return (next_dir / "BUILD_ID").exists() and stamp == app_hash(self.repo_root)
+
+    def start(self, timeout: float = READY_TIMEOUT) -> "AppServer":
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.log_path.write_bytes(b"")
+        if self.mode == START and not self.build_is_current():
+            self.build()
+        with open(self.log_path, "ab") as log:
+            self._proc = subprocess.Popen(
+                [*next_command(self.repo_root), self.mode, "-p", str(self.port)],
+                cwd=self.repo_root, env=self._env(), stdout=log, stderr=subprocess.STDOUT,
+                start_new_session=True,  # its own process group, so stop() reaches node's children
+            )
+        try:
+            self.wait_ready(timeout)
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def _log_tail(self, lines: int = 20) -> str:
+        try:
+            return "\n".join(self.log_path.read_text(encoding="utf-8", errors="replace").splitlines()[-lines:])
+        except FileNotFoundError:
+            return ""
+
+    def wait_ready(self, timeout: float = READY_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"next {self.mode} exited with {self._proc.returncode}:\n{self._log_tail()}")
+            try:
+                socket.create_connection(("localhost", self.port), timeout=1).close()
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"next {self.mode} did not listen on {self.port} within {timeout:g}s") from None
+                time.sleep(0.25)
+
+    def warm(self, routes: Sequence[str], timeout: float = WARM_TIMEOUT) -> Dict[str, Tuple[int, float]]:
+        """GET each route once; route -> (HTTP status, 0 if none, seconds).
+
+        Any response warms the route, so error statuses are recorded, not raised.
+        """
+        timings = {}
+        for route in routes:
+            started = time.monotonic()
+            try:
+                with urllib.request.urlopen(f"{self.base_url}{route}", timeout=timeout) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except (urllib.error.URLError, OSError):
+                status = 0
+            timings[route] = (status, time.monotonic() - started)
+        return timings
+
+    def stop(self, grace: float = 10):
+        if not self.running:
+            return
+        try:
+            os.killpg(self._proc.pid, signal.SIGTERM)
+            self._proc.wait(grace)
+        except subprocess.TimeoutExpired:
+            os.killpg(self._proc.pid, signal.SIGKILL)
+            self._proc.wait()
+        except ProcessLookupError:
+            pass
+
+    def __enter__(self) -> "AppServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def print_warm_up(timings: Dict[str, Tuple[int, float]]):
+    for route, (status, seconds) in timings.items():
+        print(f"warm {route}: {status or 'no response'} in {seconds:.1f}s")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.app_server", description=__doc__.split("\n\n")[0])
+    parser.add_argument("mode", choices=MODES)
+    parser.add_argument("--port", type=int, help="default: a free port")
+    parser.add_argument("--no-warm", action="store_true", help="skip requesting the plan's routes")
+    args = parser.parse_args(argv)
+    with AppServer(args.mode, args.port) as server:
+        print(f"next {args.mode} ready at {server.base_url} (log: {server.log_path})")
+        if not args.no_warm:
+            print_warm_up(server.warm(plan_routes()))
+        print(f"export TESTSPRITE_BASE_URL={server.base_url}; Ctrl-C to stop")
+        try:
+            while server.running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+"""Failure-only Playwright artifacts: trace, HAR and screenshots.
+
+Off by default; set ``TESTSPRITE_ARTIFACTS=1`` to enable. Every browser
+context then records a Playwright trace and a HAR, but nothing is kept for
+a passing test:
+
+* the trace stays in the Playwright driver's memory and is dropped by
+  ``tracing.stop()``;
+* the HAR is written to ``tmp/artifacts/.scratch`` when the context closes
+  and is deleted straight away.
+
+A failing test gets a directory under ``tmp/artifacts`` with ``trace.zip``
+(open with ``playwright show-trace``), ``network.har`` and one screenshot
+per open page. Once the directories add up to more than
+``TESTSPRITE_ARTIFACTS_MAX_MB``, the oldest are deleted first.
+"""
+import re
+import shutil
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from harness.config import ARTIFACTS_DIR, ARTIFACTS_MAX_BYTES, LOCKS_DIR
+from harness.locks import file_lock
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser as AsyncBrowser
+    from playwright.async_api import BrowserContext as AsyncBrowserContext
+    from playwright.sync_api import BrowserContext
+
+SCRATCH = ".scratch"
+
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+def _size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class ArtifactStore:
+    """The ``tmp/artifacts`` directory, capped at ``max_bytes`` with oldest-first eviction."""
+
+    def __init__(self, root: Path = ARTIFACTS_DIR, max_bytes: int = ARTIFACTS_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def scratch_path(self, suffix: str) -> Path:
+        scratch = self.root / SCRATCH
+        scratch.mkdir(parents=True, exist_ok=True)
+        return scratch / f"{uuid.uuid4().hex}{suffix}"
+
+    def case_dir(self, name: str) -> Path:
+        """A new directory for one failure: ``<time>-<name>``."""
+        slug = _UNSAFE.sub("_", name).strip("_")[:120]
+        path = self.root / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}"
+        while path.exists():
+            path = path.with_name(f"{path.name}-{uuid.uuid4().hex[:6]}")
+        path.mkdir(parents=True)
+        return path
+
+    def enforce_cap(self) -> List[Path]:
+        """Delete the oldest failure directories until the total fits; returns what was removed."""
+        removed = []
+        with file_lock(LOCKS_DIR / "artifacts.lock", "enforce_artifact_cap", wait=30):
+            dirs = sorted(
+                (p for p in self.root.iterdir() if p.is_dir() and p.name != SCRATCH),
+                key=lambda p: p.stat().st_mtime,
+            )
+            sizes = {p: _size(p) for p in dirs}
+            total = sum(sizes.values())
+            for path in dirs:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= sizes[path]
+                removed.append(path)
+        return removed
+
+
+class _Capture:
+    def __init__(self, store: Optional[ArtifactStore], name: str):
+        self.store = store
+        self.name = name
+        self.har = store.scratch_path(".har") if store else None
+        self.target: Optional[Path] = None
+
+    def context_options(self) -> Dict[str, Any]:
+        """Extra ``new_context`` options; HAR recording has to be set up when the context is created."""
+        if self.har is None:
+            return {}
+        return {"record_har_path": str(self.har), "record_har_content": "omit"}
+
+    def _prepare(self, failed: bool) -> Optional[Path]:
+        if self.store is None or not failed:
+            return None
+        self.target = self.store.case_dir(self.name)
+        return self.target
+
+    def _keep_har(self):
+        if self.har is None:
+            return
+        if self.target is not None and self.har.exists():
+            shutil.move(str(self.har), self.target / "network.har")
+            self.store.enforce_cap()
+        else:
+            self.har.unlink(missing_ok=True)
+
+
+class ContextCapture(_Capture):
+    """Trace and HAR for one sync ``BrowserContext``, persisted only if ``finish`` is told it failed.
+
+    ``store=None`` (artifacts disabled) turns every step into a no-op
+    except closing the context.
+    """
+
+    def start(self, context: "BrowserContext"):
+        if self.store is not None:
+            context.tracing.start(screenshots=True, snapshots=True)
+
+    def finish(self, context: "BrowserContext", failed: bool):
+        """Persist on failure, discard otherwise, and close ``context``."""
+        target = self._prepare(failed)
+        try:
+            if target is not None:
+                for index, page in enumerate(context.pages):
+                    try:
+                        page.screenshot(path=str(target / f"page-{index}.png"), full_page=True)
+                    except Exception:  # a crashed or closed page must not hide the test failure
+                        pass
+            if self.store is not None:
+                context.tracing.stop(path=str(target / "trace.zip") if target else None)
+        finally:
+            context.close()
+            self._keep_har()
+
+
+class AsyncContextCapture(_Capture):
+    """:class:`ContextCapture` for the async API, used as ``async with capture.open(browser) as context``."""
+
+    @asynccontextmanager
+    async def open(self, browser: "AsyncBrowser", **options) -> AsyncIterator["AsyncBrowserContext"]:
+        """A new context; an exception escaping the block counts as a failure."""
+        context = await browser.new_context(**options, **self.context_options())
+        if self.store is not None:
+            await context.tracing.start(screenshots=True, snapshots=True)
+        failed = True
+        try:
+            yield context
+            failed = False
+        finally:
+            await self._finish(context, failed)
+
+    async def _finish(self, context: "AsyncBrowserContext", failed: bool):
+        target = self._prepare(failed)
+        try:
+            if target is not None:
+                for index, page in enumerate(context.pages):
+                    try:
+                        await page.screenshot(path=str(target / f"page-{index}.png"), full_page=True)
+                    except Exception:  # a crashed or closed page must not hide the test failure
+                        pass
+            if self.store is not None:
+                await context.tracing.stop(path=str(target / "trace.zip") if target else None)
+        finally:
+            await context.close()
+            self._keep_har()
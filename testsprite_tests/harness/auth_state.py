@@ -0,0 +1,178 @@
+"""Signed-in Playwright ``storage_state`` per role, created once and shared.
+
+``app/admin/(protected)`` is guarded server-side by ``requireAdmin()``,
+which reads the Supabase session from the ``sb-<ref>-auth-token`` cookie
+that ``@supabase/ssr`` maintains. Route mocks cannot get past it. A
+browser case that needs a signed-in user therefore starts from a real
+session against the local stack:
+
+* ``admin``: Supabase's password grant with :data:`ADMIN_CREDENTIALS`,
+  checked for ``app_metadata.role == "admin"`` as ``middleware.ts`` does.
+  ``POST /api/admin/login`` cannot be used: the middleware answers 401 to
+  any ``/api/admin`` request without a session, that route included.
+* ``customer``: the same grant with :data:`CUSTOMER_CREDENTIALS`.
+* ``anonymous``: no cookies.
+
+The session is written as that cookie (``base64-`` + base64url JSON, in
+chunks of :data:`CHUNK_SIZE` like ``@supabase/ssr``) into
+``tmp/auth/<role>-<stack>.json``, where ``<stack>`` is a short hash of the
+base URL and the Supabase URL, so a session is never reused against
+another app or project. Shards share the file under a lock and log in
+again only when the stored access token is within :data:`REFRESH_MARGIN`
+of expiring.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from harness.config import AUTH_STATE_DIR, BASE_URL, LOCKS_DIR, REPO_ROOT
+from harness.fixtures import ADMIN_CREDENTIALS, CUSTOMER_CREDENTIALS
+from harness.locks import file_lock
+
+ADMIN = "admin"
+CUSTOMER = "customer"
+ANONYMOUS = "anonymous"
+ROLES = (ADMIN, CUSTOMER, ANONYMOUS)
+
+CHUNK_SIZE = 3180  # @supabase/ssr MAX_CHUNK_SIZE
+REFRESH_MARGIN = 300  # seconds
+
+
+def app_env(name: str) -> Optional[str]:
+    """``name`` from the environment, else from the app's ``.env.local`` / ``.env``."""
+    if os.environ.get(name):
+        return os.environ[name]
+    for file in (REPO_ROOT / ".env.local", REPO_ROOT / ".env"):
+        if not file.exists():
+            continue
+        for line in file.read_text(encoding="utf-8").splitlines():
+            key, sep, value = line.partition("=")
+            if sep and key.strip() == name:
+                return value.strip().strip("'\"")
+    return None
+
+
+def auth_cookie_name(supabase_url: str) -> str:
+    """``sb-<first host label>-auth-token``, the default storage key of supabase-js."""
+    return f"sb-{urlsplit(supabase_url).hostname.split('.')[0]}-auth-token"
+
+
+def session_cookies(session: dict, supabase_url: str, base_url: str = BASE_URL) -> List[dict]:
+    """Playwright cookies holding ``session`` the way ``@supabase/ssr`` stores it."""
+    encoded = base64.urlsafe_b64encode(json.dumps(session, separators=(",", ":")).encode()).decode().rstrip("=")
+    value = f"base64-{encoded}"
+    name = auth_cookie_name(supabase_url)
+    chunks = [value[i:i + CHUNK_SIZE] for i in range(0, len(value), CHUNK_SIZE)]
+    names = [name] if len(chunks) == 1 else [f"{name}.{i}" for i in range(len(chunks))]
+    domain = urlsplit(base_url).hostname
+    return [
+        {
+            "name": chunk_name, "value": chunk, "domain": domain, "path": "/",
+            "expires": -1, "httpOnly": False, "secure": False, "sameSite": "Lax",
+        }
+        for chunk_name, chunk in zip(names, chunks)
+    ]
+
+
+def stored_session(state: dict) -> Optional[dict]:
+    """The session encoded in a storage state's auth cookies, if any."""
+    chunks = sorted(
+        (c for c in state.get("cookies", []) if c["name"].startswith("sb-") and "-auth-token" in c["name"]),
+        key=lambda c: c["name"],
+    )
+    value = "".join(c["value"] for c in chunks)
+    if not value.startswith("base64-"):
+        return None
+    encoded = value[len("base64-"):]
+    return json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+
+
+def supabase_url() -> str:
+    url = app_env("NEXT_PUBLIC_SUPABASE_URL")
+    if not url:
+        raise RuntimeError("NEXT_PUBLIC_SUPABASE_URL is not set (environment, .env.local or .env)")
+    return url.rstrip("/")
+
+
+def password_grant(credentials: Dict[str, str], base_url: str = BASE_URL, supabase: Optional[str] = None) -> dict:
+    """Supabase's ``POST /auth/v1/token?grant_type=password``; the session it returns."""
+    from harness.api_client import ApiSession
+
+    with ApiSession(base_url) as api:
+        response = api.post(
+            f"{supabase or supabase_url()}/auth/v1/token",
+            params={"grant_type": "password"},
+            json=credentials,
+            headers={"apikey": app_env("NEXT_PUBLIC_SUPABASE_ANON_KEY") or ""},
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def admin_session(credentials: Dict[str, str] = ADMIN_CREDENTIALS, base_url: str = BASE_URL,
+                  supabase: Optional[str] = None) -> dict:
+    """:func:`password_grant`, refused unless the user has the role ``middleware.ts`` requires."""
+    session = password_grant(credentials, base_url, supabase)
+    role = session.get("user", {}).get("app_metadata", {}).get("role")
+    if role != "admin":
+        raise RuntimeError(
+            f"{credentials['email']} signed in without the admin role "
+            f"(app_metadata.role={role!r}); middleware.ts would reject it"
+        )
+    return session
+
+
+def sign_in(role: str, base_url: str = BASE_URL) -> Optional[dict]:
+    """A fresh Supabase session for ``role`` (``None`` for anonymous)."""
+    if role == ANONYMOUS:
+        return None
+    if role == ADMIN:
+        return admin_session(ADMIN_CREDENTIALS, base_url)
+    if role == CUSTOMER:
+        return password_grant(CUSTOMER_CREDENTIALS, base_url)
+    raise ValueError(f"Unknown role {role!r}; expected one of {ROLES}")
+
+
+def _fresh(path: Path) -> bool:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            state = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return False
+    session = stored_session(state)
+    if session is None:
+        return not state.get("cookies")
+    return session.get("expires_at", 0) - time.time() > REFRESH_MARGIN
+
+
+class AuthStates:
+    """Storage state files per role under ``tmp/auth``, signed in on first use."""
+
+    def __init__(self, base_url: str = BASE_URL, directory: Path = AUTH_STATE_DIR):
+        self.base_url = base_url
+        self.directory = directory
+        self._paths: Dict[str, Path] = {}
+
+    def path(self, role: str) -> Path:
+        if role not in ROLES:
+            raise ValueError(f"Unknown role {role!r}; expected one of {ROLES}")
+        if role in self._paths:
+            return self._paths[role]
+        supabase = supabase_url() if role != ANONYMOUS else ""  # no session, so no project
+        stack = hashlib.sha256(f"{self.base_url}\0{supabase}".encode()).hexdigest()[:12]
+        path = self.directory / f"{role}-{stack}.json"
+        with file_lock(LOCKS_DIR / f"auth-{role}-{stack}.lock", "sign_in", wait=60):
+            if not _fresh(path):
+                session = sign_in(role, self.base_url)
+                cookies = session_cookies(session, supabase, self.base_url) if session else []
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(json.dumps({"cookies": cookies, "origins": []}, indent=2), encoding="utf-8")
+                os.replace(tmp, path)
+        self._paths[role] = path
+        return path
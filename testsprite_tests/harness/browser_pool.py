@@ -0,0 +1,159 @@
+"""Session-wide Playwright browser pool.
+
+Chromium cold start is the largest fixed cost of a run, so each worker
+process launches a browser once and every test receives a fresh, isolated
+``BrowserContext`` from it instead of calling ``chromium.launch()`` itself.
+"""
+import asyncio
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser as AsyncBrowser
+    from playwright.sync_api import Browser, BrowserContext
+
+    from harness.matrix import Target
+
+T = TypeVar("T")
+
+DEFAULT_ENGINE = "chromium"
+
+
+def headless_from_env() -> bool:
+    """Headless unless ``TESTSPRITE_HEADED`` is set to a non-empty value."""
+    return not os.environ.get("TESTSPRITE_HEADED")
+
+
+class BrowserPool:
+    """Lazily launches one browser per engine and hands out contexts.
+
+    Playwright is only imported on first use so that test collection does
+    not pay for it.
+    """
+
+    def __init__(self, headless: bool = True, launch_options: Optional[Dict[str, Any]] = None):
+        self.headless = headless
+        self.launch_options = launch_options or {}
+        self._manager = None
+        self._playwright = None
+        self._browsers: Dict[str, "Browser"] = {}
+
+    def _start(self):
+        from playwright.sync_api import sync_playwright
+
+        self._manager = sync_playwright()
+        self._playwright = self._manager.start()
+
+    def browser(self, engine: str = DEFAULT_ENGINE) -> "Browser":
+        """Return the shared browser for ``engine``, launching it on first use."""
+        if engine not in self._browsers:
+            if self._playwright is None:
+                self._start()
+            launcher = getattr(self._playwright, engine)
+            self._browsers[engine] = launcher.launch(headless=self.headless, **self.launch_options)
+        return self._browsers[engine]
+
+    def target(self, target: "Target") -> Tuple["Browser", Dict[str, Any]]:
+        """The shared browser for a matrix ``target`` and its device's context options."""
+        from harness.matrix import resolve
+
+        if self._playwright is None:
+            self._start()
+        engine, options = resolve(target, self._playwright.devices)
+        return self.browser(engine), options
+
+    def new_context(self, engine: str = DEFAULT_ENGINE, **options) -> "BrowserContext":
+        return self.browser(engine).new_context(**options)
+
+    def close(self):
+        for browser in self._browsers.values():
+            browser.close()
+        self._browsers.clear()
+        if self._manager is not None:
+            self._manager.__exit__(None, None, None)
+        self._manager = None
+        self._playwright = None
+
+
+class AsyncBrowserPool:
+    """Async counterpart of :class:`BrowserPool` for coroutine-based tests.
+
+    Sync Playwright keeps an event loop attached to the main thread, so the
+    async API gets a private loop on a daemon thread. Tests submit
+    coroutines with :meth:`run`; the browser survives between calls.
+    """
+
+    def __init__(self, headless: bool = True, launch_options: Optional[Dict[str, Any]] = None):
+        self.headless = headless
+        self.launch_options = launch_options or {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._manager = None
+        self._playwright = None
+        self._browsers: Dict[str, "AsyncBrowser"] = {}
+        self._launch_lock: Optional[asyncio.Lock] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="async-browser-pool", daemon=True
+            )
+            self._thread.start()
+        return self._loop
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run ``coro`` on the pool's loop and block until it finishes."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        return future.result(timeout)
+
+    async def _start(self):
+        from playwright.async_api import async_playwright
+
+        self._manager = async_playwright()
+        self._playwright = await self._manager.start()
+
+    async def browser(self, engine: str = DEFAULT_ENGINE) -> "AsyncBrowser":
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if engine not in self._browsers:
+                if self._playwright is None:
+                    await self._start()
+                launcher = getattr(self._playwright, engine)
+                self._browsers[engine] = await launcher.launch(
+                    headless=self.headless, **self.launch_options
+                )
+        return self._browsers[engine]
+
+    async def target(self, target: "Target") -> Tuple["AsyncBrowser", Dict[str, Any]]:
+        """Async :meth:`BrowserPool.target`."""
+        from harness.matrix import resolve
+
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._playwright is None:
+                await self._start()
+        engine, options = resolve(target, self._playwright.devices)
+        return await self.browser(engine), options
+
+    async def _shutdown(self):
+        for browser in self._browsers.values():
+            await browser.close()
+        self._browsers.clear()
+        if self._manager is not None:
+            await self._manager.__aexit__(None, None, None)
+        self._manager = None
+        self._playwright = None
+
+    def close(self):
+        if self._loop is None:
+            return
+        self.run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
@@ -0,0 +1,422 @@
+"""Concurrent checkouts of a few SKUs against a local Postgres, with inventory invariants.
+
+TC005 covers checkout against the stand-in, one order at a time. This is
+the flash-sale case: hundreds of customers buying the same few products
+at the same moment. Each run recreates a scratch schema, ``checkout_bench``,
+in the database at ``TESTSPRITE_PG_DSN`` (default: the one
+``supabase start`` runs). The schema holds ``products`` and ``orders``,
+to which the repo's own ``setup_ranking_db.sql``, ``refactor_db.sql`` and
+``supabase/migrations/003_orders_indexes.sql`` are applied. That gives
+``increment_sales`` in its current form, an upsert into
+``product_analytics``. Then every checkout is released at once through an
+``asyncpg`` pool, with one of these strategies:
+
+* ``app``: what ``orderService.createOrder`` does. It inserts the order,
+  then calls ``increment_sales`` per line. Nothing checks or decrements
+  ``stock``.
+* ``conditional``: one transaction. For each line, in product id order,
+  ``UPDATE ... SET stock = stock - qty WHERE stock >= qty``. It rolls back
+  as sold out if any line finds too little stock.
+* ``for-update``: one transaction. ``SELECT ... FOR UPDATE`` on the cart's
+  products, then the check, the decrements, the order and
+  ``increment_sales``.
+
+Reported for each run:
+
+* throughput in orders per second;
+* checkout latency, and the time spent waiting for a pool connection;
+* lock waits, as backends in ``pg_stat_activity`` waiting on a lock,
+  sampled every 10 ms.
+
+Then every product is checked for three invariants:
+
+* no oversell: units ordered do not exceed the starting stock;
+* the stock left equals the starting stock minus the units ordered;
+* ``product_analytics.sales_count`` equals the units ordered.
+
+With ``supabase start`` running::
+
+    python -m harness.checkout_contention --checkouts 500 --concurrency 200 --skus 3 --stock 50
+    python -m harness.checkout_contention --strategy conditional --connections 20
+
+Needs ``asyncpg``. The scratch schema is left in place for inspection and
+dropped at the start of the next run. The report is written as JSON under
+``tmp/bench``, and the exit status is 1 if any invariant fails.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from harness.config import BENCH_DIR, PG_DSN, REPO_ROOT
+from harness.fixtures import CATALOG
+from harness.stats import format_table, summarize
+
+SCHEMA = "checkout_bench"
+SCHEMA_FILES = (
+    REPO_ROOT / "setup_ranking_db.sql",
+    REPO_ROOT / "refactor_db.sql",
+    REPO_ROOT / "supabase" / "migrations" / "003_orders_indexes.sql",
+)
+
+# The tables as the app reads and writes them, before the repo's SQL files run
+BASE_DDL = """
+CREATE TABLE products (
+    id BIGSERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    price NUMERIC(10, 2) NOT NULL,
+    stock INTEGER NOT NULL DEFAULT 0,
+    category TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    -- added by supabase/migrations/001_sync_system_schema.sql; refactor_db.sql moves them out
+    source_url TEXT,
+    source_platform TEXT DEFAULT 'manual',
+    sync_enabled BOOLEAN DEFAULT false,
+    auto_update_price BOOLEAN DEFAULT false,
+    auto_update_stock BOOLEAN DEFAULT false,
+    last_synced_at TIMESTAMPTZ
+);
+CREATE TABLE orders (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    customer_name TEXT,
+    email TEXT,
+    phone TEXT,
+    shipping_address TEXT,
+    city TEXT,
+    items JSONB NOT NULL,
+    subtotal NUMERIC(10, 2),
+    shipping_fee NUMERIC(10, 2),
+    total_amount NUMERIC(10, 2),
+    payment_method TEXT,
+    status TEXT DEFAULT 'pending',
+    payment_status TEXT DEFAULT 'unpaid',
+    user_id UUID,
+    notes TEXT
+);
+"""
+
+# Columns as orderService.createOrder fills them; items in the cart store's CartItem shape
+INSERT_ORDER = """
+INSERT INTO orders (customer_name, email, phone, shipping_address, city, items,
+                    subtotal, shipping_fee, total_amount, payment_method)
+VALUES ($1, $2, $3, 'Flash sale street 1', 'Riyadh', $4::jsonb, $5, 0, $5, 'cod')
+RETURNING id
+"""
+INCREMENT_SALES = "SELECT increment_sales($1::bigint, $2::int)"
+DECREMENT_IF_AVAILABLE = "UPDATE products SET stock = stock - $2 WHERE id = $1 AND stock >= $2 RETURNING stock"
+LOCK_PRODUCTS = "SELECT id, stock FROM products WHERE id = ANY($1::bigint[]) ORDER BY id FOR UPDATE"
+DECREMENT = "UPDATE products SET stock = stock - $2 WHERE id = $1"
+LOCK_WAITERS = """
+SELECT wait_event FROM pg_stat_activity
+WHERE datname = current_database() AND wait_event_type = 'Lock' AND pid <> pg_backend_pid()
+"""
+INVENTORY = """
+SELECT p.id, p.name, p.stock, COALESCE(a.sales_count, 0) AS sales_count, COALESCE(o.sold, 0) AS sold
+FROM products p
+LEFT JOIN product_analytics a ON a.product_id = p.id
+LEFT JOIN (
+    SELECT (line->'product'->>'id')::bigint AS product_id, SUM((line->>'quantity')::int) AS sold
+    FROM orders, jsonb_array_elements(items) AS line
+    GROUP BY 1
+) o ON o.product_id = p.id
+ORDER BY p.id
+"""
+
+PLACED = "placed"
+SOLD_OUT = "sold out"
+
+Cart = List[Tuple[int, int]]  # (product id, quantity), ascending product id
+
+
+@dataclass
+class Sku:
+    id: int
+    name: str
+    price: Decimal
+    stock: int
+
+
+class _SoldOut(Exception):
+    pass
+
+
+async def _place_order(conn, customer: int, cart: Cart, skus: Dict[int, Sku]):
+    items = [{"product": {"id": pid, "name": skus[pid].name, "price": float(skus[pid].price)}, "quantity": qty}
+             for pid, qty in cart]
+    total = sum(skus[pid].price * qty for pid, qty in cart)
+    await conn.fetchval(INSERT_ORDER, f"Customer {customer}", f"customer{customer}@example.com",
+                        f"05{customer:08d}", json.dumps(items), total)
+    for pid, qty in cart:
+        await conn.execute(INCREMENT_SALES, pid, qty)
+
+
+async def checkout_app(conn, customer: int, cart: Cart, skus: Dict[int, Sku]) -> str:
+    await _place_order(conn, customer, cart, skus)
+    return PLACED
+
+
+async def checkout_conditional(conn, customer: int, cart: Cart, skus: Dict[int, Sku]) -> str:
+    try:
+        async with conn.transaction():
+            for pid, qty in cart:
+                if await conn.fetchval(DECREMENT_IF_AVAILABLE, pid, qty) is None:
+                    raise _SoldOut
+            await _place_order(conn, customer, cart, skus)
+    except _SoldOut:
+        return SOLD_OUT
+    return PLACED
+
+
+async def checkout_for_update(conn, customer: int, cart: Cart, skus: Dict[int, Sku]) -> str:
+    try:
+        async with conn.transaction():
+            stock = {r["id"]: r["stock"] for r in await conn.fetch(LOCK_PRODUCTS, [pid for pid, _ in cart])}
+            if any(stock[pid] < qty for pid, qty in cart):
+                raise _SoldOut
+            await conn.executemany(DECREMENT, cart)
+            await _place_order(conn, customer, cart, skus)
+    except _SoldOut:
+        return SOLD_OUT
+    return PLACED
+
+
+STRATEGIES: Dict[str, Callable[..., Awaitable[str]]] = {
+    "app": checkout_app,
+    "conditional": checkout_conditional,
+    "for-update": checkout_for_update,
+}
+
+
+async def setup_schema(conn, skus: int, stock: int) -> List[Sku]:
+    """Recreate the scratch schema with ``skus`` products of ``stock`` units each."""
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}")
+    await conn.execute(BASE_DDL)
+    seeded = []
+    for i in range(skus):
+        source = CATALOG[i % len(CATALOG)]
+        name = source["name"] if i < len(CATALOG) else f"{source['name']} #{i + 1}"
+        price = Decimal(str(source["price"]))
+        row = await conn.fetchrow(
+            "INSERT INTO products (name, price, stock, category) VALUES ($1, $2, $3, $4) RETURNING id",
+            name, price, stock, source["category"],
+        )
+        seeded.append(Sku(row["id"], name, price, stock))
+    for path in SCHEMA_FILES:
+        await conn.execute(path.read_text(encoding="utf-8"))
+    return seeded
+
+
+@dataclass
+class LockWaits:
+    samples: int = 0
+    waiting: List[int] = field(default_factory=list)  # backends waiting on a lock, per sample
+    events: Counter = field(default_factory=Counter)  # wait_event -> backend-samples
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "share_waiting": sum(1 for n in self.waiting if n) / self.samples if self.samples else 0.0,
+            "mean_waiting": sum(self.waiting) / self.samples if self.samples else 0.0,
+            "max_waiting": max(self.waiting, default=0),
+            "events": dict(self.events.most_common()),
+        }
+
+
+async def sample_lock_waits(conn, stop: asyncio.Event, interval: float) -> LockWaits:
+    waits = LockWaits()
+    while not stop.is_set():
+        rows = await conn.fetch(LOCK_WAITERS)
+        waits.samples += 1
+        waits.waiting.append(len(rows))
+        waits.events.update(r["wait_event"] for r in rows)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+    return waits
+
+
+@dataclass
+class Run:
+    strategy: str
+    elapsed: float = 0.0
+    outcomes: Counter = field(default_factory=Counter)
+    latency_ms: List[float] = field(default_factory=list)
+    pool_wait_ms: List[float] = field(default_factory=list)
+    lock_waits: LockWaits = field(default_factory=LockWaits)
+    orders: int = 0
+    inventory: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def violations(self) -> int:
+        return sum(1 for p in self.inventory if p["oversold"] or p["stock drift"] or p["sales drift"])
+
+    def row(self) -> Dict[str, Any]:
+        latency, pool_wait = summarize(self.latency_ms), summarize(self.pool_wait_ms)
+        waits = self.lock_waits.to_dict()
+        errors = sum(n for outcome, n in self.outcomes.items() if outcome not in (PLACED, SOLD_OUT))
+        return {
+            "strategy": self.strategy,
+            "placed": self.outcomes.get(PLACED, 0),
+            "sold out": self.outcomes.get(SOLD_OUT, 0),
+            "errors": errors,
+            "orders": self.orders,
+            "orders/s": self.outcomes.get(PLACED, 0) / self.elapsed if self.elapsed else 0.0,
+            "p50": latency.p50,
+            "p95": latency.p95,
+            "p99": latency.p99,
+            "max": latency.max,
+            "pool p95": pool_wait.p95,
+            "lock wait %": 100 * waits["share_waiting"],
+            "max waiting": waits["max_waiting"],
+            "violations": self.violations,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.row(),
+            "elapsed": self.elapsed,
+            "outcomes": dict(self.outcomes),
+            "latency": summarize(self.latency_ms).to_dict(),
+            "pool_wait": summarize(self.pool_wait_ms).to_dict(),
+            "lock_waits": self.lock_waits.to_dict(),
+            "inventory": self.inventory,
+        }
+
+
+def random_carts(skus: Sequence[Sku], checkouts: int, max_lines: int, max_quantity: int, seed: int) -> List[Cart]:
+    rng = random.Random(seed)
+    carts = []
+    for _ in range(checkouts):
+        lines = rng.sample(list(skus), rng.randint(1, min(max_lines, len(skus))))
+        carts.append(sorted((s.id, rng.randint(1, max_quantity)) for s in lines))
+    return carts
+
+
+async def check_inventory(conn, skus: Sequence[Sku]) -> List[Dict[str, Any]]:
+    initial = {s.id: s.stock for s in skus}
+    rows = []
+    for r in await conn.fetch(INVENTORY):
+        start, sold = initial[r["id"]], int(r["sold"])
+        rows.append({
+            "product": r["name"],
+            "initial": start,
+            "sold": sold,
+            "stock": r["stock"],
+            "sales_count": int(r["sales_count"]),
+            "oversold": max(0, sold - start),
+            "stock drift": r["stock"] - (start - sold),
+            "sales drift": int(r["sales_count"]) - sold,
+        })
+    return rows
+
+
+async def run_strategy(args, strategy: str) -> Run:
+    import asyncpg
+
+    loop = asyncio.get_running_loop()
+    settings = {"search_path": SCHEMA}
+    admin = await asyncpg.connect(args.dsn, server_settings=settings)
+    try:
+        skus = await setup_schema(admin, args.skus, args.stock)
+        carts = random_carts(skus, args.checkouts, args.max_lines, args.max_quantity, args.seed)
+        by_id = {s.id: s for s in skus}
+        checkout = STRATEGIES[strategy]
+        run = Run(strategy)
+        gate = asyncio.Event()
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async with asyncpg.create_pool(args.dsn, min_size=args.connections, max_size=args.connections,
+                                       server_settings=settings) as pool:
+            async def customer(number: int, cart: Cart):
+                await gate.wait()
+                async with slots:
+                    started = loop.time()
+                    try:
+                        async with pool.acquire() as conn:
+                            run.pool_wait_ms.append((loop.time() - started) * 1000)
+                            outcome = await checkout(conn, number, cart, by_id)
+                    except Exception as exc:  # deadlocks, serialization failures: counted, not raised
+                        outcome = type(exc).__name__
+                    run.outcomes[outcome] += 1
+                    run.latency_ms.append((loop.time() - started) * 1000)
+
+            customers = [asyncio.ensure_future(customer(i, cart)) for i, cart in enumerate(carts)]
+            stop = asyncio.Event()
+            sampler = asyncio.ensure_future(sample_lock_waits(admin, stop, args.sample_interval))
+            started = loop.time()
+            gate.set()
+            await asyncio.gather(*customers)
+            run.elapsed = loop.time() - started
+            stop.set()
+            run.lock_waits = await sampler
+
+        run.orders = await admin.fetchval("SELECT count(*) FROM orders")
+        run.inventory = await check_inventory(admin, skus)
+        return run
+    finally:
+        await admin.close()
+
+
+RUN_COLUMNS = (
+    "strategy", "placed", "sold out", "errors", "orders", "orders/s", "p50", "p95", "p99", "max",
+    "pool p95", "lock wait %", "max waiting", "violations",
+)
+INVENTORY_COLUMNS = ("strategy", "product", "initial", "sold", "stock", "sales_count", "oversold", "stock drift", "sales drift")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness.checkout_contention", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dsn", default=PG_DSN, help="Postgres to create the scratch schema in")
+    parser.add_argument("--strategy", default=",".join(STRATEGIES),
+                        help=f"comma-separated, each run on a fresh schema (of {', '.join(STRATEGIES)})")
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200, help="checkouts in flight at once")
+    parser.add_argument("--connections", type=int, default=20, help="pool size")
+    parser.add_argument("--skus", type=int, default=3, help="products on sale")
+    parser.add_argument("--stock", type=int, default=50, help="starting stock of each product")
+    parser.add_argument("--max-lines", type=int, default=2, help="most distinct products in one cart")
+    parser.add_argument("--max-quantity", type=int, default=2, help="most units of a product in one cart")
+    parser.add_argument("--sample-interval", type=float, default=0.01, help="seconds between lock-wait samples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="JSON report path (default: tmp/bench/checkout-<time>.json)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    strategies = [s.strip() for s in args.strategy.split(",") if s.strip()]
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategy {', '.join(unknown)}; expected {', '.join(STRATEGIES)}")
+    try:
+        import asyncpg  # noqa: F401
+    except ImportError:
+        parser.error("asyncpg is required: pip install asyncpg")
+
+    runs = [asyncio.run(run_strategy(args, strategy)) for strategy in strategies]
+
+    print(format_table([run.row() for run in runs], RUN_COLUMNS))
+    print()
+    print(format_table([{"strategy": run.strategy, **p} for run in runs for p in run.inventory], INVENTORY_COLUMNS))
+    print(f"{args.checkouts} checkouts of {args.skus} SKUs x {args.stock} units, "
+          f"{args.concurrency} in flight over {args.connections} connections")
+    out = args.out or BENCH_DIR / f"checkout-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {"settings": {k: v for k, v in vars(args).items() if k not in ("dsn", "out")},
+              "runs": [run.to_dict() for run in runs]}
+    out.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    print(f"report: {out}")
+    return 1 if any(run.violations for run in runs) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+"""Environment preflight and failure classification for the runner.
+
+TestSprite's remote ``run_with_retry`` execs each case and retries it
+whatever went wrong, so a missing ``playwright`` module costs every case
+its full retry budget. The runner instead checks once, before any shard
+starts, what the selected cases need:
+
+* ``playwright`` importable;
+* the browser binaries downloaded (``playwright install``), for every
+  engine of the matrix;
+* the app answering at ``BASE_URL``.
+
+Cases whose requirement is missing are recorded as ``environment`` failures
+without being launched. A failure from a case that did run is classified
+from its report: only ``timeout`` and ``transient`` failures are retried.
+"""
+import ast
+import importlib.util
+import re
+import socket
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Set
+from urllib.parse import urlsplit
+
+from harness.config import BASE_URL
+from harness.matrix import DEFAULT_TARGET, Target, resolve, targets_from_env
+
+PLAYWRIGHT = "playwright"
+BROWSER = "browser"
+APP = "app"
+
+# Fixtures (conftest.py) that start a browser and load BASE_URL
+BROWSER_FIXTURES = {
+    "browser_pool", "browser", "context", "page", "page_perf", "async_browser_pool", "role_context", "admin_page",
+    "browser_target", "device_options", "throttle_profile",
+}
+
+ENVIRONMENT = "environment"
+TIMEOUT = "timeout"
+TRANSIENT = "transient"
+ASSERTION = "assertion"
+ERROR = "error"
+
+RETRYABLE = {TIMEOUT, TRANSIENT}
+
+_EXCEPTION_TYPE = re.compile(r"^E\s+([\w.]+(?:Error|Exception|Timeout|timeout))\b", re.MULTILINE)
+_BARE_ASSERT = re.compile(r"^E\s+assert\b", re.MULTILINE)
+_ENVIRONMENT_TYPES = {"ModuleNotFoundError", "ImportError", "ConnectionRefusedError"}
+_ENVIRONMENT_TEXT = re.compile(
+    r"Executable doesn't exist|playwright install|net::ERR_CONNECTION_REFUSED|ECONNREFUSED|No module named"
+)
+_TRANSIENT_TEXT = re.compile(
+    r"Target page, context or browser has been closed|Target closed|net::ERR_(?:NETWORK_CHANGED|CONNECTION_RESET|EMPTY_RESPONSE)"
+    r"|ECONNRESET|Connection reset by peer|RemoteDisconnected|Navigation failed because page crashed"
+)
+
+
+@dataclass
+class Check:
+    name: str
+    ok: bool
+    detail: str = ""
+
+    def __str__(self) -> str:
+        return f"{'ok' if self.ok else 'FAILED'}  {self.name}" + (f": {self.detail}" if self.detail else "")
+
+
+def case_requirements(path: Path) -> Set[str]:
+    """What ``path`` needs from the environment, from the fixtures its functions request."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    requested = {
+        arg.arg
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        for arg in node.args.args
+    }
+    return {PLAYWRIGHT, BROWSER, APP} if requested & BROWSER_FIXTURES else set()
+
+
+def check_playwright() -> Check:
+    if importlib.util.find_spec("playwright") is None:
+        return Check(PLAYWRIGHT, False, "No module named 'playwright' (pip install playwright)")
+    return Check(PLAYWRIGHT, True)
+
+
+def check_browser(targets: Sequence[Target] = (DEFAULT_TARGET,)) -> Check:
+    """Every engine the matrix ``targets`` resolve to is downloaded."""
+    from playwright.sync_api import sync_playwright
+
+    missing, found = [], []
+    with sync_playwright() as p:
+        for engine in sorted({resolve(t, p.devices)[0] for t in targets}):
+            executable = Path(getattr(p, engine).executable_path)
+            (found if executable.exists() else missing).append((engine, executable))
+    if missing:
+        engines = " ".join(e for e, _ in missing)
+        return Check(BROWSER, False, f"{', '.join(str(x) for _, x in missing)} missing (python -m playwright install {engines})")
+    return Check(BROWSER, True, ", ".join(e for e, _ in found))
+
+
+def check_app(base_url: str = BASE_URL, timeout: float = 2.0) -> Check:
+    url = urlsplit(base_url)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    try:
+        socket.create_connection((url.hostname, port), timeout=timeout).close()
+    except OSError as exc:
+        return Check(APP, False, f"{base_url} is not reachable ({exc}); start the app, pass --serve or set TESTSPRITE_BASE_URL")
+    return Check(APP, True, base_url)
+
+
+def preflight(requirements: Iterable[str], base_url: str = BASE_URL) -> Dict[str, Check]:
+    """Run the checks for ``requirements`` once; a browser is only checked if playwright imports."""
+    needed = set(requirements)
+    checks: Dict[str, Check] = {}
+    if PLAYWRIGHT in needed or BROWSER in needed:
+        checks[PLAYWRIGHT] = check_playwright()
+    if BROWSER in needed:
+        targets = targets_from_env() or [DEFAULT_TARGET]
+        checks[BROWSER] = check_browser(targets) if checks[PLAYWRIGHT].ok else Check(BROWSER, False, "playwright is missing")
+    if APP in needed:
+        checks[APP] = check_app(base_url)
+    return checks
+
+
+def failed_requirements(requirements: Set[str], checks: Dict[str, Check]) -> List[Check]:
+    return [checks[r] for r in sorted(requirements) if r in checks and not checks[r].ok]
+
+
+def classify_failure(error: str) -> str:
+    """Failure class of a pytest report: environment, timeout, transient, assertion or error."""
+    types = {name.rsplit(".", 1)[-1] for name in _EXCEPTION_TYPE.findall(error)}
+    if types & _ENVIRONMENT_TYPES or _ENVIRONMENT_TEXT.search(error):
+        return ENVIRONMENT
+    if any(t.lower().endswith("timeout") or t == "TimeoutError" for t in types):
+        return TIMEOUT
+    if _TRANSIENT_TEXT.search(error):
+        return TRANSIENT
+    if "AssertionError" in types or _BARE_ASSERT.search(error):
+        return ASSERTION
+    return ERROR
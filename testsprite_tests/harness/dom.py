@@ -0,0 +1,91 @@
+"""Bulk DOM extraction.
+
+Reading a product card through element handles costs a round trip per
+``query_selector``, ``inner_text`` and ``get_attribute``, about nine per
+card. These helpers describe the wanted fields once and pull a whole
+grid, or a whole detail page, back in one ``evaluate``. Comparison
+against fixture data then happens in Python.
+
+A :class:`Field` reads from the first element matching ``selector``, or
+from every match with ``many=True``. The selector is resolved against
+the record root, and ``:scope`` means the root itself (``<body>`` when the
+root is the whole document). ``value`` is one of:
+
+* ``"text"``: ``innerText``, whitespace-trimmed, as Playwright's
+  ``inner_text().strip()``;
+* ``"@name"``: the ``name`` attribute;
+* ``"visible"``: Playwright's notion of visible (a non-empty box and
+  not ``visibility: hidden``).
+
+Missing elements read as ``None`` (``[]`` for ``many``).
+"""
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+
+class Field(NamedTuple):
+    selector: str
+    value: str = "text"
+    many: bool = False
+
+
+_READ_FIELDS = """
+const visible = el => {
+  const rect = el.getBoundingClientRect();
+  return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+};
+const read = (el, value) => {
+  if (value === 'text') return el.innerText.trim();
+  if (value === 'visible') return visible(el);
+  return el.getAttribute(value.slice(1));
+};
+const record = (root, fields) => {
+  const out = {};
+  for (const [name, selector, value, many] of fields) {
+    if (many) {
+      out[name] = [...root.querySelectorAll(selector)].map(el => read(el, value));
+    } else {
+      // the document itself has no innerText or attributes; its :scope is the body
+      const self = root === document ? document.body : root;
+      const el = selector === ':scope' ? self : root.querySelector(selector);
+      out[name] = el ? read(el, value) : null;
+    }
+  }
+  return out;
+};
+"""
+
+RECORDS_SCRIPT = "(elements, fields) => {" + _READ_FIELDS + "return elements.map(el => record(el, fields)); }"
+
+RECORD_SCRIPT = "([rootSelector, fields]) => {" + _READ_FIELDS + """
+const root = rootSelector ? document.querySelector(rootSelector) : document;
+return root ? record(root, fields) : null;
+}"""
+
+
+def _wire(fields: Mapping[str, Field]) -> List[list]:
+    return [[name, *Field(*field)] for name, field in fields.items()]
+
+
+def extract_records(page, item_selector: str, fields: Mapping[str, Field]) -> List[Dict[str, Any]]:
+    """One record per element matching ``item_selector``, in document order."""
+    return page.eval_on_selector_all(item_selector, RECORDS_SCRIPT, _wire(fields))
+
+
+def extract_record(page, fields: Mapping[str, Field], root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """A single record read from ``root`` (default: the whole document)."""
+    return page.evaluate(RECORD_SCRIPT, [root, _wire(fields)])
+
+
+def diff_records(
+    actual: List[Mapping[str, Any]], expected: List[Mapping[str, Any]], keys: Iterable[str], label: str = "record"
+) -> List[str]:
+    """Human-readable mismatches between extracted and expected records, compared on ``keys``."""
+    keys = list(keys)
+    problems = []
+    if len(actual) != len(expected):
+        problems.append(f"expected {len(expected)} {label}s, found {len(actual)}")
+    for i, (got, want) in enumerate(zip(actual, expected), start=1):
+        for key in keys:
+            if got.get(key) != want.get(key):
+                problems.append(f"{label} {i} {key}: expected {want.get(key)!r}, got {got.get(key)!r}")
+    return problems
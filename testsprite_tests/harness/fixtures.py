@@ -0,0 +1,224 @@
+"""Canned backend data shared by the TC cases.
+
+Payload shapes follow the real route handlers under ``app/api`` (e.g. the
+admin list endpoints return ``{rows, total, page, pageSize}``) so the same
+data can back both Playwright route mocks and the local stub server.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from harness.mock_api import MockApi
+
+PRODUCTS = [
+    {
+        "id": "p1",
+        "name": "Luxury Stroller Model A",
+        "description": "Elegant and comfortable baby stroller with premium materials.",
+        "price": "$1299.99",
+        "image_url": "/images/stroller_a.jpg",
+    },
+    {
+        "id": "p2",
+        "name": "Luxury Stroller Model B",
+        "description": "Stylish stroller with advanced suspension for smooth rides.",
+        "price": "$1599.99",
+        "image_url": "/images/stroller_b.jpg",
+    },
+    {
+        "id": "p3",
+        "name": "Luxury Stroller Model C",
+        "description": "Compact and lightweight stroller designed for city use.",
+        "price": "$999.99",
+        "image_url": "/images/stroller_c.jpg",
+    },
+]
+
+PRODUCT_DETAIL = {
+    "id": "stroller123",
+    "name": "Luxury Baby Stroller",
+    "description": "A premium stroller with superior comfort and safety features.",
+    "price": 999.99,
+    "currency": "USD",
+    "images": [
+        "https://example.com/images/stroller123-front.jpg",
+        "https://example.com/images/stroller123-side.jpg",
+    ],
+    "specifications": {
+        "weight": "15kg",
+        "max_load": "22kg",
+        "foldable": True,
+        "material": "Aluminum frame",
+        "wheels": "All-terrain rubber",
+    },
+}
+
+ORDERS = [
+    {
+        "id": "order123",
+        "created_at": "2026-01-30T10:15:00.000Z",
+        "customer_name": "Jane Doe",
+        "email": "jane@example.com",
+        "phone": "555-123-4567",
+        "status": "pending",
+        "payment_status": "unpaid",
+        "payment_method": "cod",
+        "items": [
+            {"productId": "prod1", "quantity": 2},
+            {"productId": "prod2", "quantity": 1},
+        ],
+        "total_amount": 299.99,
+    },
+    {
+        "id": "order456",
+        "created_at": "2026-01-29T16:40:00.000Z",
+        "customer_name": "John Smith",
+        "email": "john@example.com",
+        "phone": "555-987-6543",
+        "status": "shipped",
+        "payment_status": "paid",
+        "payment_method": "card",
+        "items": [
+            {"productId": "prod3", "quantity": 1},
+        ],
+        "total_amount": 149.99,
+    },
+]
+
+UPDATED_ORDER = dict(ORDERS[0], status="processing")
+
+ADMIN_USER = {"id": "admin-1", "email": "admin@example.com", "role": "admin"}
+
+# Accounts known to the local stub backend (harness.stub_server)
+ADMIN_CREDENTIALS = {"email": "admin@example.com", "password": "AdminPassw0rd!"}
+CUSTOMER_CREDENTIALS = {"email": "registereduser@example.com", "password": "ValidPassword123!"}
+
+# Rows in the shape of the Supabase ``products`` table, as the admin routes return them
+CATALOG = [
+    {
+        "id": "stroller-001",
+        "name": "Luxury Baby Stroller Model X",
+        "name_ar": None,
+        "price": 999.99,
+        "description": "Premium travel system with reversible seat.",
+        "images": ["/products/kidilo-k8/black-open.jpg"],
+        "category": "strollers-gear",
+        "stock": 12,
+        "stockQuantity": 12,
+        "stockStatus": "in-stock",
+        "sales_count": 0,
+        "created_at": "2026-01-10T09:00:00.000Z",
+    },
+    {
+        "id": "stroller-002",
+        "name": "Compact City Stroller",
+        "name_ar": None,
+        "price": 549.5,
+        "description": "Lightweight one-hand fold stroller.",
+        "images": ["/products/kidilo-k8/khaki-open.jpg"],
+        "category": "strollers-gear",
+        "stock": 3,
+        "stockQuantity": 3,
+        "stockStatus": "in-stock",
+        "sales_count": 0,
+        "created_at": "2026-01-12T09:00:00.000Z",
+    },
+    {
+        "id": "feeding-001",
+        "name": "Anti-Colic Bottle Set",
+        "name_ar": None,
+        "price": 24.99,
+        "description": "",
+        "images": None,
+        "category": "feeding",
+        "stock": 40,
+        "stockQuantity": 40,
+        "stockStatus": "in-stock",
+        "sales_count": 0,
+        "created_at": "2026-01-15T09:00:00.000Z",
+    },
+]
+
+CHECKOUT_RESULT = {"orderId": "12345", "status": "success", "message": "Order placed successfully"}
+
+
+def page_of(rows, page: int = 1, page_size: int = 25) -> dict:
+    """The ``{rows, total, page, pageSize}`` envelope of the admin list routes."""
+    start = (page - 1) * page_size
+    return {"rows": rows[start:start + page_size], "total": len(rows), "page": page, "pageSize": page_size}
+
+
+ORDER_STATUSES = ("pending", "processing", "shipped", "delivered", "cancelled")
+PAYMENT_METHODS = ("cod", "card", "wallet")
+CATEGORIES = ("strollers-gear", "feeding", "nursery", "toys", "bath", "clothing")
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def synthetic_products(count: int, seed: int = 0) -> List[dict]:
+    """``count`` CATALOG-shaped rows with deterministic, varied values, for load runs."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        stock = rng.choice((0, 2, 4, 10, 25, 60))
+        rows.append({
+            "id": f"prod-{i:06d}",
+            "name": f"Product {i:06d}",
+            "name_ar": None,
+            "price": round(rng.uniform(50, 5000), 2),
+            "description": "" if i % 17 == 0 else f"Synthetic product {i}",
+            "images": None if i % 23 == 0 else [f"/products/synthetic/{i}.jpg"],
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "stock": stock,
+            "stockQuantity": stock,
+            "stockStatus": "in-stock" if stock else "out-of-stock",
+            "sales_count": rng.randrange(500),
+            "created_at": _iso(start + timedelta(minutes=i * 7)),
+        })
+    return rows
+
+
+def synthetic_orders(count: int, seed: int = 0, now: Optional[datetime] = None) -> List[dict]:
+    """``count`` ORDERS-shaped rows spread over the 365 days before ``now``."""
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    rows = []
+    for i in range(count):
+        created = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        quantity = rng.randint(1, 3)
+        status = rng.choice(ORDER_STATUSES)
+        rows.append({
+            "id": f"{100000 + i}",
+            "created_at": _iso(created),
+            "customer_name": f"Customer {i}",
+            "email": f"customer{i}@example.com",
+            "phone": f"010{i:08d}",
+            "status": status,
+            "payment_status": "paid" if status in ("shipped", "delivered") else "unpaid",
+            "payment_method": rng.choice(PAYMENT_METHODS),
+            "items": [{"productId": f"prod-{rng.randrange(1000):06d}", "quantity": quantity}],
+            "total_amount": round(rng.uniform(50, 5000) * quantity, 2),
+        })
+    return rows
+
+
+def default_mock_api() -> MockApi:
+    """Registry with every canned endpoint the suite knows about."""
+    api = MockApi()
+    # storefront
+    api.register("GET", "/api/products", {"products": PRODUCTS})
+    api.register("GET", "/api/products/{id}", PRODUCT_DETAIL)
+    api.register("POST", "/api/checkout", CHECKOUT_RESULT)
+    # admin
+    api.register("POST", "/api/admin/login", {"success": True, "user": ADMIN_USER, "session": None})
+    api.register("GET", "/api/admin/products", page_of([], page_size=50))
+    api.register("POST", "/api/admin/products", {"product": {"id": "new-product"}}, status=201)
+    api.register("PATCH", "/api/admin/products/{id}", {"product": {"id": "new-product"}})
+    api.register("DELETE", "/api/admin/products/{id}", {"message": "Product deleted successfully"})
+    api.register("GET", "/api/admin/orders", page_of(ORDERS))
+    api.register("GET", "/api/admin/orders/{id}", ORDERS[0])
+    api.register("PATCH", "/api/admin/orders/{id}", {"message": "Order updated successfully", "order": UPDATED_ORDER})
+    return api
@@ -0,0 +1,136 @@
+"""Pick the TC cases a change can affect.
+
+Two mappings are used. ``tmp/code_summary.json`` maps each feature (Home
+Page, Shop Page, ...) to source files. Each plan entry's ``features`` list
+maps a TC to the features it exercises. A changed file therefore selects
+every TC whose features own it, and a changed ``TC*.py`` selects itself.
+
+The selection is conservative:
+
+* a changed file no feature owns (shared components, config, the harness
+  itself) triggers a full run;
+* a TC without a ``features`` entry is always selected;
+* documentation-only changes, and changes to the harness's own unit
+  tests (``harness/tests``), select nothing.
+
+code_summary.json still lists the pre-Next.js ``src/pages/*`` paths. Those
+views now live in ``src/views/*``, so a listed file that no longer exists
+is resolved there. :data:`FEATURE_ROUTES` adds the Next.js route and
+component directories that render each feature.
+"""
+import json
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from harness.config import CODE_SUMMARY_PATH, REPO_ROOT, SUITE_DIR
+from harness.plan import case_id, load_plan
+
+FEATURES_KEY = "features"
+
+# Path prefixes (a trailing "/" means a directory) rendered by each feature, beyond code_summary.json.
+FEATURE_ROUTES: Dict[str, List[str]] = {
+    "Home Page": ["app/[locale]/page.tsx", "src/components/home/"],
+    "Shop Page": ["app/[locale]/shop/", "src/components/shop/"],
+    "Product Details": ["app/[locale]/product/", "src/components/product/",
+                        "src/components/ProductReviews.tsx", "src/components/RelatedProducts.tsx"],
+    "Cart": ["app/[locale]/cart/", "src/components/cart/"],
+    "Checkout": ["app/[locale]/checkout/", "src/views/CheckoutSuccessPage.tsx"],
+    "Login": ["app/[locale]/login/", "app/[locale]/forgot-password/", "app/[locale]/reset-password/",
+              "src/views/ForgotPasswordPage.tsx", "src/views/ResetPasswordPage.tsx"],
+    "Register": ["app/[locale]/register/"],
+    "Admin Dashboard": ["app/admin/", "app/api/admin/", "src/components/admin/", "src/views/admin/",
+                        "src/components/AdminRoute.tsx"],
+}
+
+# Changes that cannot affect a browser or API case.
+IGNORED_SUFFIXES = (".md",)
+IGNORED_PREFIXES = ("testsprite_tests/tmp/", "testsprite_tests/harness/tests/", ".gitignore", "LICENSE")
+
+_MOVED_VIEWS = ("src/pages/", "src/views/")
+
+
+def _owns(prefix: str, path: str) -> bool:
+    return path.startswith(prefix) if prefix.endswith("/") else path == prefix
+
+
+def load_features(path: Path = CODE_SUMMARY_PATH, repo_root: Path = REPO_ROOT) -> Dict[str, List[str]]:
+    """Feature name -> owned path prefixes, from code_summary.json plus :data:`FEATURE_ROUTES`."""
+    features: Dict[str, List[str]] = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as fh:
+            for feature in json.load(fh).get("features", []):
+                files = []
+                for file in feature.get("files", []):
+                    old, new = _MOVED_VIEWS
+                    if not (repo_root / file).exists() and file.startswith(old):
+                        file = new + file[len(old):]
+                    files.append(file)
+                features[feature["name"]] = files
+    for name, prefixes in FEATURE_ROUTES.items():
+        features.setdefault(name, []).extend(prefixes)
+    return features
+
+
+def changed_files(base: str, repo_root: Path = REPO_ROOT) -> List[str]:
+    """Files changed since the merge base with ``base``, including uncommitted and untracked ones."""
+    def git(*args: str) -> List[str]:
+        out = subprocess.run(["git", *args], cwd=repo_root, check=True, capture_output=True, text=True).stdout
+        return [line for line in out.splitlines() if line]
+
+    merge_base = git("merge-base", base, "HEAD")[0]
+    return sorted(set(git("diff", "--name-only", merge_base)) | set(git("ls-files", "--others", "--exclude-standard")))
+
+
+@dataclass
+class Selection:
+    cases: Set[str]
+    full: bool = False
+    features: Set[str] = field(default_factory=set)
+    unmapped: List[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        if self.full:
+            shown = ", ".join(self.unmapped[:5]) + (" ..." if len(self.unmapped) > 5 else "")
+            return f"full run: unmapped changes ({shown})"
+        if not self.cases:
+            return "no affected cases"
+        return f"features: {', '.join(sorted(self.features)) or 'none'}; cases: {', '.join(sorted(self.cases))}"
+
+
+def select_affected(
+    changed: Iterable[str],
+    plan: Optional[Dict[str, dict]] = None,
+    features: Optional[Dict[str, List[str]]] = None,
+    suite_dir: Path = SUITE_DIR,
+) -> Selection:
+    plan = load_plan() if plan is None else plan
+    features = load_features() if features is None else features
+    suite_prefix = suite_dir.relative_to(REPO_ROOT).as_posix() + "/" if suite_dir.is_relative_to(REPO_ROOT) else ""
+
+    selection = Selection(cases=set())
+    for path in changed:
+        if path.endswith(IGNORED_SUFFIXES) or path.startswith(IGNORED_PREFIXES):
+            continue
+        name = path[len(suite_prefix):] if suite_prefix and path.startswith(suite_prefix) else None
+        if name is not None and "/" not in name and name.startswith("TC") and name.endswith(".py"):
+            selection.cases.add(case_id(name))
+            continue
+        owners = {feature for feature, prefixes in features.items() if any(_owns(p, path) for p in prefixes)}
+        if owners:
+            selection.features |= owners
+        else:
+            selection.unmapped.append(path)
+
+    if selection.unmapped:
+        selection.full = True
+        selection.cases = set(plan)
+        return selection
+    if not selection.features and not selection.cases:
+        return selection
+    for tc, entry in plan.items():
+        wanted = entry.get(FEATURES_KEY)
+        if wanted is None or selection.features & set(wanted):
+            selection.cases.add(tc)
+    return selection
@@ -0,0 +1,80 @@
+"""Layout-settle detection for responsive checks.
+
+Instead of sleeping a fixed time after a navigation or viewport change,
+the page reports when it has gone ``quiet_frames`` animation frames in a
+row without a resize of the root, body or main landmark, a change in
+document height, or nodes being added, removed or re-texted. Attribute
+churn (carousels, transitions) is ignored unless it actually resizes
+something.
+
+Most resizes settle in a handful of frames (~50ms), and the wait is
+bounded by ``timeout_ms``. A page that never settles is reported with
+``settled=False`` rather than raising, so the caller's own assertions
+decide the outcome.
+"""
+from typing import TypedDict
+
+QUIET_FRAMES = 3
+SETTLE_TIMEOUT_MS = 2000
+
+SETTLE_SCRIPT = """
+({ quietFrames, timeoutMs }) => new Promise(resolve => {
+  const root = document.documentElement;
+  const start = performance.now();
+  let quiet = 0, frames = 0, dirty = false, done = false;
+  let height = root.scrollHeight;
+  const mark = () => { dirty = true; };
+  const resizes = new ResizeObserver(mark);
+  for (const el of [root, ...document.querySelectorAll('body, main, [role="main"]')]) resizes.observe(el);
+  const mutations = new MutationObserver(mark);
+  mutations.observe(root, { subtree: true, childList: true, characterData: true });
+  const finish = () => {
+    if (done) return;
+    done = true;
+    resizes.disconnect();
+    mutations.disconnect();
+    resolve({ settled: quiet >= quietFrames, frames, elapsedMs: performance.now() - start });
+  };
+  const tick = () => {
+    if (done) return;
+    frames++;
+    if (root.scrollHeight !== height) { height = root.scrollHeight; dirty = true; }
+    quiet = dirty ? 0 : quiet + 1;
+    dirty = false;
+    if (quiet >= quietFrames) finish(); else requestAnimationFrame(tick);
+  };
+  // rAF is throttled in background tabs; the timer still bounds the wait.
+  setTimeout(finish, timeoutMs);
+  requestAnimationFrame(tick);
+})
+"""
+
+
+class Settle(TypedDict):
+    settled: bool
+    frames: int
+    elapsedMs: float
+
+
+def _args(quiet_frames: int, timeout_ms: int) -> dict:
+    return {"quietFrames": quiet_frames, "timeoutMs": timeout_ms}
+
+
+def wait_for_layout_settle(page, quiet_frames: int = QUIET_FRAMES, timeout_ms: int = SETTLE_TIMEOUT_MS) -> Settle:
+    return page.evaluate(SETTLE_SCRIPT, _args(quiet_frames, timeout_ms))
+
+
+async def wait_for_layout_settle_async(
+    page, quiet_frames: int = QUIET_FRAMES, timeout_ms: int = SETTLE_TIMEOUT_MS
+) -> Settle:
+    return await page.evaluate(SETTLE_SCRIPT, _args(quiet_frames, timeout_ms))
+
+
+def set_viewport_and_settle(page, width: int, height: int, **settle) -> Settle:
+    page.set_viewport_size({"width": width, "height": height})
+    return wait_for_layout_settle(page, **settle)
+
+
+async def set_viewport_and_settle_async(page, width: int, height: int, **settle) -> Settle:
+    await page.set_viewport_size({"width": width, "height": height})
+    return await wait_for_layout_settle_async(page, **settle)
@@ -0,0 +1,309 @@
+"""Open-loop load generator for the admin list endpoints.
+
+``/api/admin/orders`` and ``/api/admin/products`` page with
+``select("*", {count: "exact"})`` plus ``range()``. That is an exact
+COUNT and an OFFSET scan on every request, so cost grows with page depth
+and table size. This drives them with a Poisson arrival process at a
+fixed offered rate. Requests are sent on schedule whether or not earlier
+ones have returned, so a slow server builds a queue rather than slowing
+the generator down. Latency is measured from the scheduled send time,
+which keeps that queueing visible instead of hiding it (coordinated
+omission).
+
+Against the in-process stand-in, seeded with synthetic rows::
+
+    python -m harness.loadgen --stub-orders 50000 --stub-products 10000 --rate 200 --duration 30
+
+Against ``next dev`` on a local Supabase (``supabase start``), signed in as
+admin through Supabase's password grant::
+
+    python -m harness.loadgen --base-url http://localhost:8080 --login --rate 50 --spoof-ips 64
+
+Results are grouped by endpoint and page depth. They are printed as a
+table and written as JSON under ``tmp/bench``.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from harness.aio_http import AsyncHttpPool
+from harness.config import BASE_URL, BENCH_DIR
+from harness.fixtures import (
+    ADMIN_CREDENTIALS, CATEGORIES, ORDER_STATUSES, PAYMENT_METHODS, synthetic_orders, synthetic_products,
+)
+from harness.stats import format_table, json_ready, summarize
+
+# Upper bounds of the page-depth buckets results are grouped by
+DEPTH_BUCKETS = (1, 10, 100, 1000)
+
+DAYS = "days"  # pseudo-parameter, expanded to from/to on created_at
+
+
+@dataclass
+class Endpoint:
+    """A GET endpoint and the values each query parameter is drawn from.
+
+    Every parameter is sampled independently and uniformly. ``None`` means
+    the parameter is left out.
+    """
+    path: str
+    weight: float
+    params: Dict[str, List[Any]] = field(default_factory=dict)
+
+    def sample(self, rng: random.Random, now: datetime) -> Dict[str, Any]:
+        chosen = {name: rng.choice(values) for name, values in self.params.items()}
+        days = chosen.pop(DAYS, None)
+        if days is not None:
+            chosen["from"] = _iso(now - timedelta(days=days))
+            chosen["to"] = _iso(now)
+        return {k: v for k, v in chosen.items() if v is not None}
+
+
+PAGES = [1, 2, 5, 10, 50, 100, 500, 1000, 2000]
+PAGE_SIZES = [25, 50, 100]
+
+DEFAULT_MIX = [
+    Endpoint("/api/admin/orders", 0.6, {
+        "page": PAGES,
+        "pageSize": PAGE_SIZES,
+        "status": [None, "all", *ORDER_STATUSES],
+        "payment_method": [None, None, *PAYMENT_METHODS],
+        DAYS: [None, 1, 7, 30, 90],
+        "sort": [None, "total_amount"],
+    }),
+    Endpoint("/api/admin/products", 0.4, {
+        "page": PAGES,
+        "pageSize": PAGE_SIZES,
+        "category": [None, None, *CATEGORIES],
+        "stock": [None, None, "low"],
+        "missing": [None, None, None, "true"],
+    }),
+]
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def load_mix(path: Path) -> List[Endpoint]:
+    with open(path, encoding="utf-8") as fh:
+        return [Endpoint(**entry) for entry in json.load(fh)]
+
+
+def depth_label(page: int) -> str:
+    lower = 1
+    for upper in DEPTH_BUCKETS:
+        if page <= upper:
+            return f"p{lower}" if lower == upper else f"p{lower}-{upper}"
+        lower = upper + 1
+    return f"p{lower}+"
+
+
+@dataclass
+class LoadResult:
+    offered_rate: float
+    duration: float
+    elapsed: float = 0.0
+    dropped: int = 0
+    samples: Dict[str, List[Tuple[float, Any]]] = field(default_factory=lambda: defaultdict(list))
+
+    def record(self, label: str, latency_ms: float, status: Any):
+        self.samples[label].append((latency_ms, status))
+
+    def rows(self) -> List[Dict[str, Any]]:
+        rows = []
+        everything = []
+        for label in sorted(self.samples, key=_label_order):
+            samples = self.samples[label]
+            everything += samples
+            rows.append(self._row(label, samples))
+        rows.append(self._row("all", everything))
+        return rows
+
+    def _row(self, label: str, samples: List[Tuple[float, Any]]) -> Dict[str, Any]:
+        statuses = Counter(status for _, status in samples)
+        ok = sum(n for s, n in statuses.items() if isinstance(s, int) and 200 <= s < 300)
+        limited = statuses.get(429, 0)
+        summary = summarize(latency for latency, _ in samples)
+        return {
+            "endpoint": label,
+            "requests": len(samples),
+            "ok": ok,
+            "429": limited,
+            "errors": len(samples) - ok - limited,
+            "rps": len(samples) / self.elapsed if self.elapsed else 0.0,
+            "p50": summary.p50,
+            "p95": summary.p95,
+            "p99": summary.p99,
+            "max": summary.max,
+            "statuses": {str(s): n for s, n in statuses.items()},
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "offered_rate": self.offered_rate,
+            "duration": self.duration,
+            "elapsed": self.elapsed,
+            "dropped": self.dropped,
+            "endpoints": self.rows(),
+        }
+
+
+def _label_order(label: str):
+    path, _, depth = label.rpartition(" ")
+    return path, int(depth.lstrip("p").split("-")[0].rstrip("+"))
+
+
+async def run_load(
+    pool: AsyncHttpPool,
+    mix: Sequence[Endpoint],
+    rate: float,
+    duration: float,
+    seed: int = 0,
+    max_inflight: int = 1000,
+    spoof_ips: int = 0,
+) -> LoadResult:
+    """Offer ``rate`` requests/second for ``duration`` seconds, open loop."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    weights = [e.weight for e in mix]
+    result = LoadResult(offered_rate=rate, duration=duration)
+    inflight = set()
+
+    async def fire(endpoint: Endpoint, params: Dict[str, Any], scheduled: float, headers: Dict[str, str]):
+        try:
+            status: Any = (await pool.get(endpoint.path, params=params, headers=headers)).status
+        except Exception as exc:  # a failed request is a data point, not a crash
+            status = type(exc).__name__
+        label = f"{endpoint.path} {depth_label(int(params.get('page', 1)))}"
+        result.record(label, (loop.time() - scheduled) * 1000, status)
+
+    started = loop.time()
+    offset = 0.0
+    sent = 0
+    while True:
+        offset += rng.expovariate(rate)
+        if offset >= duration:
+            break
+        scheduled = started + offset
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(inflight) >= max_inflight:
+            result.dropped += 1
+            continue
+        endpoint = rng.choices(mix, weights)[0]
+        headers = {}
+        if spoof_ips:
+            # apiRateLimiter keys on x-forwarded-for; spread load over N clients
+            ip = sent % spoof_ips
+            headers["X-Forwarded-For"] = f"10.77.{ip // 256}.{ip % 256}"
+        sent += 1
+        task = asyncio.ensure_future(fire(endpoint, endpoint.sample(rng, datetime.now(timezone.utc)), scheduled, headers))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+    if inflight:
+        await asyncio.gather(*inflight)
+    result.elapsed = loop.time() - started
+    return result
+
+
+async def admin_login(pool: AsyncHttpPool, email: str, password: str, supabase: Optional[str] = None):
+    """Sign in as admin and keep the session in ``pool``'s cookie jar.
+
+    ``POST /api/admin/login`` is no use here: ``middleware.ts`` answers 401
+    to it without a session, and it returns the session as JSON rather than
+    setting a cookie. This takes Supabase's password grant instead (from
+    ``supabase``, default ``NEXT_PUBLIC_SUPABASE_URL``) and sends the
+    session as the ``sb-<ref>-auth-token`` cookie that ``@supabase/ssr``
+    reads.
+    """
+    from harness.auth_state import admin_session, session_cookies, supabase_url
+
+    supabase = supabase or supabase_url()
+    credentials = {"email": email, "password": password}
+    session = await asyncio.get_running_loop().run_in_executor(
+        None, admin_session, credentials, pool.base_url, supabase,
+    )
+    for cookie in session_cookies(session, supabase, pool.base_url):
+        pool.cookies[cookie["name"]] = cookie["value"]
+
+
+TABLE_COLUMNS = ("endpoint", "requests", "ok", "429", "errors", "rps", "p50", "p95", "p99", "max")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness.loadgen", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--rate", type=float, default=50.0, help="offered requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--mix", type=Path, help="JSON list of {path, weight, params} (default: orders/products mix)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--max-inflight", type=int, default=1000,
+                        help="arrivals beyond this many outstanding requests are dropped and counted")
+    parser.add_argument("--spoof-ips", type=int, default=0,
+                        help="rotate X-Forwarded-For over N addresses (0: one client, rate limiter applies)")
+    parser.add_argument("--login", action="store_true",
+                        help="sign in as admin through Supabase's password grant first")
+    parser.add_argument("--supabase-url", help="for --login (default: NEXT_PUBLIC_SUPABASE_URL)")
+    parser.add_argument("--email", default=ADMIN_CREDENTIALS["email"])
+    parser.add_argument("--password", default=ADMIN_CREDENTIALS["password"])
+    parser.add_argument("--cookie", help="raw Cookie header for an existing admin session")
+    parser.add_argument("--stub-orders", type=int, help="serve from the in-process stand-in with N synthetic orders")
+    parser.add_argument("--stub-products", type=int, default=1000, help="synthetic products for --stub-orders")
+    parser.add_argument("--out", type=Path, help="JSON report path (default: tmp/bench/loadgen-<time>.json)")
+    return parser
+
+
+async def _drive(args, base_url: str) -> LoadResult:
+    headers = {"Cookie": args.cookie} if args.cookie else {}
+    async with AsyncHttpPool(base_url, max_connections=args.connections, headers=headers) as pool:
+        if args.login:
+            await admin_login(pool, args.email, args.password, args.supabase_url)
+        return await run_load(pool, args.mix, args.rate, args.duration, args.seed, args.max_inflight, args.spoof_ips)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.mix = load_mix(args.mix) if args.mix else DEFAULT_MIX
+
+    server = None
+    base_url = args.base_url
+    if args.stub_orders is not None:
+        from harness.stub_server import StubServer
+
+        server = StubServer().start()
+        server.backend.load_tables(
+            products=synthetic_products(args.stub_products, args.seed),
+            orders=synthetic_orders(args.stub_orders, args.seed),
+        )
+        base_url = server.base_url
+        args.login = True
+        args.supabase_url = server.base_url  # the stand-in also answers the password grant
+    try:
+        result = asyncio.run(_drive(args, base_url))
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(format_table(result.rows(), TABLE_COLUMNS))
+    print(f"offered {args.rate:g} req/s for {args.duration:g}s against {base_url}; "
+          f"elapsed {result.elapsed:.1f}s, dropped {result.dropped}")
+    out = args.out or BENCH_DIR / f"loadgen-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = json_ready({"base_url": base_url, **result.to_dict()})  # empty buckets have no latencies
+    out.write_text(json.dumps(report, indent=2, allow_nan=False), encoding="utf-8")
+    print(f"report: {out}")
+    return 1 if result.rows()[-1]["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""Lock files in the same shape as TestSprite's ``tmp/execution.lock``.
+
+A lock is a JSON file holding ``pid``, ``startTime`` and ``functionName``,
+created with ``O_EXCL``. Locks whose owner is gone, or that are older than
+``STALE_AFTER``, are treated as stale and reclaimed.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+STALE_AFTER = timedelta(hours=6)
+
+
+class LockHeld(RuntimeError):
+    pass
+
+
+def utc_timestamp() -> str:
+    """ISO-8601 with milliseconds and a ``Z`` suffix, as TestSprite writes it."""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        # os.kill(pid, 0) terminates the process on Windows
+        import ctypes
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_lock(path: Path) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def lock_is_live(path: Path) -> bool:
+    info = read_lock(path)
+    if info is None:
+        return path.exists()
+    try:
+        started = datetime.fromisoformat(info["startTime"].replace("Z", "+00:00"))
+    except (KeyError, ValueError):
+        started = None
+    if started is not None and datetime.now(timezone.utc) - started > STALE_AFTER:
+        return False
+    return pid_alive(int(info.get("pid", 0)))
+
+
+def try_acquire(path: Path, function_name: str) -> bool:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if lock_is_live(path):
+                return False
+            path.unlink(missing_ok=True)
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"pid": os.getpid(), "startTime": utc_timestamp(), "functionName": function_name},
+                fh,
+                indent=2,
+            )
+        return True
+    return False
+
+
+def release(path: Path):
+    info = read_lock(path)
+    if info is not None and info.get("pid") != os.getpid():
+        return
+    path.unlink(missing_ok=True)
+
+
+@contextmanager
+def file_lock(path: Path, function_name: str, wait: float = 0.0, poll: float = 0.05) -> Iterator[Path]:
+    """Hold ``path`` for the duration of the block, waiting up to ``wait`` seconds."""
+    deadline = time.monotonic() + wait
+    while not try_acquire(path, function_name):
+        if time.monotonic() >= deadline:
+            raise LockHeld(f"{path} is held: {read_lock(path)}")
+        time.sleep(poll)
+    try:
+        yield path
+    finally:
+        release(path)
@@ -0,0 +1,78 @@
+"""Browser engine x device matrix for the browser cases.
+
+Set by the runner (``--browsers`` / ``--devices``) or directly through the
+environment::
+
+    TESTSPRITE_BROWSERS=chromium,firefox,webkit
+    TESTSPRITE_DEVICES="Desktop Chrome,iPhone 13,Pixel 7"
+
+conftest parametrizes ``browser_target`` with every combination, so each
+browser case runs once per target. The ids look like ``chromium``,
+``webkit-iPhone_13`` or ``iPhone_13``. With devices but no browsers, each
+device runs on its descriptor's default engine (WebKit for iPhones).
+Launching stays with the pools: one browser per engine per worker,
+whatever the number of devices.
+"""
+import os
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from harness.browser_pool import DEFAULT_ENGINE
+
+BROWSERS_ENV = "TESTSPRITE_BROWSERS"
+DEVICES_ENV = "TESTSPRITE_DEVICES"
+
+ENGINES = ("chromium", "firefox", "webkit")
+
+
+class Target(NamedTuple):
+    engine: Optional[str] = None  # None: the device's default engine
+    device: Optional[str] = None  # a key of playwright.devices
+
+    @property
+    def id(self) -> str:
+        parts = [self.engine, self.device and re.sub(r"\W+", "_", self.device)]
+        return "-".join(p for p in parts if p) or DEFAULT_ENGINE
+
+
+DEFAULT_TARGET = Target(DEFAULT_ENGINE)
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def parse_matrix(browsers: Optional[str], devices: Optional[str]) -> List[Target]:
+    """Targets for comma-separated engine and device lists; empty when neither is given."""
+    engines = _split(browsers)
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        raise ValueError(f"Unknown browser engine(s) {sorted(unknown)}; expected {ENGINES}")
+    names = _split(devices)
+    if not names:
+        return [Target(engine) for engine in engines]
+    return [Target(engine, name) for name in names for engine in (engines or [None])]
+
+
+def targets_from_env() -> List[Target]:
+    return parse_matrix(os.environ.get(BROWSERS_ENV), os.environ.get(DEVICES_ENV))
+
+
+def matrix_signature() -> str:
+    """The matrix in effect, for cache keys."""
+    return ",".join(t.id for t in targets_from_env())
+
+
+def resolve(target: Target, devices: Dict[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """``(engine, new_context options)`` for ``target`` given ``playwright.devices``."""
+    if target.device is None:
+        return target.engine or DEFAULT_ENGINE, {}
+    try:
+        descriptor = dict(devices[target.device])
+    except KeyError:
+        raise ValueError(f"Unknown device {target.device!r}; see playwright.devices") from None
+    default_engine = descriptor.pop("default_browser_type", DEFAULT_ENGINE)
+    engine = target.engine or default_engine
+    if engine == "firefox":
+        descriptor.pop("is_mobile", None)  # not supported by Firefox
+    return engine, descriptor
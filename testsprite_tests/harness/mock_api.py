@@ -0,0 +1,113 @@
+"""Declarative mock API registry.
+
+Responses are registered once as ``METHOD + path template -> payload`` and
+serialized to bytes at registration time. Lookups go through one compiled
+regex per HTTP method (an alternation of named groups), so resolving a URL
+is a single ``fullmatch`` no matter how many endpoints are registered::
+
+    api = MockApi()
+    api.register("GET", "/api/products/{id}", {"id": "p1"})
+    route_api(page, api.route_handler())
+
+Unmatched calls fall back to the empty-JSON 200 the suite has always used.
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
+
+from harness.routing import JSON_CONTENT_TYPE, json_body
+
+_PARAM = re.compile(r"\{[A-Za-z_][A-Za-z0-9_]*\}")
+
+
+@dataclass(frozen=True)
+class MockResponse:
+    status: int
+    body: bytes
+    content_type: str = JSON_CONTENT_TYPE
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+def compile_path(template: str, capture: bool = False) -> str:
+    """``/api/orders/{id}`` -> regex source matching one path segment per param.
+
+    With ``capture`` the params become named groups (``(?P<id>[^/]+)``).
+    """
+    source, pos = [], 0
+    for param in _PARAM.finditer(template):
+        source.append(re.escape(template[pos:param.start()]))
+        source.append(f"(?P<{param.group()[1:-1]}>[^/]+)" if capture else r"[^/]+")
+        pos = param.end()
+    source.append(re.escape(template[pos:]))
+    return "".join(source)
+
+
+class MockApi:
+    def __init__(self, fallback: Any = None, fallback_status: int = 200):
+        self.fallback = MockResponse(fallback_status, json_body({} if fallback is None else fallback))
+        self._routes: Dict[str, List[Tuple[str, MockResponse]]] = {}
+        self._compiled: Dict[str, Tuple[Pattern[str], List[MockResponse]]] = {}
+
+    def register(self, method: str, path: str, payload: Any, status: int = 200,
+                 headers: Optional[Dict[str, str]] = None) -> "MockApi":
+        """Serve ``payload`` for ``method path``; later registrations win."""
+        method = method.upper()
+        response = MockResponse(status, json_body(payload), headers=dict(headers or {}))
+        routes = self._routes.setdefault(method, [])
+        routes.insert(0, (path, response))
+        self._compiled.pop(method, None)
+        return self
+
+    def _router(self, method: str) -> Optional[Tuple[Pattern[str], List[MockResponse]]]:
+        if method not in self._compiled:
+            routes = self._routes.get(method)
+            if not routes:
+                return None
+            source = "|".join(f"(?P<r{i}>{compile_path(path)})" for i, (path, _) in enumerate(routes))
+            self._compiled[method] = (re.compile(source), [response for _, response in routes])
+        return self._compiled[method]
+
+    def match(self, method: str, url: str) -> Optional[MockResponse]:
+        """The registered response for ``url`` (query string ignored), if any."""
+        router = self._router(method.upper())
+        if router is None:
+            return None
+        pattern, responses = router
+        hit = pattern.fullmatch(urlsplit(url).path)
+        if hit is None:
+            return None
+        return responses[int(hit.lastgroup[1:])]
+
+    def resolve(self, method: str, url: str) -> MockResponse:
+        return self.match(method, url) or self.fallback
+
+    def route_handler(self) -> Callable:
+        """Sync Playwright route handler serving registered responses."""
+
+        def handle(route, request):
+            response = self.resolve(request.method, request.url)
+            route.fulfill(
+                status=response.status,
+                content_type=response.content_type,
+                headers=response.headers or None,
+                body=response.body,
+            )
+
+        return handle
+
+    def async_route_handler(self) -> Callable:
+        async def handle(route, request):
+            response = self.resolve(request.method, request.url)
+            await route.fulfill(
+                status=response.status,
+                content_type=response.content_type,
+                headers=response.headers or None,
+                body=response.body,
+            )
+
+        return handle
@@ -0,0 +1,206 @@
+"""Page-load metrics and budgets for the storefront cases.
+
+:class:`PagePerf` is attached to a page before ``goto``. An init script
+starts PerformanceObservers at document start, so LCP, layout shifts and
+long tasks are captured from the very first paint, and on Chromium a CDP
+session counts bytes on the wire. That count includes cross-origin images
+whose Resource Timing ``transferSize`` reads as 0. :meth:`PagePerf.collect`
+reads everything back in a single ``page.evaluate``.
+
+Budgets live next to the case in the test plan JSON::
+
+    "performanceBudget": {"lcp": 2500, "cls": 0.1, "tbt": 300, ...}
+
+Keys are :class:`PageMetrics` field names. Times are milliseconds, CLS is
+unitless and ``transferBytes`` is bytes.
+
+A page under a throttle profile (``harness.throttle``) is held to that
+profile's budget instead::
+
+    "performanceBudgetByProfile": {"4g+cpu-4x": {"lcp": 4000, ...}}
+
+A case without its own budget for the profile gets its unthrottled budget
+scaled by the largest profile/unthrottled ratio, per metric, among the
+plan's cases that set both. Throttling does not change CLS or the bytes
+and requests a page makes, so those limits carry over as they are. With no
+case to scale from, :func:`plan_budget` raises rather than assert nothing.
+
+Every :meth:`PagePerf.collect` also appends the metrics, with the test and
+profile, to ``tmp/results/perf.jsonl`` so runs can be compared per profile.
+"""
+import os
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from harness.config import PERF_LOG_PATH
+from harness.locks import utc_timestamp
+from harness.plan import load_plan
+from harness.results import append_jsonl
+from harness.results_plugin import RUN_ID_ENV
+
+BUDGET_KEY = "performanceBudget"
+PROFILE_BUDGETS_KEY = "performanceBudgetByProfile"
+
+# Metrics a throttle profile does not change
+UNTHROTTLED_METRICS = ("cls", "transferBytes", "requests")
+
+# Tasks longer than this block input; TBT sums the excess after FCP.
+LONG_TASK_MS = 50
+
+INIT_SCRIPT = """
+(() => {
+  if (window.__tsPerf) return;
+  const perf = window.__tsPerf = { lcp: 0, cls: 0, longTasks: [] };
+  const observe = (type, cb) => {
+    try { new PerformanceObserver(list => list.getEntries().forEach(cb)).observe({ type, buffered: true }); }
+    catch (e) { /* entry type unsupported by this engine */ }
+  };
+  observe('largest-contentful-paint', e => { perf.lcp = e.renderTime || e.loadTime || e.startTime; });
+  observe('layout-shift', e => { if (!e.hadRecentInput) perf.cls += e.value; });
+  observe('longtask', e => { perf.longTasks.push([e.startTime, e.duration]); });
+})();
+"""
+
+COLLECT_SCRIPT = """
+(longTaskMs) => {
+  const perf = window.__tsPerf || { lcp: 0, cls: 0, longTasks: [] };
+  const nav = performance.getEntriesByType('navigation')[0];
+  const fcpEntry = performance.getEntriesByName('first-contentful-paint')[0];
+  const fcp = fcpEntry ? fcpEntry.startTime : 0;
+  let tbt = 0;
+  for (const [start, duration] of perf.longTasks) {
+    if (start + duration > fcp) tbt += Math.max(0, duration - longTaskMs);
+  }
+  let transfer = nav ? nav.transferSize : 0;
+  for (const r of performance.getEntriesByType('resource')) transfer += r.transferSize || 0;
+  return {
+    ttfb: nav ? nav.responseStart : 0,
+    domContentLoaded: nav ? nav.domContentLoadedEventEnd : 0,
+    load: nav ? nav.loadEventEnd : 0,
+    fcp: fcp,
+    lcp: perf.lcp,
+    cls: perf.cls,
+    tbt: tbt,
+    transferBytes: transfer,
+    requests: performance.getEntriesByType('resource').length + 1,
+  };
+}
+"""
+
+
+@dataclass
+class PageMetrics:
+    url: str
+    ttfb: float
+    domContentLoaded: float
+    load: float
+    fcp: float
+    lcp: float
+    cls: float
+    tbt: float
+    transferBytes: int
+    requests: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def over_budget(self, budget: Dict[str, float]) -> List[str]:
+        """One line per metric that exceeds ``budget``; empty when within it."""
+        known = {f.name for f in fields(self)} - {"url"}
+        unknown = set(budget) - known
+        if unknown:
+            raise ValueError(f"Unknown budget metrics: {', '.join(sorted(unknown))}")
+        return [
+            f"{name}: {getattr(self, name):g} > {limit:g}"
+            for name, limit in budget.items()
+            if getattr(self, name) > limit
+        ]
+
+
+class PagePerf:
+    """Records load metrics for every navigation of one page.
+
+    ``profile`` names the throttle spec the page runs under and ``label``
+    the test, for the entries in ``log_path``.
+    """
+
+    def __init__(self, page, profile: Optional[str] = None, label: str = "", log_path: Path = PERF_LOG_PATH):
+        self.page = page
+        self.profile = profile
+        self.label = label
+        self.log_path = log_path
+        self._wire_bytes: Optional[int] = None
+        page.add_init_script(INIT_SCRIPT)
+        self._attach_cdp()
+
+    def _attach_cdp(self):
+        if self.page.context.browser.browser_type.name != "chromium":
+            return
+        session = self.page.context.new_cdp_session(self.page)
+        session.send("Network.enable")
+        self._wire_bytes = 0
+
+        def finished(event):
+            self._wire_bytes += int(event.get("encodedDataLength", 0))
+
+        session.on("Network.loadingFinished", finished)
+
+    def reset(self):
+        """Start a fresh byte count; call before a second ``goto`` on the same page."""
+        if self._wire_bytes is not None:
+            self._wire_bytes = 0
+
+    def collect(self, wait_until: str = "load") -> PageMetrics:
+        self.page.wait_for_load_state(wait_until)
+        data = self.page.evaluate(COLLECT_SCRIPT, LONG_TASK_MS)
+        if self._wire_bytes is not None:
+            data["transferBytes"] = max(data["transferBytes"], self._wire_bytes)
+        data["transferBytes"] = int(data["transferBytes"])
+        metrics = PageMetrics(url=self.page.url, **data)
+        append_jsonl(self.log_path, {
+            "run": os.environ.get(RUN_ID_ENV, ""), "test": self.label, "profile": self.profile,
+            "recorded": utc_timestamp(), **metrics.to_dict(),
+        })
+        return metrics
+
+
+def profile_scale(profile: str, plan: Dict[str, dict]) -> Dict[str, float]:
+    """Metric -> the largest ratio of ``profile``'s budget to the unthrottled one across ``plan``."""
+    scale: Dict[str, float] = {}
+    for entry in plan.values():
+        base = entry.get(BUDGET_KEY, {})
+        for name, limit in entry.get(PROFILE_BUDGETS_KEY, {}).get(profile, {}).items():
+            if base.get(name):
+                scale[name] = max(scale.get(name, 0.0), limit / base[name])
+    return scale
+
+
+def plan_budget(case: str, plan: Optional[Dict[str, dict]] = None, profile: Optional[str] = None) -> Dict[str, float]:
+    """The case's budget; under a throttle ``profile``, that profile's budget or a scaled fallback.
+
+    Raises ``LookupError`` when the case has an unthrottled budget but no
+    case in the plan says how ``profile`` scales it.
+    """
+    plan = plan if plan is not None else load_plan()
+    entry = plan.get(case, {})
+    base = entry.get(BUDGET_KEY, {})
+    if profile is None:
+        return base
+    own = entry.get(PROFILE_BUDGETS_KEY, {}).get(profile)
+    if own is not None or not base:
+        return own or {}
+    scale = profile_scale(profile, plan)
+    if not scale:
+        raise LookupError(
+            f"{case} has no {PROFILE_BUDGETS_KEY}[{profile!r}] and no plan case sets one to scale "
+            f"its {BUDGET_KEY} from; add one to the test plan"
+        )
+    budget = {name: limit for name, limit in base.items() if name in UNTHROTTLED_METRICS}
+    budget.update({name: limit * scale[name] for name, limit in base.items() if name in scale})
+    return budget
+
+
+def assert_within_budget(metrics: PageMetrics, budget: Dict[str, float]):
+    violations = metrics.over_budget(budget)
+    assert not violations, f"{metrics.url} over performance budget: " + "; ".join(violations)
@@ -0,0 +1,58 @@
+"""Test plan lookups and TC case discovery.
+
+TestSprite writes the same cases to both plan files. The harness keeps its
+own keys (``features``, budgets, ``routes``) in the frontend plan only;
+:func:`merged_plan` reads both and returns each case once.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+from harness.config import BACKEND_PLAN_PATH, FRONTEND_PLAN_PATH, SUITE_DIR
+
+_CASE_ID = re.compile(r"^(TC\d{3})")
+
+# Fields TestSprite writes; anything else in an entry belongs to the harness.
+TESTSPRITE_KEYS = ("id", "title", "description", "category", "priority", "steps")
+
+
+def case_id(path: Union[str, Path]) -> str:
+    """``TC001_Home_Page_Load_and_Render.py`` -> ``TC001``."""
+    match = _CASE_ID.match(Path(path).name)
+    if not match:
+        raise ValueError(f"Not a TC case file: {path}")
+    return match.group(1)
+
+
+def discover_cases(suite_dir: Path = SUITE_DIR) -> List[Path]:
+    return sorted(suite_dir.glob("TC[0-9][0-9][0-9]_*.py"))
+
+
+def load_plan(path: Path = FRONTEND_PLAN_PATH) -> Dict[str, dict]:
+    """Plan entries keyed by TC id."""
+    with open(path, encoding="utf-8") as fh:
+        return {case["id"]: case for case in json.load(fh)}
+
+
+def merged_plan(paths: Sequence[Path] = (FRONTEND_PLAN_PATH, BACKEND_PLAN_PATH)) -> Dict[str, dict]:
+    """Every case of ``paths`` once, keyed by TC id; the first file's entry wins.
+
+    Raises ``ValueError`` when the files disagree on a case's TestSprite fields,
+    so the two copies cannot drift apart unnoticed.
+    """
+    merged: Dict[str, dict] = {}
+    conflicts = []
+    for path in paths:
+        if not path.exists():
+            continue
+        for tc, entry in load_plan(path).items():
+            if tc not in merged:
+                merged[tc] = entry
+                continue
+            differing = [k for k in TESTSPRITE_KEYS if k in entry and merged[tc].get(k) != entry[k]]
+            if differing:
+                conflicts.append(f"{tc} ({path.name}): {', '.join(differing)}")
+    if conflicts:
+        raise ValueError("Test plans disagree: " + "; ".join(conflicts))
+    return merged
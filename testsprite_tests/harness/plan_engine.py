@@ -0,0 +1,401 @@
+"""Run the test plan's prose steps directly, sharing common prefixes between cases.
+
+A standalone probe, not part of the suite: ``harness.runner`` does not use
+it, and the hand-written TC*.py scripts are what a run checks. Each plan
+case is a list of ``action`` / ``assertion`` steps in prose. A step runs
+when one of the patterns registered with :func:`step` matches its
+description. The handler then drives a Playwright page, e.g.
+"Navigate to the Login Page" becomes ``goto(BASE_URL + "/login")``. A case
+whose steps all match is executable. Otherwise it is reported
+``unsupported`` at its first unmatched step.
+
+Coverage is small: the handlers cover navigation, signing in and the
+login and registration forms, about a third of the plan's distinct steps,
+and only the form validation and failed login cases (TC008, TC010) run to
+the end. ``--tree`` prints the current coverage.
+
+The cases are merged into a prefix tree (:func:`build_tree`). Cases that
+start with the same steps, such as "Log in as an admin user" (TC011,
+TC012), would run that prefix once; with today's handlers few runnable
+cases share one, so the saving is mostly potential. At a branch every child but the last forks a new context from the
+prefix's state: its storage state (cookies, local storage) and current
+URL. A form filled in on the page is not part of that state, so when the
+branch point comes after in-page actions (steps registered with
+``in_page=True``) the fork reopens the page as it was before the first of
+them and replays them. The last child continues in the original context.
+A subtree in which no case can get past an unmatched step is reported
+``unsupported`` without running any of it::
+
+    python -m harness.plan_engine --tree     # show the tree and step coverage
+    python -m harness.plan_engine TC008 TC010
+"""
+import argparse
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Pattern, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from harness.browser_pool import BrowserPool, headless_from_env
+from harness.config import BASE_URL
+from harness.fixtures import CUSTOMER_CREDENTIALS
+from harness.plan import merged_plan
+
+PASSED = "passed"
+FAILED = "failed"
+UNSUPPORTED = "unsupported"
+
+# Page names used in the plan's navigation steps
+PAGE_ROUTES = {
+    "Home Page": "/",
+    "Shop Page": "/shop",
+    "Cart Page": "/cart",
+    "Checkout Page": "/checkout",
+    "Registration Page": "/register",
+    "Login Page": "/login",
+    "Admin Dashboard": "/admin/dashboard",
+    "Orders section in the Admin Dashboard": "/admin/orders",
+}
+
+# Inline field errors, alerts and error toasts, as the app's forms render them.
+# Field state (input:invalid, aria-invalid) is no evidence of a message: a
+# type=email input is :invalid as soon as a bad address is typed.
+ERROR_SELECTOR = (
+    ".text-destructive, [role=alert]:not(#__next-route-announcer__), "
+    "[data-sonner-toast][data-type=error]"
+)
+SUBMIT_SELECTOR = "form button[type=submit]"
+
+
+@dataclass(frozen=True)
+class Step:
+    type: str
+    description: str
+
+    def __str__(self) -> str:
+        return f"{self.type}: {self.description}"
+
+
+Handler = Callable[["Session", "re.Match"], None]
+STEPS: List[Tuple[Pattern, Handler]] = []
+
+
+def step(pattern: str, in_page: bool = False) -> Callable[[Handler], Handler]:
+    """Register a handler for the steps whose description matches ``pattern`` (anchored).
+
+    ``in_page`` marks handlers that change the page without navigating
+    (filling fields, clicking), which a fork has to replay.
+    """
+    def register(handler: Handler) -> Handler:
+        handler.in_page = in_page
+        STEPS.append((re.compile(f"^(?:{pattern})$"), handler))
+        return handler
+    return register
+
+
+def resolve(s: Step) -> Optional[Tuple[Handler, "re.Match"]]:
+    for pattern, handler in STEPS:
+        match = pattern.match(s.description)
+        if match:
+            return handler, match
+    return None
+
+
+class Session:
+    """The browser context and page the steps act on."""
+
+    def __init__(self, browser, base_url: str = BASE_URL, auth_states=None, storage_state=None,
+                 url: Optional[str] = None, **context_options):
+        self.browser = browser
+        self.base_url = base_url
+        self.auth_states = auth_states
+        self.context_options = context_options
+        self.page_errors: List[str] = []
+        self.context = None
+        self.page = None
+        # in-page steps since the last load, and the state to replay them from
+        self._in_page: List[Tuple[Handler, "re.Match"]] = []
+        self._before_in_page: Optional[Tuple[dict, Optional[str]]] = None
+        self.open(storage_state, url)
+
+    def open(self, storage_state=None, url: Optional[str] = None):
+        """(Re)open the context, optionally from a storage state and at ``url``."""
+        if self.context is not None:
+            self.context.close()
+        self.context = self.browser.new_context(storage_state=storage_state, **self.context_options)
+        self.page = self.context.new_page()
+        self.page.on("pageerror", lambda exc: self.page_errors.append(str(exc)))
+        self._in_page.clear()
+        if url:
+            self.page.goto(url)
+
+    def goto(self, url: str):
+        self.page.goto(url)
+        self._in_page.clear()
+
+    def _state(self) -> Tuple[dict, Optional[str]]:
+        url = self.page.url if self.page.url.startswith("http") else None
+        return self.context.storage_state(), url
+
+    def run(self, handler: Handler, match: "re.Match"):
+        """Run one step, remembering in-page ones for :meth:`fork`."""
+        if handler.in_page and not self._in_page:
+            self._before_in_page = self._state()
+        handler(self, match)
+        if handler.in_page:
+            self._in_page.append((handler, match))
+
+    def fork(self) -> "Session":
+        """A new context in this one's state: storage state and URL, plus any in-page steps replayed."""
+        replay = list(self._in_page)
+        storage_state, url = self._before_in_page if replay else self._state()
+        forked = Session(
+            self.browser, self.base_url, self.auth_states,
+            storage_state=storage_state, url=url, **self.context_options,
+        )
+        forked.page_errors[:0] = self.page_errors
+        try:
+            for handler, match in replay:
+                forked.run(handler, match)
+        except Exception:
+            forked.close()
+            raise
+        return forked
+
+    def sign_in(self, role: str):
+        if self.auth_states is None:
+            from harness.auth_state import AuthStates
+
+            self.auth_states = AuthStates(self.base_url)
+        self.open(storage_state=str(self.auth_states.path(role)))
+
+    def close(self):
+        self.context.close()
+
+
+# -- actions ---------------------------------------------------------------
+
+@step(r"(?:Attempt to navigate|Navigate) to the (?P<page>%s)(?: URL)?" % "|".join(map(re.escape, PAGE_ROUTES)))
+def navigate(session: Session, match):
+    session.goto(f"{session.base_url}{PAGE_ROUTES[match['page']]}")
+
+
+@step(r"Log in as an admin user")
+def log_in_admin(session: Session, match):
+    session.sign_in("admin")
+
+
+@step(r"Log in as a non-admin registered user")
+def log_in_customer(session: Session, match):
+    session.sign_in("customer")
+
+
+@step(r"Enter valid registered email and password", in_page=True)
+def enter_valid_credentials(session: Session, match):
+    session.page.fill("input[name=email]", CUSTOMER_CREDENTIALS["email"])
+    session.page.fill("input[name=password]", CUSTOMER_CREDENTIALS["password"])
+
+
+@step(r"Enter incorrect email or password", in_page=True)
+def enter_invalid_credentials(session: Session, match):
+    session.page.fill("input[name=email]", "invaliduser@example.com")
+    session.page.fill("input[name=password]", "wrongpassword")
+
+
+@step(r"Enter invalid email format", in_page=True)
+def enter_invalid_email(session: Session, match):
+    session.page.fill("input[name=email]", "invalidemail")
+
+
+@step(r"Enter passwords that do not meet complexity requirements or mismatch", in_page=True)
+def enter_mismatched_passwords(session: Session, match):
+    session.page.fill("input[name=password]", "password1")
+    session.page.fill("input[name=confirmPassword]", "password2")
+
+
+@step(r"(?:Attempt to submit|Submit) the (?:registration |login )?(?:form|order)(?: with missing mandatory fields)?", in_page=True)
+def submit(session: Session, match):
+    session.page.locator(SUBMIT_SELECTOR).first.click()
+
+
+# -- assertions ------------------------------------------------------------
+
+@step(r"Confirm that the main banner, navigation menu, and footer are visible and rendered")
+def layout_visible(session: Session, match):
+    for selector in ("header", "header nav", "footer"):
+        session.page.locator(selector).first.wait_for(state="visible")
+
+
+@step(r"Verify no JavaScript or rendering errors occur during page load")
+def no_page_errors(session: Session, match):
+    assert not session.page_errors, "Page errors: " + "; ".join(session.page_errors)
+
+
+@step(
+    r"Check the presence of validation error messages for required fields"
+    r"|Verify error message for invalid email format"
+    r"|Confirm password validation error messages appear correctly"
+    r"|Verify validation messages are displayed for the missing or invalid fields"
+    r"|Check that an error message is displayed indicating invalid credentials"
+)
+def error_shown(session: Session, match):
+    messages = session.page.locator(ERROR_SELECTOR).filter(visible=True, has_text=re.compile(r"\S"))
+    messages.first.wait_for(state="visible")
+
+
+@step(r"Verify access is denied or redirected to a safe page")
+def access_denied(session: Session, match):
+    path = urlsplit(session.page.url).path
+    assert not path.startswith("/admin/dashboard"), f"Non-admin stayed on {path}"
+
+
+# -- prefix tree -----------------------------------------------------------
+
+@dataclass
+class Node:
+    step: Optional[Step] = None
+    children: Dict[Step, "Node"] = field(default_factory=dict)
+    cases: List[str] = field(default_factory=list)  # cases whose last step this is
+
+    def all_cases(self) -> List[str]:
+        return self.cases + [tc for child in self.children.values() for tc in child.all_cases()]
+
+    def walk(self, depth: int = 0) -> Iterator[Tuple[int, "Node"]]:
+        for child in self.children.values():
+            yield depth, child
+            yield from child.walk(depth + 1)
+
+
+def build_tree(plan: Dict[str, dict]) -> Node:
+    root = Node()
+    for tc, entry in plan.items():
+        node = root
+        for raw in entry.get("steps", []):
+            s = Step(raw["type"], raw["description"])
+            node = node.children.setdefault(s, Node(s))
+        node.cases.append(tc)
+    return root
+
+
+@dataclass
+class CaseResult:
+    case: str
+    status: str
+    step: Optional[Step] = None
+    detail: str = ""
+
+
+@dataclass
+class RunStats:
+    executed: int = 0  # steps run
+    shared: int = 0  # step runs saved by sharing prefixes
+    replayed: int = 0  # in-page steps run again to fork after them
+
+
+def _fail(node: Node, results: Dict[str, CaseResult], exc: Exception):
+    for tc in node.all_cases():
+        results[tc] = CaseResult(tc, FAILED, node.step, f"{type(exc).__name__}: {exc}")
+
+
+def runnable(node: Node) -> bool:
+    """Whether some case in ``node``'s subtree can get to its last step."""
+    if node.step is not None and resolve(node.step) is None:
+        return False
+    return bool(node.cases) or any(runnable(child) for child in node.children.values())
+
+
+def _unsupported(node: Node, results: Dict[str, CaseResult]):
+    """Report every case below ``node`` unsupported at its first unmatched step."""
+    for child in node.children.values():
+        if resolve(child.step) is None:
+            for tc in child.all_cases():
+                results[tc] = CaseResult(tc, UNSUPPORTED, child.step)
+        else:
+            _unsupported(child, results)
+
+
+def execute(node: Node, session: Session, results: Dict[str, CaseResult], stats: RunStats):
+    """Run the subtree below ``node`` on ``session``, forking it at every branch."""
+    for tc in node.cases:
+        results[tc] = CaseResult(tc, PASSED)
+    children = []
+    for child in node.children.values():
+        if runnable(child):
+            children.append(child)
+        elif resolve(child.step) is None:
+            for tc in child.all_cases():
+                results[tc] = CaseResult(tc, UNSUPPORTED, child.step)
+        else:
+            _unsupported(child, results)
+    for i, child in enumerate(children):
+        last = i == len(children) - 1
+        try:
+            branch = session if last else session.fork()
+        except Exception as exc:
+            _fail(child, results, exc)
+            continue
+        if not last:
+            stats.replayed += len(session._in_page)
+        try:
+            branch.run(*resolve(child.step))
+            stats.executed += 1
+            stats.shared += len(child.all_cases()) - 1
+        except Exception as exc:
+            _fail(child, results, exc)
+        else:
+            execute(child, branch, results, stats)
+        finally:
+            if not last:
+                branch.close()
+
+
+def run_plan(plan: Dict[str, dict], base_url: str = BASE_URL, headless: bool = True) -> Tuple[Dict[str, CaseResult], RunStats]:
+    pool = BrowserPool(headless=headless)
+    results: Dict[str, CaseResult] = {}
+    stats = RunStats()
+    try:
+        session = Session(pool.browser(), base_url)
+        try:
+            execute(build_tree(plan), session, results, stats)
+        finally:
+            session.close()
+    finally:
+        pool.close()
+    return results, stats
+
+
+def print_tree(root: Node):
+    for depth, node in root.walk():
+        mark = " " if resolve(node.step) else "?"
+        ends = f"  <- {', '.join(node.cases)}" if node.cases else ""
+        print(f"{mark} {'  ' * depth}{node.step}{ends}")
+    steps = [node for _, node in root.walk()]
+    print(f"{len(steps)} distinct steps, {sum(1 for n in steps if resolve(n.step))} executable ('?' = no handler)")
+    results: Dict[str, CaseResult] = {}
+    _unsupported(root, results)
+    complete = sorted(set(root.all_cases()) - set(results))
+    print(f"{len(complete)} of {len(root.all_cases())} cases executable end to end: {', '.join(complete) or 'none'}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.plan_engine", description=__doc__.split("\n\n")[0])
+    parser.add_argument("cases", nargs="*", help="TC ids (default: all)")
+    parser.add_argument("--tree", action="store_true", help="print the prefix tree and step coverage without running")
+    args = parser.parse_args(argv)
+
+    plan = merged_plan()
+    if args.cases:
+        plan = {tc: entry for tc, entry in plan.items() if tc in {c.upper() for c in args.cases}}
+    if args.tree:
+        print_tree(build_tree(plan))
+        return 0
+    results, stats = run_plan(plan, headless=headless_from_env())
+    for tc in sorted(results):
+        result = results[tc]
+        where = f" at '{result.step.description}'" if result.step else ""
+        print(f"{tc} {result.status}{where}" + (f": {result.detail}" if result.detail else ""))
+    print(f"{stats.executed} steps executed, {stats.shared} saved by shared prefixes, {stats.replayed} replayed to fork")
+    return 1 if any(r.status == FAILED for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
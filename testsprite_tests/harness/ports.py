@@ -0,0 +1,52 @@
+"""Per-worker localhost port budgets.
+
+Each shard owns a disjoint block of ports so stub servers and app servers
+started by parallel workers never race each other for the same port.
+"""
+import os
+import socket
+from typing import Optional
+
+PORTS_ENV = "TESTSPRITE_PORTS"
+BASE_PORT = 21000
+PORTS_PER_WORKER = 20
+
+
+def port_budget(slot: int, size: int = PORTS_PER_WORKER, base: int = BASE_PORT) -> range:
+    start = base + slot * size
+    return range(start, start + size)
+
+
+def format_budget(budget: range) -> str:
+    return f"{budget.start}-{budget.stop - 1}"
+
+
+def budget_from_env() -> Optional[range]:
+    """The budget handed down by the runner, or ``None`` outside a shard."""
+    value = os.environ.get(PORTS_ENV)
+    if not value:
+        return None
+    start, end = (int(part) for part in value.split("-"))
+    return range(start, end + 1)
+
+
+def port_is_free(port: int, host: str = "127.0.0.1") -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+def free_port(budget: Optional[range] = None, host: str = "127.0.0.1") -> int:
+    """First free port in ``budget`` (default: this worker's), else an OS-assigned one."""
+    budget = budget if budget is not None else budget_from_env()
+    if budget is not None:
+        for port in budget:
+            if port_is_free(port, host):
+                return port
+        raise RuntimeError(f"No free port left in budget {format_budget(budget)}")
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
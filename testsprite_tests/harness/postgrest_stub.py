@@ -0,0 +1,295 @@
+"""In-memory stand-in for the subset of PostgREST that supabase-js uses.
+
+The app talks to the database only through ``@supabase/supabase-js``, so a
+``next dev`` started with ``NEXT_PUBLIC_SUPABASE_URL`` pointing at a
+:class:`~harness.stub_server.StubServer` that serves a :class:`PostgrestStub`
+runs its data routes without Postgres. Supported at ``/rest/v1/<table>``:
+
+* ``GET`` with ``select`` (columns, ``*``, and embedded
+  ``relation(*)`` / ``relation!inner(cols)`` through declared foreign keys),
+  the filters ``eq neq gt gte lt lte like ilike is in``, ``or=(...)``,
+  filters and ``or`` on embedded tables (``relation.col=...``), ``order``,
+  ``limit`` and ``offset``;
+* ``Prefer: count=exact``, answered in ``Content-Range``, and
+  ``Accept: application/vnd.pgrst.object+json`` (``.single()``);
+* ``POST`` (object or array), ``PATCH`` and ``DELETE`` with filters, and
+  ``Prefer: return=representation``.
+
+Rows are plain dicts. Every request is also counted per method and
+table, so benchmarks can report how many round trips a code path makes.
+"""
+import copy
+import fnmatch
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from harness.locks import utc_timestamp
+from harness.stub_backend import StubRequest, StubResponse
+
+OBJECT_MEDIA_TYPE = "application/vnd.pgrst.object+json"
+
+_EMBED = re.compile(r"^(?P<name>\w+)(?P<inner>!inner)?\((?P<cols>.*)\)$")
+
+
+def split_top_level(text: str, sep: str = ",") -> List[str]:
+    """Split on ``sep`` outside parentheses: ``a,b(c,d)`` -> ``["a", "b(c,d)"]``."""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == sep and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _coerce(raw: str, like: Any) -> Any:
+    if like is None or isinstance(like, str):
+        return raw
+    if isinstance(like, bool):
+        return raw == "true"
+    if isinstance(like, (int, float)):
+        return float(raw)
+    return raw
+
+
+def _matches(row: dict, column: str, op: str, raw: str) -> bool:
+    negate = op.startswith("not.")
+    if negate:
+        op = op[4:]
+    value = row.get(column)
+    if op == "is":
+        result = {"null": value is None, "true": value is True, "false": value is False}[raw]
+    elif op == "in":
+        options = [o.strip('"') for o in split_top_level(raw.strip("()"))]
+        result = value is not None and str(value) in options
+    elif value is None:
+        result = False
+    elif op in ("like", "ilike"):
+        pattern = raw.replace("%", "*")
+        subject = str(value)
+        if op == "ilike":
+            pattern, subject = pattern.lower(), subject.lower()
+        result = fnmatch.fnmatchcase(subject, pattern)
+    else:
+        other = _coerce(raw, value)
+        compare: Dict[str, Callable[[Any, Any], bool]] = {
+            "eq": lambda a, b: a == b,
+            "neq": lambda a, b: a != b,
+            "gt": lambda a, b: a > b,
+            "gte": lambda a, b: a >= b,
+            "lt": lambda a, b: a < b,
+            "lte": lambda a, b: a <= b,
+        }
+        result = compare[op](value, other)
+    return result != negate
+
+
+def _condition(expr: str) -> Callable[[dict], bool]:
+    """``col.op.value`` (as used inside ``or=(...)``) -> predicate."""
+    if expr.startswith(("or(", "and(")):
+        combinator, _, inner = expr.partition("(")
+        preds = [_condition(e) for e in split_top_level(inner[:-1])]
+        join = any if combinator == "or" else all
+        return lambda row: join(p(row) for p in preds)
+    column, op, raw = expr.split(".", 2)
+    if op == "not":
+        op2, raw = raw.split(".", 1)
+        op = f"not.{op2}"
+    return lambda row: _matches(row, column, op, raw)
+
+
+def _param_condition(column: str, spec: str) -> Callable[[dict], bool]:
+    """A ``column=op.value`` query parameter -> predicate."""
+    if column in ("or", "and"):
+        return _condition(f"{column}{spec}")
+    op, raw = spec.split(".", 1)
+    if op == "not":
+        op2, raw = raw.split(".", 1)
+        op = f"not.{op2}"
+    return lambda row: _matches(row, column, op, raw)
+
+
+class PostgrestStub:
+    """Tables of dict rows, with foreign keys declared for embedding.
+
+    ``relations`` maps ``(parent, child)`` to ``(parent_key, child_fk)``.
+    ``products -> product_sync_config`` by ``id``/``product_id`` is:
+    ``{("products", "product_sync_config"): ("id", "product_id")}``.
+    """
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, List[dict]]] = None,
+        relations: Optional[Dict[Tuple[str, str], Tuple[str, str]]] = None,
+    ):
+        self.lock = threading.Lock()
+        self.relations = dict(relations or {})
+        self.calls: Counter = Counter()
+        self.tables: Dict[str, List[dict]] = {}
+        self._next_id: Dict[str, int] = {}
+        for name, rows in (tables or {}).items():
+            self.load(name, rows)
+
+    def load(self, table: str, rows: List[dict]):
+        with self.lock:
+            self.tables[table] = [dict(r) for r in rows]
+            ids = [r["id"] for r in rows if isinstance(r.get("id"), int)]
+            self._next_id[table] = max(ids, default=0) + 1
+
+    def rows(self, table: str) -> List[dict]:
+        with self.lock:
+            return copy.deepcopy(self.tables.get(table, []))
+
+    # -- request handling -------------------------------------------------
+
+    def handle(self, request: StubRequest) -> StubResponse:
+        prefix = "/rest/v1/"
+        if not request.path.startswith(prefix):
+            return StubResponse(404, {"message": "Not found"})
+        table = request.path[len(prefix):].strip("/")
+        with self.lock:
+            self.calls[f"{request.method} {table}"] += 1
+            if table not in self.tables:
+                return StubResponse(404, {"code": "42P01", "message": f'relation "{table}" does not exist'})
+            handler = {
+                "GET": self._select, "HEAD": self._select, "POST": self._insert,
+                "PATCH": self._update, "DELETE": self._delete,
+            }.get(request.method)
+            if handler is None:
+                return StubResponse(405, {"message": "Method not allowed"})
+            return handler(table, request)
+
+    def _prefer(self, request: StubRequest) -> Dict[str, str]:
+        prefs = {}
+        for item in request.headers.get("prefer", "").split(","):
+            key, _, value = item.strip().partition("=")
+            if key:
+                prefs[key] = value
+        return prefs
+
+    def _filters(self, request: StubRequest) -> Tuple[List[Callable], Dict[str, List[Callable]]]:
+        """Top-level predicates, and predicates per embedded relation."""
+        own: List[Callable] = []
+        embedded: Dict[str, List[Callable]] = {}
+        for key, spec in parse_qsl(request.raw_query, keep_blank_values=True):
+            if key in ("select", "order", "limit", "offset", "columns", "on_conflict"):
+                continue
+            relation, dot, column = key.rpartition(".")
+            if dot:
+                if column == "order":
+                    continue
+                embedded.setdefault(relation, []).append(_param_condition(column, spec))
+            else:
+                own.append(_param_condition(key, spec))
+        return own, embedded
+
+    def _project(self, table: str, row: dict, select: str, embedded_filters: Dict[str, List[Callable]]) -> Optional[dict]:
+        """Apply ``select`` to ``row``; ``None`` when an ``!inner`` embed is empty."""
+        out: Dict[str, Any] = {}
+        for item in split_top_level(select or "*"):
+            embed = _EMBED.match(item)
+            if embed is None:
+                if item == "*":
+                    out.update(row)
+                else:
+                    column, _, alias = item.partition(":")
+                    name, source = (column, alias) if alias else (column, column)
+                    out[name] = row.get(source)
+                continue
+            child = embed.group("name")
+            parent_key, child_fk = self.relations[(table, child)]
+            children = [
+                c for c in self.tables[child]
+                if c.get(child_fk) == row.get(parent_key)
+                and all(p(c) for p in embedded_filters.get(child, []))
+            ]
+            if embed.group("inner") and not children:
+                return None
+            out[child] = [self._project(child, c, embed.group("cols"), {}) for c in children]
+        return out
+
+    def _select(self, table: str, request: StubRequest) -> StubResponse:
+        own, embedded = self._filters(request)
+        matched = [r for r in self.tables[table] if all(p(r) for p in own)]
+        select = request.query.get("select", "*")
+        projected = []
+        for row in matched:
+            shaped = self._project(table, row, select, embedded)
+            if shaped is not None:
+                projected.append((row, shaped))
+
+        for clause in reversed(split_top_level(request.query.get("order", ""))):
+            column, *flags = clause.split(".")
+            descending = "desc" in flags
+            projected.sort(key=lambda pair: (pair[0].get(column) is None, pair[0].get(column)), reverse=descending)
+
+        total = len(projected)
+        offset = int(request.query.get("offset", 0))
+        limit = request.query.get("limit")
+        page = projected[offset:offset + int(limit)] if limit is not None else projected[offset:]
+        body = [shaped for _, shaped in page]
+
+        headers = {}
+        if self._prefer(request).get("count") in ("exact", "planned", "estimated"):
+            end = offset + len(body) - 1
+            headers["Content-Range"] = f"{offset}-{end}/{total}" if body else f"*/{total}"
+        if request.method == "HEAD":
+            return StubResponse(200, None, headers)
+        if OBJECT_MEDIA_TYPE in request.headers.get("accept", ""):
+            if len(body) != 1:
+                return StubResponse(406, {
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(body)} rows",
+                })
+            return StubResponse(200, body[0], headers)
+        return StubResponse(200, body, headers)
+
+    def _returning(self, request: StubRequest, rows: List[dict], status: int) -> StubResponse:
+        if self._prefer(request).get("return") != "representation":
+            return StubResponse(204 if status == 200 else status, None)
+        if OBJECT_MEDIA_TYPE in request.headers.get("accept", "") and len(rows) == 1:
+            return StubResponse(status, copy.deepcopy(rows[0]))
+        return StubResponse(status, copy.deepcopy(rows))
+
+    def _insert(self, table: str, request: StubRequest) -> StubResponse:
+        payload = request.json()
+        new_rows = payload if isinstance(payload, list) else [payload]
+        inserted = []
+        for data in new_rows:
+            row = dict(data)
+            if "id" not in row:
+                row["id"] = self._next_id[table]
+                self._next_id[table] += 1
+            row.setdefault("created_at", utc_timestamp())
+            self.tables[table].append(row)
+            inserted.append(row)
+        return self._returning(request, inserted, 201)
+
+    def _update(self, table: str, request: StubRequest) -> StubResponse:
+        own, _ = self._filters(request)
+        changes = request.json_object()
+        updated = []
+        for row in self.tables[table]:
+            if all(p(row) for p in own):
+                row.update(changes)
+                updated.append(row)
+        return self._returning(request, updated, 200)
+
+    def _delete(self, table: str, request: StubRequest) -> StubResponse:
+        own, _ = self._filters(request)
+        keep, removed = [], []
+        for row in self.tables[table]:
+            (removed if all(p(row) for p in own) else keep).append(row)
+        self.tables[table] = keep
+        return self._returning(request, removed, 200)
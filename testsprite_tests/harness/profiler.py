@@ -0,0 +1,272 @@
+"""Per-step timing of the Playwright calls a test makes.
+
+Off unless ``TESTSPRITE_PROFILE`` is set (runner: ``--profile``). When on,
+conftest registers :class:`StepProfiler`, which wraps the public methods of
+the Playwright classes in :data:`INSTRUMENTED`, sync and async, plus the
+route handlers installed through ``harness.routing``. Each call is a step:
+
+* its wall time;
+* the number of protocol messages sent to the Playwright driver while it
+  ran (the IPC count);
+* its nesting, e.g. a route handler under the ``Page.goto`` that
+  triggered it.
+
+Steps are grouped by test phase. Call-phase time not spent in any step is
+reported as ``(python)``: assertions, data shaping, the test's own code.
+
+Every test gets a top-down summary in the terminal report and a
+``tmp/results/profile/<test>.folded`` file. That file holds collapsed
+stacks with self time in microseconds, for ``flamegraph.pl`` or speedscope.
+``TESTSPRITE_PROFILE=python`` also runs cProfile over the call phase and
+writes ``<test>.prof`` next to it.
+
+IPC counts are exact for the sync API. Async steps that run concurrently
+(TC015's pages) count each other's messages too.
+"""
+import contextvars
+import cProfile
+import functools
+import inspect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+
+from harness.config import PROFILE_DIR
+
+PYTHON_MODE = "python"
+
+INSTRUMENTED = (
+    "Browser", "BrowserContext", "Page", "Frame", "Locator", "ElementHandle", "Route", "Response",
+    "Keyboard", "Mouse", "PageAssertions", "LocatorAssertions",
+)
+# Methods that build a handle locally or register a listener; they never wait on the browser.
+_LOCAL = {"locator", "frame_locator", "filter", "nth", "and_", "or_", "on", "once", "remove_listener"}
+_LOCAL_PREFIXES = ("get_by_", "expect_")
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+PYTHON_FRAME = "(python)"
+SUMMARY_LINES = 15
+
+Stack = Tuple[str, ...]
+
+
+class _Counter:
+    value = 0
+
+
+_ipc = _Counter()
+_current: Optional["StepRecorder"] = None
+_sync_stack = threading.local()
+_async_stack: contextvars.ContextVar[Stack] = contextvars.ContextVar("testsprite_profile_stack", default=())
+_installed = False
+
+
+class StepRecorder:
+    """Inclusive time, calls and IPC per stack for one test."""
+
+    def __init__(self):
+        self.phase = "setup"
+        self.stacks: Dict[Stack, List[float]] = {}  # stack -> [seconds, calls, ipc]
+
+    def add(self, stack: Stack, seconds: float, ipc: int):
+        entry = self.stacks.setdefault((self.phase,) + stack, [0.0, 0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+        entry[2] += ipc
+
+    def self_times(self) -> Dict[Stack, float]:
+        """Inclusive time minus the children's, per stack (what a flame graph draws)."""
+        own = {stack: entry[0] for stack, entry in self.stacks.items()}
+        for stack, entry in self.stacks.items():
+            parent = stack[:-1]
+            if parent in own:
+                own[parent] -= entry[0]
+        return {stack: max(0.0, seconds) for stack, seconds in own.items()}
+
+    def folded(self) -> str:
+        return "".join(
+            f"{';'.join(stack)} {round(seconds * 1e6)}\n"
+            for stack, seconds in sorted(self.self_times().items())
+            if seconds > 0
+        )
+
+    def summary(self, limit: int = SUMMARY_LINES) -> List[str]:
+        """Top-down lines, children under their parent, largest first."""
+        phases = {stack[0]: entry[0] for stack, entry in self.stacks.items() if len(stack) == 1}
+        total = sum(phases.values()) or 1.0
+        lines: List[str] = []
+
+        def visit(prefix: Stack):
+            children = sorted(
+                ((s, e) for s, e in self.stacks.items() if len(s) == len(prefix) + 1 and s[:-1] == prefix),
+                key=lambda item: item[1][0], reverse=True,
+            )
+            for stack, (seconds, calls, ipc) in children:
+                label = f"{'  ' * (len(stack) - 1)}{stack[-1]}"
+                detail = f"{calls:>4}x  {ipc:>5} ipc" if len(stack) > 1 and stack[-1] != PYTHON_FRAME else ""
+                lines.append(f"  {label:<48} {seconds:8.3f}s {100 * seconds / total:5.1f}%  {detail}".rstrip())
+                visit(stack)
+
+        visit(())
+        if len(lines) > limit:
+            lines = lines[:limit] + [f"  ... {len(lines) - limit} more in the .folded file"]
+        return lines
+
+
+def _stack(is_async: bool) -> Stack:
+    return _async_stack.get() if is_async else getattr(_sync_stack, "value", ())
+
+
+def _set_stack(is_async: bool, stack: Stack):
+    if is_async:
+        _async_stack.set(stack)
+    else:
+        _sync_stack.value = stack
+
+
+@contextmanager
+def step(name: str, is_async: bool = False) -> Iterator[None]:
+    """Time the enclosed block as ``name`` under the current step, if a test is being profiled."""
+    recorder = _current
+    if recorder is None:
+        yield
+        return
+    outer = _stack(is_async)
+    stack = outer + (name,)
+    _set_stack(is_async, stack)
+    ipc = _ipc.value
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(stack, time.perf_counter() - started, _ipc.value - ipc)
+        _set_stack(is_async, outer)
+
+
+def _timed(label: str, fn: Callable) -> Callable:
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def timed_async(*args, **kwargs):
+            with step(label, is_async=True):
+                return await fn(*args, **kwargs)
+        return timed_async
+
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        with step(label):
+            return fn(*args, **kwargs)
+    return timed
+
+
+def timed_handler(handler: Callable) -> Callable:
+    """``handler`` timed as ``route:<name>`` while profiling; unchanged otherwise."""
+    if not _installed:
+        return handler
+    return _timed(f"route:{handler.__qualname__.replace('.<locals>', '')}", handler)
+
+
+def _count_ipc(send: Callable) -> Callable:
+    @functools.wraps(send)
+    def counted(*args, **kwargs):
+        _ipc.value += 1
+        return send(*args, **kwargs)
+    return counted
+
+
+def install():
+    """Wrap the Playwright API once per process."""
+    global _installed
+    if _installed:
+        return
+    import playwright.async_api
+    import playwright.sync_api
+    from playwright._impl._connection import Connection
+
+    Connection._send_message_to_server = _count_ipc(Connection._send_message_to_server)
+    for module in (playwright.sync_api, playwright.async_api):
+        for class_name in INSTRUMENTED:
+            cls = getattr(module, class_name, None)
+            if cls is None:
+                continue
+            for name, attr in list(vars(cls).items()):
+                if name.startswith("_") or name in _LOCAL or name.startswith(_LOCAL_PREFIXES):
+                    continue
+                if inspect.isfunction(attr):
+                    setattr(cls, name, _timed(f"{class_name}.{name}", attr))
+    _installed = True
+
+
+class StepProfiler:
+    """Pytest plugin: a :class:`StepRecorder` per test, reported at the end of the session."""
+
+    def __init__(self, directory: Path = PROFILE_DIR, python: bool = False):
+        self.directory = directory
+        self.python = python
+        self.summaries: Dict[str, List[str]] = {}
+        self._started: Tuple[float, int] = (0.0, 0)
+        self._cprofile: Optional[cProfile.Profile] = None
+        install()
+
+    def _path(self, nodeid: str, suffix: str) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory / f"{_UNSAFE.sub('_', nodeid).strip('_')[:150]}{suffix}"
+
+    def _open_phase(self, name: str):
+        _current.phase = name
+        _set_stack(False, ())
+        self._started = (time.perf_counter(), _ipc.value)
+
+    def _close_phase(self):
+        started, ipc = self._started
+        phase = _current.phase
+        elapsed = time.perf_counter() - started
+        _current.stacks[(phase,)] = [elapsed, 1, _ipc.value - ipc]
+        if phase == "call":
+            stepped = sum(e[0] for s, e in _current.stacks.items() if len(s) == 2 and s[0] == phase)
+            _current.stacks[(phase, PYTHON_FRAME)] = [max(0.0, elapsed - stepped), 1, 0]
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        global _current
+        _current = StepRecorder()
+        self._open_phase("setup")
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_call(self, item):
+        self._close_phase()
+        self._open_phase("call")
+        if self.python:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_teardown(self, item):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._path(item.nodeid, ".prof"))
+            self._cprofile = None
+        self._close_phase()
+        self._open_phase("teardown")
+
+    def pytest_runtest_logreport(self, report):
+        global _current
+        if report.when != "teardown" or _current is None:
+            return
+        self._close_phase()
+        self._path(report.nodeid, ".folded").write_text(_current.folded(), encoding="utf-8")
+        self.summaries[report.nodeid] = _current.summary()
+        _current = None
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.summaries:
+            return
+        terminalreporter.write_sep("-", f"step profile (folded stacks in {self.directory})")
+        for nodeid, lines in self.summaries.items():
+            terminalreporter.write_line(nodeid)
+            for line in lines:
+                terminalreporter.write_line(line)
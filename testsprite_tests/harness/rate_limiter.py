@@ -0,0 +1,85 @@
+"""Python port of ``src/lib/rateLimiter.ts``'s ``MemoryRateLimiter``.
+
+The stand-in backend uses it when asked to (``StubBackend(rate_limits=True)``),
+and ``harness.ratelimit_burst`` replays a burst through it to know which
+requests the app should have refused. The semantics match the TypeScript
+class line for line:
+
+* a fixed window per identifier, which starts at its first request;
+* ``limit`` requests per window;
+* no sliding window;
+* a full sweep of expired entries on a random 5% of checks.
+"""
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, NamedTuple, Optional
+
+
+class Limit(NamedTuple):
+    limit: int
+    window_ms: int
+
+
+# The limiter instances exported by src/lib/rateLimiter.ts
+LOGIN_LIMIT = Limit(5, 15 * 60 * 1000)  # loginRateLimiter, keyed "<ip>:<email>"
+API_LIMIT = Limit(60, 60 * 1000)  # apiRateLimiter, keyed "admin_api:<ip>"
+
+CLEANUP_PROBABILITY = 0.05
+
+
+@dataclass
+class Entry:
+    count: int
+    reset_time: float
+
+
+class CheckResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset_in: float
+
+
+def _now_ms() -> float:
+    return time.time() * 1000
+
+
+class MemoryRateLimiter:
+    def __init__(
+        self,
+        config: Limit,
+        clock: Callable[[], float] = _now_ms,
+        rng: Optional[random.Random] = None,
+        cleanup_probability: float = CLEANUP_PROBABILITY,
+    ):
+        self.config = config
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.cleanup_probability = cleanup_probability
+        self.store: Dict[str, Entry] = {}
+        self.sweeps = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def check(self, identifier: str, now: Optional[float] = None) -> CheckResult:
+        now = self.clock() if now is None else now
+        entry = self.store.get(identifier)
+        if self.rng.random() < self.cleanup_probability:
+            self.cleanup(now)
+        if entry is None or now > entry.reset_time:
+            self.store[identifier] = Entry(1, now + self.config.window_ms)
+            return CheckResult(True, self.config.limit - 1, self.config.window_ms)
+        if entry.count >= self.config.limit:
+            return CheckResult(False, 0, entry.reset_time - now)
+        entry.count += 1
+        return CheckResult(True, self.config.limit - entry.count, entry.reset_time - now)
+
+    def reset(self, identifier: str):
+        self.store.pop(identifier, None)
+
+    def cleanup(self, now: Optional[float] = None):
+        now = self.clock() if now is None else now
+        self.sweeps += 1
+        for key in [k for k, e in self.store.items() if now > e.reset_time]:
+            del self.store[key]
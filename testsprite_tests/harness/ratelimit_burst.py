@@ -0,0 +1,336 @@
+"""Concurrent bursts against the app's in-memory rate limiter.
+
+``src/lib/rateLimiter.ts`` keeps one ``Map`` entry per identifier, admits
+``limit`` requests per fixed window, and sweeps expired entries on a
+random 5% of checks. This fires waves of simultaneous requests from many
+simulated clients (``X-Forwarded-For`` addresses in 10.0.0.0/8) and
+measures three things:
+
+* **429 accuracy.** The same request sequence is replayed through
+  :class:`harness.rate_limiter.MemoryRateLimiter`, which gives how many
+  requests each identifier should have had refused. A refusal the model
+  did not expect is a false 429. An admission beyond the model's is
+  over-admission, as happens when two server instances each keep their
+  own ``Map``.
+* **Check cost.** A 429 returns straight after the check, so its latency
+  is the auth plus limiter path with nothing behind it. It is reported
+  next to the latency of admitted requests.
+* **Map growth.** A ``Map`` inside the Node process cannot be read from
+  outside, so its size comes from the model: total entries, and the
+  entries still inside their window, which no sweep can remove. With
+  ``--fresh-ips`` every wave brings new clients, the worst case for
+  growth. The resident memory of the server's process group is sampled
+  after each wave (``--serve`` or ``--server-pid``, Linux only).
+
+Only responses from behind the limiter are scored: a 429, or the
+target's own answer (200 for ``orders``, 401 for a wrong password on
+``login``). Anything else, above all a 401/403 from ``middleware.ts`` for
+a missing or non-admin session, never reached the check. It is counted as
+``unscored``, and the run fails.
+
+Targets are ``orders`` (``apiRateLimiter``, 60/min) and ``login``
+(``loginRateLimiter``, 5 per 15 min per address and email, sent with a
+wrong password). ``orders`` needs an admin session, from ``--login`` or
+``--cookie``. ``login`` runs against the stand-in only, because
+``middleware.ts`` answers 401 to ``/api/admin/login`` without a session,
+in front of its limiter::
+
+    python -m harness.ratelimit_burst --stub --ips 500 --requests-per-ip 80 --waves 3
+    python -m harness.ratelimit_burst --serve start --login --ips 2000 --waves 10 --interval 5 --fresh-ips
+    python -m harness.ratelimit_burst --stub --target login --ips 1000 --requests-per-ip 8
+
+A row per wave is printed at the end, and the report is written as JSON under
+``tmp/bench``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from harness.aio_http import AsyncHttpPool
+from harness.config import BASE_URL, BENCH_DIR
+from harness.fixtures import ADMIN_CREDENTIALS
+from harness.loadgen import admin_login
+from harness.rate_limiter import API_LIMIT, LOGIN_LIMIT, Limit, MemoryRateLimiter
+from harness.stats import format_table, summarize
+
+ORDERS = "orders"
+LOGIN = "login"
+
+BURST_EMAIL = "burst@example.com"
+
+
+@dataclass(frozen=True)
+class Target:
+    limit: Limit
+    method: str
+    path: str
+    key: Callable[[str], str]  # client address -> limiter identifier
+    admitted: int  # the route's status for a request the limiter let through
+
+
+TARGETS = {
+    ORDERS: Target(API_LIMIT, "GET", "/api/admin/orders", lambda ip: f"admin_api:{ip}", 200),
+    LOGIN: Target(LOGIN_LIMIT, "POST", "/api/admin/login", lambda ip: f"{ip}:{BURST_EMAIL}", 401),
+}
+
+
+def client_ip(index: int) -> str:
+    return f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+
+
+def group_rss_kb(pgid: int) -> Optional[int]:
+    """Summed VmRSS of the processes in group ``pgid``; ``None`` where /proc is unavailable."""
+    total = 0
+    found = False
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            if os.getpgid(int(entry)) != pgid:
+                continue
+            with open(f"/proc/{entry}/status", encoding="ascii") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        found = True
+                        break
+        except (OSError, ValueError):
+            continue  # exited meanwhile, or not ours to read
+    return total if found else None
+
+
+@dataclass
+class Wave:
+    number: int
+    clients: int
+    elapsed: float = 0.0
+    statuses: Counter = field(default_factory=Counter)
+    # identifier -> [admitted, refused] by the server and by the model
+    actual: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(lambda: [0, 0]))
+    expected: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(lambda: [0, 0]))
+    admitted_ms: List[float] = field(default_factory=list)
+    refused_ms: List[float] = field(default_factory=list)
+    entries: int = 0
+    live_entries: int = 0
+    sweeps: int = 0
+    server_entries: Optional[int] = None
+    rss_kb: Optional[int] = None
+    unscored: int = 0  # answered without reaching the limiter (401/403 from middleware.ts, ...)
+
+    def row(self) -> Dict[str, Any]:
+        over = sum(max(0, a[0] - self.expected[k][0]) for k, a in self.actual.items())
+        false_429 = sum(max(0, a[1] - self.expected[k][1]) for k, a in self.actual.items())
+        admitted, refused = summarize(self.admitted_ms), summarize(self.refused_ms)
+        requests = sum(self.statuses.values())
+        return {
+            "wave": self.number,
+            "requests": requests,
+            "rps": requests / self.elapsed if self.elapsed else 0.0,
+            "429": self.statuses.get(429, 0),
+            "expected": sum(e[1] for e in self.expected.values()),
+            "over": over,
+            "false429": false_429,
+            "unscored": self.unscored,
+            "errors": sum(n for s, n in self.statuses.items() if not isinstance(s, int) or s >= 500),
+            "p50 ok": admitted.p50,
+            "p95 ok": admitted.p95,
+            "p50 429": refused.p50,
+            "p95 429": refused.p95,
+            "entries": self.entries if self.server_entries is None else self.server_entries,
+            "live": self.live_entries,
+            "rss MB": self.rss_kb / 1024 if self.rss_kb is not None else float("nan"),
+            "statuses": {str(s): n for s, n in self.statuses.items()},
+            "model_entries": self.entries,
+            "model_sweeps": self.sweeps,
+        }
+
+
+async def _burst(
+    pool: AsyncHttpPool,
+    target: Target,
+    ips: Sequence[str],
+    per_ip: int,
+    concurrency: int,
+    rng: random.Random,
+) -> List[Tuple[str, Any, float]]:
+    """Every request of the wave at once, shuffled; (address, status, ms) per request."""
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    order = [ip for ip in ips for _ in range(per_ip)]
+    rng.shuffle(order)
+
+    async def fire(ip: str) -> Tuple[str, Any, float]:
+        headers = {"X-Forwarded-For": ip}
+        async with slots:
+            # timed inside the slot, so the latency is the server's, not this queue's
+            started = loop.time()
+            try:
+                if target.method == "GET":
+                    status: Any = (await pool.get(target.path, headers=headers)).status
+                else:
+                    body = {"email": BURST_EMAIL, "password": "wrong-password"}
+                    status = (await pool.post(target.path, json=body, headers=headers)).status
+            except Exception as exc:  # a failed request is a data point, not a crash
+                status = type(exc).__name__
+            return ip, status, (loop.time() - started) * 1000
+
+    return await asyncio.gather(*(fire(ip) for ip in order))
+
+
+async def run_bursts(
+    pool: AsyncHttpPool,
+    target: Target,
+    clients: int,
+    per_ip: int,
+    waves: int,
+    interval: float,
+    fresh_ips: bool = False,
+    concurrency: int = 256,
+    seed: int = 0,
+    server_pid: Optional[int] = None,
+    server_limiter: Optional[MemoryRateLimiter] = None,
+    on_wave: Optional[Callable[[Wave], None]] = None,
+) -> List[Wave]:
+    rng = random.Random(seed)
+    model = MemoryRateLimiter(target.limit, rng=random.Random(seed))
+    results = []
+    for number in range(1, waves + 1):
+        started = time.monotonic()
+        first = (number - 1) * clients if fresh_ips else 0
+        ips = [client_ip(i) for i in range(first, first + clients)]
+        wave = Wave(number, clients)
+        for ip, status, ms in await _burst(pool, target, ips, per_ip, concurrency, rng):
+            key = target.key(ip)
+            wave.statuses[status] += 1
+            if not isinstance(status, int) or status >= 500:
+                continue
+            if status not in (429, target.admitted):
+                wave.unscored += 1
+                continue
+            refused = status == 429
+            wave.actual[key][refused] += 1
+            (wave.refused_ms if refused else wave.admitted_ms).append(ms)
+            wave.expected[key][not model.check(key).allowed] += 1
+        wave.elapsed = time.monotonic() - started
+        now = time.time() * 1000
+        wave.entries = len(model)
+        wave.live_entries = sum(1 for e in model.store.values() if now <= e.reset_time)
+        wave.sweeps = model.sweeps
+        if server_limiter is not None:
+            wave.server_entries = len(server_limiter)
+        if server_pid is not None:
+            wave.rss_kb = group_rss_kb(server_pid)
+        results.append(wave)
+        if on_wave is not None:
+            on_wave(wave)
+        if number < waves:
+            await asyncio.sleep(max(0.0, interval - wave.elapsed))
+    return results
+
+
+TABLE_COLUMNS = (
+    "wave", "requests", "rps", "429", "expected", "over", "false429", "unscored", "errors",
+    "p50 ok", "p95 ok", "p50 429", "p95 429", "entries", "live", "rss MB",
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness.ratelimit_burst", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--target", choices=sorted(TARGETS), default=ORDERS)
+    parser.add_argument("--ips", type=int, default=1000, help="simulated client addresses per wave")
+    parser.add_argument("--requests-per-ip", type=int, help="default: the target's limit plus 20%%")
+    parser.add_argument("--waves", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds from one wave's start to the next")
+    parser.add_argument("--fresh-ips", action="store_true", help="new addresses every wave (Map growth)")
+    parser.add_argument("--concurrency", type=int, default=256, help="requests outstanding at once")
+    parser.add_argument("--connections", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--login", action="store_true",
+                        help="sign in as admin through Supabase's password grant first (orders)")
+    parser.add_argument("--email", default=ADMIN_CREDENTIALS["email"])
+    parser.add_argument("--password", default=ADMIN_CREDENTIALS["password"])
+    parser.add_argument("--cookie", help="raw Cookie header for an existing admin session")
+    server = parser.add_mutually_exclusive_group()
+    server.add_argument("--stub", action="store_true", help="burst the in-process stand-in with its rate limits on")
+    server.add_argument("--serve", choices=("dev", "start"), help="start next dev/start for the run and sample its RSS")
+    parser.add_argument("--server-pid", type=int, help="process group whose RSS to sample (an already running server)")
+    parser.add_argument("--out", type=Path, help="JSON report path (default: tmp/bench/ratelimit-<time>.json)")
+    return parser
+
+
+async def _drive(args, base_url: str, server_pid: Optional[int], server_limiter) -> List[Wave]:
+    headers = {"Cookie": args.cookie} if args.cookie else {}
+    target = TARGETS[args.target]
+    per_ip = args.requests_per_ip or target.limit.limit * 6 // 5
+    async with AsyncHttpPool(base_url, max_connections=args.connections, headers=headers) as pool:
+        if args.login and args.target == ORDERS:
+            await admin_login(pool, args.email, args.password, base_url if args.stub else None)
+        return await run_bursts(
+            pool, target, args.ips, per_ip, args.waves, args.interval, args.fresh_ips, args.concurrency,
+            args.seed, server_pid, server_limiter,
+            on_wave=lambda wave: print(f"wave {wave.number}: {sum(wave.statuses.values())} requests "
+                                       f"in {wave.elapsed:.1f}s, {wave.statuses.get(429, 0)} refused"),
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.target == LOGIN and not args.stub:
+        parser.error("--target login needs --stub: middleware.ts answers 401 to /api/admin/login before its limiter")
+
+    base_url = args.base_url
+    server_pid = args.server_pid
+    server_limiter = None
+    stub = app = None
+    if args.stub:
+        from harness.stub_backend import StubBackend
+        from harness.stub_server import StubServer
+
+        stub = StubServer(StubBackend(rate_limits=True)).start()
+        base_url = stub.base_url
+        server_limiter = stub.backend.api_limiter if args.target == ORDERS else stub.backend.login_limiter
+        args.login = True
+    elif args.serve:
+        from harness.app_server import AppServer
+
+        app = AppServer(args.serve).start()
+        base_url = app.base_url
+        server_pid = app.pid
+    try:
+        waves = asyncio.run(_drive(args, base_url, server_pid, server_limiter))
+    finally:
+        if stub is not None:
+            stub.stop()
+        if app is not None:
+            app.stop()
+
+    rows = [wave.row() for wave in waves]
+    print(format_table(rows, TABLE_COLUMNS))
+    print(f"{args.target} ({TARGETS[args.target].limit.limit} per {TARGETS[args.target].limit.window_ms // 1000}s) "
+          f"against {base_url}: {sum(r['over'] for r in rows)} over-admitted, {sum(r['false429'] for r in rows)} false 429s")
+    unscored = sum(r["unscored"] for r in rows)
+    if unscored:
+        print(f"{unscored} responses never reached the limiter (statuses: "
+              f"{dict(sum((Counter(r['statuses']) for r in rows), Counter()))}); no admin session? use --login or --cookie")
+    out = args.out or BENCH_DIR / f"ratelimit-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"base_url": base_url, "target": args.target, "waves": rows}, indent=2), encoding="utf-8")
+    print(f"report: {out}")
+    return 1 if any(r["over"] or r["false429"] or r["unscored"] or r["errors"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
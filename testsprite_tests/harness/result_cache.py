@@ -0,0 +1,177 @@
+"""Content-addressed cache of passing TC results.
+
+A case's key is a SHA-256 over everything that can change its outcome:
+
+* its own source;
+* ``conftest.py`` and every ``harness`` module reachable from it or the
+  case through imports;
+* its plan entry;
+* the app inputs: ``app/``, ``src/``, ``public/`` and the root build and
+  env files in :data:`APP_INPUTS` (``.env``, ``.env.local`` and every
+  other ``.env.*``);
+* the app under test: its base URL, or the ``--serve`` mode that starts it;
+* the ``TESTSPRITE_*`` settings that change what a case checks or how it
+  runs (:func:`settings_signature`): axe and the axe build it loads,
+  headed mode, the browser/device matrix and the throttle profiles.
+
+The runner skips a case whose key is already stored, and only passing
+results are stored. Entries live in ``tmp/result_cache.json`` and the
+least recently used ones are evicted beyond :data:`MAX_ENTRIES`.
+"""
+import ast
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from harness.browser_pool import headless_from_env
+from harness.config import AXE_ENABLED, AXE_SOURCE_PATH, BASE_URL, LOCKS_DIR, REPO_ROOT, RESULT_CACHE_PATH, SUITE_DIR
+from harness.locks import file_lock, utc_timestamp
+from harness.matrix import matrix_signature
+from harness.plan import case_id, load_plan
+from harness.throttle import profiles_from_env
+
+MAX_ENTRIES = 512
+
+APP_INPUTS = (
+    "app", "src", "public",
+    "middleware.ts", "next.config.mjs", "tailwind.config.ts", "postcss.config.js",
+    "tsconfig.json", "package.json", "package-lock.json", ".env", ".env.*",
+)
+_SKIP_DIRS = {"node_modules", ".next", "__pycache__"}
+
+
+def _digest_files(paths: Iterable[Path], root: Path) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def app_hash(repo_root: Path = REPO_ROOT, inputs: Iterable[str] = APP_INPUTS) -> str:
+    files: List[Path] = []
+    for name in inputs:
+        for path in repo_root.glob(name) if "*" in name else [repo_root / name]:
+            if path.is_file():
+                files.append(path)
+            elif path.is_dir():
+                for dirpath, dirnames, filenames in os.walk(path):
+                    dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
+                    files.extend(Path(dirpath) / f for f in filenames)
+    return _digest_files(set(files), repo_root)
+
+
+def settings_signature() -> str:
+    """The outcome-affecting ``TESTSPRITE_*`` settings in effect, for cache keys.
+
+    Bookkeeping settings (results log, run id, attempt, worker, ports,
+    artifacts, profiling) are left out: they change what is recorded, not
+    what passes.
+    """
+    axe = None
+    if AXE_ENABLED:
+        axe = str(AXE_SOURCE_PATH)
+        if AXE_SOURCE_PATH.is_file():
+            axe = hashlib.sha256(AXE_SOURCE_PATH.read_bytes()).hexdigest()
+    return json.dumps({
+        "axe": axe,
+        "headed": not headless_from_env(),
+        "matrix": matrix_signature(),
+        "throttle": profiles_from_env(),
+    }, sort_keys=True)
+
+
+def harness_imports(path: Path, suite_dir: Path = SUITE_DIR) -> Set[Path]:
+    """``harness`` modules imported by ``path``, transitively, including function-local imports."""
+    seen: Set[Path] = set()
+    pending = [path]
+    while pending:
+        tree = ast.parse(pending.pop().read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+            elif isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            else:
+                continue
+            for name in names:
+                if name.split(".")[0] != "harness":
+                    continue
+                module = suite_dir.joinpath(*name.split(".")).with_suffix(".py")
+                if module.exists() and module not in seen:
+                    seen.add(module)
+                    pending.append(module)
+    return seen
+
+
+class ResultCache:
+    def __init__(self, path: Path = RESULT_CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._app_hash: Optional[str] = None
+        self._plan: Optional[Dict[str, dict]] = None
+
+    def key(self, case: Path, target: str = BASE_URL) -> str:
+        """``case``'s key against ``target``, the app under test: a base URL, or a ``--serve`` mode."""
+        if self._app_hash is None:
+            self._app_hash = app_hash()
+            self._plan = load_plan()
+        conftest = case.parent / "conftest.py"
+        sources = {case, conftest} | harness_imports(case, case.parent) | harness_imports(conftest, case.parent)
+        digest = hashlib.sha256()
+        digest.update(_digest_files(sources, case.parent).encode())
+        digest.update(json.dumps(self._plan.get(case_id(case), {}), sort_keys=True).encode())
+        digest.update(self._app_hash.encode())
+        digest.update(target.encode())
+        digest.update(settings_signature().encode())
+        return digest.hexdigest()
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, entries: Dict[str, dict]):
+        if len(entries) > self.max_entries:
+            newest = sorted(entries, key=lambda k: entries[k]["lastUsed"], reverse=True)[:self.max_entries]
+            entries = {k: entries[k] for k in newest}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(entries, fh, indent=2)
+        os.replace(tmp, self.path)
+
+    def lookup(self, keys: Dict[str, str]) -> Dict[str, dict]:
+        """Cached passing results for the TC ids in ``keys`` (TC id -> key), marking them used."""
+        with file_lock(LOCKS_DIR / "result_cache.lock", "result_cache", wait=30):
+            entries = self._read()
+            hits = {tc: entries[key] for tc, key in keys.items() if key in entries}
+            if hits:
+                now = utc_timestamp()
+                for tc in hits:
+                    entries[keys[tc]]["lastUsed"] = now
+                self._write(entries)
+        return hits
+
+    def store(self, keys: Dict[str, str], records: Iterable[dict]):
+        """Store the cases in ``keys`` whose records all passed."""
+        outcomes: Dict[str, List[str]] = {}
+        durations: Dict[str, float] = {}
+        for record in records:
+            tc = case_id(record["file"])
+            outcomes.setdefault(tc, []).append(record["outcome"])
+            durations[tc] = durations.get(tc, 0.0) + record["duration"]
+        passed = [tc for tc, seen in outcomes.items() if tc in keys and set(seen) == {"passed"}]
+        if not passed:
+            return
+        with file_lock(LOCKS_DIR / "result_cache.lock", "result_cache", wait=30):
+            entries = self._read()
+            now = utc_timestamp()
+            for tc in passed:
+                entries[keys[tc]] = {"case": tc, "duration": round(durations[tc], 3), "stored": now, "lastUsed": now}
+            self._write(entries)
@@ -0,0 +1,210 @@
+"""The attempt log and its compaction into TestSprite's ``tmp/test_results.json``.
+
+Workers append one JSON line per test attempt to ``tmp/results/attempts.jsonl``.
+Each line is a single ``O_APPEND`` write, so parallel shards need no lock
+and the log can be tailed while a run is in progress. An attempt references
+its TC source by SHA-256 (``codeHash``). The source itself is stored once
+under ``tmp/results/code/``.
+
+:func:`compact` folds the latest run of every case into
+``tmp/test_results.json``. That file keeps TestSprite's schema (one entry
+per TC, with ``title``, ``code``, ``testStatus``, ``testError``...), and
+entries for cases absent from the log are left untouched::
+
+    python -m harness.results                 # compact
+    python -m harness.results --keep-runs 5   # also drop older attempts and unused code
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from harness.config import CODE_STORE_DIR, LOCKS_DIR, RESULTS_LOG_PATH, RESULTS_PATH, SUITE_DIR
+from harness.locks import file_lock, utc_timestamp
+from harness.plan import case_id, load_plan
+
+
+def read_results(path: Path = RESULTS_PATH) -> List[dict]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return []
+
+
+def write_results(entries: List[dict], path: Path = RESULTS_PATH):
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(entries, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def title_case_id(title: str) -> str:
+    """``TC001-Home Page Load and Render`` -> ``TC001``."""
+    return title.split("-", 1)[0]
+
+
+# -- code store -----------------------------------------------------------
+
+def store_code(source: Path, store: Path = CODE_STORE_DIR) -> str:
+    """Store ``source`` under its SHA-256 unless already present and return the hash."""
+    data = source.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    target = store / f"{digest}.py"
+    if not target.exists():
+        store.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    return digest
+
+
+def load_code(digest: str, store: Path = CODE_STORE_DIR) -> Optional[str]:
+    try:
+        return (store / f"{digest}.py").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+# -- attempt log ----------------------------------------------------------
+
+def append_jsonl(path: Path, record: dict):
+    """Append ``record`` as one JSON line in a single write, so concurrent writers never interleave lines."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def append_attempt(record: dict, path: Path = RESULTS_LOG_PATH):
+    append_jsonl(path, record)
+
+
+def read_attempts(path: Path = RESULTS_LOG_PATH, run: Optional[str] = None) -> Iterator[dict]:
+    """Attempts in append order, optionally only those of ``run``.
+
+    A torn last line (a writer killed mid-write) is skipped.
+    """
+    try:
+        fh = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if run is None or record.get("run") == run:
+                yield record
+
+
+def latest_runs(records: Iterable[dict]) -> Dict[str, List[dict]]:
+    """Per TC, the attempts of the run that appended last for it.
+
+    Within that run a retried test keeps only its last attempt.
+    """
+    latest: Dict[str, Dict[str, dict]] = {}
+    for record in records:
+        tc_id = case_id(record["file"])
+        current = latest.get(tc_id)
+        if not current or next(iter(current.values()))["run"] != record["run"]:
+            current = latest[tc_id] = {}
+        current.pop(record["nodeid"], None)
+        current[record["nodeid"]] = record
+    return {tc_id: list(attempts.values()) for tc_id, attempts in latest.items()}
+
+
+# -- compaction -----------------------------------------------------------
+
+def build_entry(tc_id: str, records: List[dict], plan: Dict[str, dict], previous: dict) -> dict:
+    case = plan.get(tc_id, {})
+    source = SUITE_DIR / records[0]["file"]
+    failed = [r for r in records if r["outcome"] == "failed"]
+    code = load_code(records[0].get("codeHash", ""))
+    entry = dict(previous)
+    entry.update(
+        {
+            "title": f"{tc_id}-{case.get('title', source.stem)}",
+            "description": case.get("description", previous.get("description", "")),
+            "code": code if code is not None else previous.get("code", ""),
+            "testStatus": "FAILED" if failed else "PASSED",
+            "testError": "".join(
+                f"[{r['nodeid']}]\n{r['error']}" if len(records) > 1 else r["error"] for r in failed
+            ),
+            "testType": previous.get("testType", "FRONTEND"),
+            "duration": round(sum(r["duration"] for r in records), 3),
+            "created": previous.get("created", min(r["started"] for r in records)),
+            "modified": max(r.get("finished", r["started"]) for r in records),
+        }
+    )
+    return entry
+
+
+def compact(
+    log_path: Path = RESULTS_LOG_PATH,
+    path: Path = RESULTS_PATH,
+    keep_runs: Optional[int] = None,
+) -> List[dict]:
+    """Rewrite ``test_results.json`` from the latest run of each case in the log.
+
+    With ``keep_runs``, the log is also rewritten to hold only the last
+    ``keep_runs`` runs, and code no remaining attempt references is deleted.
+    """
+    plan = load_plan()
+    with file_lock(LOCKS_DIR / "results.lock", "compact_results", wait=30):
+        latest = latest_runs(read_attempts(log_path))
+        existing = {title_case_id(e["title"]): e for e in read_results(path)}
+        for tc_id, records in latest.items():
+            existing[tc_id] = build_entry(tc_id, records, plan, existing.get(tc_id, {}))
+        entries = [existing[tc_id] for tc_id in sorted(existing)]
+        write_results(entries, path)
+        if keep_runs is not None:
+            prune_log(log_path, keep_runs)
+    return entries
+
+
+def prune_log(log_path: Path = RESULTS_LOG_PATH, keep_runs: int = 1, store: Path = CODE_STORE_DIR):
+    """Keep the last ``keep_runs`` runs plus each case's latest run; garbage-collect the code store.
+
+    Callers hold ``results.lock``. Attempts appended by a worker while the
+    log is rewritten would be lost, so prune between runs.
+    """
+    records = list(read_attempts(log_path))
+    runs: List[str] = []
+    for record in records:
+        if record["run"] in runs:
+            runs.remove(record["run"])
+        runs.append(record["run"])
+    keep = set(runs[-keep_runs:]) if keep_runs > 0 else set()
+    keep |= {attempts[0]["run"] for attempts in latest_runs(records).values()}
+    kept = [r for r in records if r["run"] in keep]
+
+    tmp = log_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        for record in kept:
+            fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+    os.replace(tmp, log_path)
+
+    referenced = {r.get("codeHash") for r in kept}
+    for blob in store.glob("*.py"):
+        if blob.stem not in referenced:
+            blob.unlink(missing_ok=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.results", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--keep-runs", type=int, help="drop attempts older than the last N runs")
+    args = parser.parse_args(argv)
+    entries = compact(keep_runs=args.keep_runs)
+    print(f"{RESULTS_PATH}: {len(entries)} cases at {utc_timestamp()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
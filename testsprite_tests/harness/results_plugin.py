@@ -0,0 +1,89 @@
+"""Pytest plugin that appends per-test attempts to the results log.
+
+Loaded by the runner with ``-p harness.results_plugin``; it is inert unless
+``TESTSPRITE_RESULTS_LOG`` names the log to append to (see
+``harness.results``). Each attempt is written as soon as its teardown
+finishes, tagged with ``TESTSPRITE_RUN_ID``, the retry round
+(``TESTSPRITE_ATTEMPT``) and the shard's worker slot. Failures also carry
+their ``failureClass`` (see ``harness.diagnosis``).
+"""
+import os
+from pathlib import Path
+
+from harness.config import SUITE_DIR
+from harness.diagnosis import classify_failure
+from harness.locks import utc_timestamp
+from harness.results import append_attempt, store_code
+
+RESULTS_LOG_ENV = "TESTSPRITE_RESULTS_LOG"
+RUN_ID_ENV = "TESTSPRITE_RUN_ID"
+ATTEMPT_ENV = "TESTSPRITE_ATTEMPT"
+WORKER_ENV = "TESTSPRITE_WORKER"
+
+
+class AttemptRecorder:
+    def __init__(self, path: Path, run: str, worker: str, attempt: int = 0):
+        self.path = path
+        self.run = run
+        self.worker = worker
+        self.attempt = attempt
+        self.records = {}
+        self.code_hashes = {}
+
+    def _record(self, report) -> dict:
+        record = self.records.get(report.nodeid)
+        if record is None:
+            file = report.nodeid.split("::", 1)[0]
+            if file not in self.code_hashes:
+                self.code_hashes[file] = store_code(SUITE_DIR / file)
+            record = self.records[report.nodeid] = {
+                "run": self.run,
+                "attempt": self.attempt,
+                "worker": self.worker,
+                "nodeid": report.nodeid,
+                "file": file,
+                "codeHash": self.code_hashes[file],
+                "outcome": "passed",
+                "duration": 0.0,
+                "error": "",
+                "started": utc_timestamp(),
+            }
+        return record
+
+    def _emit(self, nodeid: str):
+        record = self.records.pop(nodeid)
+        record["finished"] = utc_timestamp()
+        if record["outcome"] == "failed":
+            record["failureClass"] = classify_failure(record["error"])
+        append_attempt(record, self.path)
+
+    def pytest_collectreport(self, report):
+        # import errors never reach the runtest hooks
+        if report.failed and report.nodeid.endswith(".py"):
+            record = self._record(report)
+            record["outcome"] = "failed"
+            record["error"] += report.longreprtext + "\n"
+            self._emit(report.nodeid)
+
+    def pytest_runtest_logreport(self, report):
+        record = self._record(report)
+        record["duration"] += report.duration
+        if report.failed:
+            record["outcome"] = "failed"
+            record["error"] += report.longreprtext + "\n"
+        elif report.skipped and record["outcome"] == "passed":
+            record["outcome"] = "skipped"
+        if report.when == "teardown":
+            self._emit(report.nodeid)
+
+
+def pytest_configure(config):
+    path = os.environ.get(RESULTS_LOG_ENV)
+    if path:
+        recorder = AttemptRecorder(
+            Path(path),
+            os.environ.get(RUN_ID_ENV) or f"{utc_timestamp()}-{os.getpid()}",
+            os.environ.get(WORKER_ENV, ""),
+            int(os.environ.get(ATTEMPT_ENV, 0)),
+        )
+        config.pluginmanager.register(recorder, "testsprite-attempt-recorder")
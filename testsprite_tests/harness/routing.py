@@ -0,0 +1,56 @@
+"""Selective network interception for the Playwright cases.
+
+Only backend traffic -- Next.js ``/api/**`` routes and Supabase REST/auth
+endpoints -- is routed through Python. JS/CSS chunks, fonts and images are
+never matched, so they load from the dev server as in a real session and
+do not cost a Python round trip each.
+
+Patterns are passed to Playwright as a compiled regex rather than a Python
+predicate, which lets the browser side decide what to pause without asking
+the client about every request.
+"""
+import json
+import re
+from typing import Any, Awaitable, Callable, Pattern, Union
+
+from harness.profiler import timed_handler
+
+# Supabase storage (/storage/v1/) is deliberately absent: product images live there.
+API_URL: Pattern[str] = re.compile(
+    r"/api/"                  # Next.js route handlers (app/api, src/app/api)
+    r"|/(?:rest|auth)/v1/"    # Supabase PostgREST and GoTrue, hosted or local
+)
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def json_body(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def json_handler(payload: Any = None, status: int = 200) -> Callable:
+    """A route handler that fulfills with ``payload``, serialized once up front."""
+    body = json_body({} if payload is None else payload)
+
+    def handle(route, request=None):
+        route.fulfill(status=status, content_type=JSON_CONTENT_TYPE, body=body)
+
+    return handle
+
+
+def async_json_handler(payload: Any = None, status: int = 200) -> Callable[..., Awaitable[None]]:
+    body = json_body({} if payload is None else payload)
+
+    async def handle(route, request=None):
+        await route.fulfill(status=status, content_type=JSON_CONTENT_TYPE, body=body)
+
+    return handle
+
+
+def route_api(target, handler: Callable, pattern: Union[str, Pattern[str]] = API_URL):
+    """Route backend calls on a page or context to ``handler``; assets pass through."""
+    target.route(pattern, timed_handler(handler))
+
+
+async def route_api_async(target, handler: Callable, pattern: Union[str, Pattern[str]] = API_URL):
+    await target.route(pattern, timed_handler(handler))
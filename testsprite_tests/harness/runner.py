@@ -0,0 +1,366 @@
+"""Parallel runner for the TC* suite.
+
+Discovers the TC cases, shards them across worker processes and compacts
+the attempts they log into ``tmp/test_results.json``::
+
+    python -m harness.runner -n 4
+    python -m harness.runner TC001 TC015 -- -x
+    python -m harness.runner --changed-since origin/main
+
+Cases whose code, harness modules, plan entry and app sources are unchanged
+since they last passed are skipped (``harness.result_cache``); pass
+``--no-cache`` to run them anyway.
+
+Before any shard starts the runner checks what the selected cases need
+(playwright, a downloaded browser, the app at ``BASE_URL``) and fails the
+cases it cannot serve at once. Timeout and transient failures are retried
+with exponential backoff; assertion and environment failures are not (see
+``harness.diagnosis``).
+
+Every shard is an independent pytest process with its own browser (see
+``harness.browser_pool``) and its own block of localhost ports. Instead of
+one global ``tmp/execution.lock`` the runner claims a per-shard lock slot,
+so concurrent runs get disjoint slots; it still refuses to start while a
+live TestSprite execution holds the global lock.
+
+``--browsers`` / ``--devices`` run the browser cases over an engine x device
+matrix (``harness.matrix``). Each combination is scheduled as its own unit,
+so the matrix spreads across all shards in one run. ``--throttle`` does the
+same for network/CPU throttle profiles (``harness.throttle``).
+
+``--serve dev`` / ``--serve start`` starts the app itself on a free port
+(``harness.app_server``), requests every route in the test plan to warm it
+up, points the shards at it and stops it when the run ends. The server is
+only started when a case that needs the app is left after the cache
+lookup, and those results are keyed on the serve mode rather than the
+port.
+
+``--profile`` times every Playwright call per test (``harness.profiler``);
+each shard prints its summary and the folded stacks land in
+``tmp/results/profile``.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from harness.app_server import MODES, AppServer, plan_routes, print_warm_up
+from harness.config import (
+    BASE_URL, BASE_URL_ENV, EXECUTION_LOCK_PATH, LOCKS_DIR, PROFILE_ENV, RESULTS_LOG_PATH, RESULTS_PATH, SUITE_DIR,
+)
+from harness.diagnosis import (
+    APP, ENVIRONMENT, ERROR, RETRYABLE, case_requirements, failed_requirements, preflight,
+)
+from harness.impact import changed_files, select_affected
+from harness.locks import LockHeld, lock_is_live, read_lock, release, try_acquire, utc_timestamp
+from harness.matrix import BROWSERS_ENV, DEVICES_ENV, parse_matrix, targets_from_env
+from harness.plan import case_id, discover_cases
+from harness.ports import PORTS_ENV, format_budget, port_budget
+from harness.profiler import PYTHON_MODE
+from harness.result_cache import ResultCache
+from harness.results import (
+    append_attempt, compact, latest_runs, read_attempts, read_results, store_code, title_case_id,
+)
+from harness.results_plugin import ATTEMPT_ENV, RESULTS_LOG_ENV, RUN_ID_ENV, WORKER_ENV
+from harness.throttle import THROTTLE_ENV, parse_profile, profiles_from_env
+
+MAX_SLOTS = 64
+
+
+def select_cases(selectors: Sequence[str], cases: List[Path]) -> List[Path]:
+    """Filter discovered cases by TC id (``TC003``) or file name."""
+    if not selectors:
+        return cases
+    wanted = set(selectors) | {s.upper() for s in selectors}
+    return [c for c in cases if case_id(c) in wanted or c.name in wanted]
+
+
+def previous_durations() -> Dict[str, float]:
+    """Wall-clock seconds per TC from the last recorded run, when known."""
+    durations = {}
+    for entry in read_results(RESULTS_PATH):
+        duration = entry.get("duration")
+        if duration is not None:
+            durations[title_case_id(entry["title"])] = float(duration)
+    return durations
+
+
+def shard(cases: Sequence[str], workers: int, durations: Optional[Dict[str, float]] = None) -> List[List[str]]:
+    """Longest-first greedy packing so shards finish at about the same time.
+
+    ``cases`` are file names or, in matrix mode, node ids; each is weighted
+    by its TC's last duration.
+    """
+    durations = durations or {}
+    default = max(durations.values(), default=1.0)
+    shards: List[List[str]] = [[] for _ in range(max(1, min(workers, len(cases))))]
+    loads = [0.0] * len(shards)
+    for case in sorted(cases, key=lambda c: durations.get(case_id(c), default), reverse=True):
+        target = loads.index(min(loads))
+        shards[target].append(case)
+        loads[target] += durations.get(case_id(case), default)
+    return [sorted(s) for s in shards if s]
+
+
+def claim_slots(count: int, stack: ExitStack) -> List[int]:
+    """Take the lowest ``count`` free shard lock slots for the duration of ``stack``."""
+    slots = []
+    for slot in range(MAX_SLOTS):
+        if len(slots) == count:
+            break
+        path = LOCKS_DIR / f"shard-{slot}.lock"
+        if try_acquire(path, "run_shard"):
+            stack.callback(release, path)
+            slots.append(slot)
+    if len(slots) < count:
+        raise LockHeld(f"Only {len(slots)} of {count} shard slots are free under {LOCKS_DIR}")
+    return slots
+
+
+def shard_env(slot: int, run_id: str, attempt: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env[WORKER_ENV] = str(slot)
+    env[PORTS_ENV] = format_budget(port_budget(slot))
+    env[RESULTS_LOG_ENV] = str(RESULTS_LOG_PATH)
+    env[RUN_ID_ENV] = run_id
+    env[ATTEMPT_ENV] = str(attempt)
+    return env
+
+
+def launch_shard(slot: int, cases: List[str], pytest_args: Sequence[str], run_id: str, attempt: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "pytest",
+        "-p", "harness.results_plugin",
+        "-p", "no:cacheprovider",
+        "--continue-on-collection-errors",
+        "-q",
+        *pytest_args,
+        *cases,
+    ]
+    return subprocess.Popen(command, cwd=SUITE_DIR, env=shard_env(slot, run_id, attempt))
+
+
+def unit_label(unit: str) -> str:
+    """``TC001_...py::test_x[webkit-iPhone_13]`` -> ``TC001[webkit-iPhone_13]``."""
+    _, bracket, params = unit.partition("[")
+    return case_id(unit) + (bracket + params if bracket else "")
+
+
+def collect_units(cases: List[Path]) -> List[str]:
+    """Node ids of ``cases`` as parametrized by the matrix and throttle profiles, so they spread across shards."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", *(c.name for c in cases)],
+        cwd=SUITE_DIR, capture_output=True, text=True,
+    )
+    units = [line.strip() for line in result.stdout.splitlines() if "::" in line]
+    collected = {case_id(u) for u in units}
+    # a file that fails to import yields no node ids; run it whole so the error is recorded
+    return units + [c.name for c in cases if case_id(c) not in collected]
+
+
+def run_shards(units: List[str], slots: List[int], pytest_args: Sequence[str], run_id: str, attempt: int) -> List[int]:
+    shards = shard(units, len(slots), previous_durations())
+    procs = []
+    for slot, shard_cases in zip(slots, shards):
+        print(f"[shard {slot}] ports {format_budget(port_budget(slot))}: "
+              f"{', '.join(unit_label(c) for c in shard_cases)}" + (f" (retry {attempt})" if attempt else ""))
+        procs.append(launch_shard(slot, shard_cases, pytest_args, run_id, attempt))
+    return [proc.wait() for proc in procs]
+
+
+def run_preflight(cases: List[Path], run_id: str, base_url: str = BASE_URL) -> List[Path]:
+    """Check the environment once; record cases it cannot serve as failed and return the rest."""
+    requirements = {case: case_requirements(case) for case in cases}
+    checks = preflight(set().union(*requirements.values()), base_url)
+    for check in checks.values():
+        print(f"preflight {check}")
+    runnable = []
+    for case, needs in requirements.items():
+        missing = failed_requirements(needs, checks)
+        if not missing:
+            runnable.append(case)
+            continue
+        now = utc_timestamp()
+        append_attempt({
+            "run": run_id, "attempt": 0, "worker": "", "nodeid": case.name, "file": case.name,
+            "codeHash": store_code(case), "outcome": "failed", "duration": 0.0,
+            "error": "".join(f"Preflight check failed: {c.name}: {c.detail}\n" for c in missing),
+            "started": now, "finished": now, "failureClass": ENVIRONMENT,
+        })
+    return runnable
+
+
+def start_app_server(mode: str, stack: ExitStack) -> Optional[str]:
+    """Start and warm ``next <mode>`` for the rest of ``stack``; its URL, or ``None`` if it failed to start."""
+    server = AppServer(mode)
+    print(f"starting next {mode} on port {server.port} (log: {server.log_path})")
+    try:
+        stack.enter_context(server)
+    except (OSError, RuntimeError, subprocess.SubprocessError) as exc:
+        print(f"next {mode} failed to start: {exc}", file=sys.stderr)
+        return None
+    print_warm_up(server.warm(plan_routes()))
+    return server.base_url
+
+
+def retryable_units(records: List[dict]) -> List[str]:
+    """Node ids whose last attempt failed with a timeout or transient failure."""
+    return sorted(
+        r["nodeid"]
+        for attempts in latest_runs(records).values()
+        for r in attempts
+        if r["outcome"] == "failed" and r.get("failureClass") in RETRYABLE
+    )
+
+
+def run(
+    cases: List[Path],
+    workers: int,
+    pytest_args: Sequence[str] = (),
+    use_cache: bool = True,
+    retries: int = 2,
+    backoff: float = 2.0,
+    check_environment: bool = True,
+    serve: Optional[str] = None,
+) -> int:
+    cache = ResultCache()
+    # a -k/-m subset passing says nothing about the whole case, so extra pytest args bypass the cache
+    cacheable = not pytest_args
+    keys: Dict[str, str] = {}
+    started = time.monotonic()
+    run_id = f"{utc_timestamp()}-{os.getpid()}"
+    codes: List[int] = []
+    with ExitStack() as stack:
+        base_url = os.environ.get(BASE_URL_ENV, BASE_URL)
+        # a served app gets a new port every run, so its results are keyed on the mode, not the URL
+        target = f"--serve {serve}" if serve else base_url
+        if cacheable:
+            keys = {case_id(c): cache.key(c, target) for c in cases}
+        if use_cache and cacheable:
+            hits = cache.lookup(keys)
+            if hits:
+                print(f"cached: {', '.join(sorted(hits))} (unchanged since they passed; --no-cache to rerun)")
+                cases = [c for c in cases if case_id(c) not in hits]
+            if not cases:
+                return 0
+        if serve and any(APP in case_requirements(c) for c in cases):
+            served = start_app_server(serve, stack)
+            if served:
+                base_url = os.environ[BASE_URL_ENV] = served
+            elif cacheable:  # fell back to the configured app, so key on that
+                keys = {case_id(c): cache.key(c, base_url) for c in cases}
+        runnable = run_preflight(cases, run_id, base_url) if check_environment else cases
+        if runnable:
+            parametrized = targets_from_env() or profiles_from_env()
+            units = collect_units(runnable) if parametrized else [c.name for c in runnable]
+            slots = claim_slots(len(shard(units, workers)), stack)
+            codes = run_shards(units, slots, pytest_args, run_id, 0)
+            for attempt in range(1, retries + 1):
+                flaky = retryable_units(list(read_attempts(RESULTS_LOG_PATH, run=run_id)))
+                if not flaky:
+                    break
+                delay = backoff * 2 ** (attempt - 1)
+                print(f"retrying {', '.join(unit_label(u) for u in flaky)} in {delay:g}s (timeout/transient failures)")
+                time.sleep(delay)
+                run_shards(flaky, slots, pytest_args, run_id, attempt)
+    compact()
+    records = [r for attempts in latest_runs(read_attempts(RESULTS_LOG_PATH, run=run_id)).values() for r in attempts]
+    if cacheable:
+        cache.store(keys, records)
+    failed = {}
+    for record in records:
+        if record["outcome"] == "failed":
+            failed.setdefault(case_id(record["file"]), record.get("failureClass", ERROR))
+    print(f"{len(cases)} cases in {time.monotonic() - started:.1f}s; failed: "
+          f"{', '.join(f'{tc} ({cls})' for tc, cls in sorted(failed.items())) or 'none'}")
+    if failed:
+        return 1
+    # pytest exit code 5 means "no tests collected" which is not a failure here
+    return max((c for c in codes if c != 5), default=0)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness.runner", description=__doc__.split("\n\n")[0])
+    parser.add_argument("cases", nargs="*", help="TC ids or file names (default: all)")
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--ignore-execution-lock", action="store_true",
+                        help="start even if tmp/execution.lock is held by a live process")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="only run cases affected by changes since the merge base with REF (see harness.impact)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="run every selected case even if an unchanged passing result is cached")
+    parser.add_argument("--retries", type=int, default=2, help="rounds of retries for timeout/transient failures")
+    parser.add_argument("--retry-backoff", type=float, default=2.0,
+                        help="seconds before the first retry round, doubled for each further round")
+    parser.add_argument("--browsers", metavar="ENGINES",
+                        help="comma-separated engines (chromium,firefox,webkit) to run every browser case on")
+    parser.add_argument("--devices", metavar="NAMES",
+                        help='comma-separated playwright device descriptors, e.g. "iPhone 13,Pixel 7"')
+    parser.add_argument("--throttle", metavar="PROFILES",
+                        help="comma-separated throttle profiles for page cases, e.g. fast-3g,4g+cpu-4x (Chromium only)")
+    parser.add_argument("--serve", choices=MODES,
+                        help="start the app with next dev/start on a free port and warm the plan's routes first")
+    parser.add_argument("--profile", nargs="?", const="steps", choices=("steps", PYTHON_MODE),
+                        help="time each Playwright call per test; 'python' adds a cProfile of each test")
+    parser.add_argument("--skip-preflight", action="store_true", help="launch every case without checking the environment")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    pytest_args: List[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, pytest_args = argv[:split], argv[split + 1:]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not args.ignore_execution_lock and lock_is_live(EXECUTION_LOCK_PATH):
+        print(f"TestSprite execution in progress: {read_lock(EXECUTION_LOCK_PATH)}", file=sys.stderr)
+        return 2
+
+    if args.browsers or args.devices:
+        try:
+            parse_matrix(args.browsers, args.devices)
+        except ValueError as exc:
+            parser.error(str(exc))
+        os.environ[BROWSERS_ENV] = args.browsers or ""
+        os.environ[DEVICES_ENV] = args.devices or ""
+
+    if args.throttle:
+        try:
+            for spec in args.throttle.split(","):
+                parse_profile(spec.strip())
+        except ValueError as exc:
+            parser.error(str(exc))
+        os.environ[THROTTLE_ENV] = args.throttle
+
+    if args.profile:
+        os.environ[PROFILE_ENV] = args.profile
+
+    cases = select_cases(args.cases, discover_cases())
+    if args.changed_since:
+        selection = select_affected(changed_files(args.changed_since))
+        print(f"changed since {args.changed_since}: {selection.describe()}")
+        cases = [c for c in cases if case_id(c) in selection.cases]
+        if not cases:
+            return 0
+    if not cases:
+        print("No matching TC cases", file=sys.stderr)
+        return 5
+    return run(
+        cases, args.workers, pytest_args,
+        use_cache=not (args.no_cache or args.profile),  # a cached case would leave no profile
+        retries=args.retries,
+        backoff=args.retry_backoff,
+        check_environment=not args.skip_preflight,
+        serve=args.serve,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""Latency summaries and plain-text tables for the load and benchmark tools."""
+import math
+from dataclasses import asdict, dataclass
+from typing import Iterable, List, Mapping, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0..100) of an already sorted sequence."""
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class LatencySummary:
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def summarize(values: Iterable[float]) -> LatencySummary:
+    ordered = sorted(values)
+    if not ordered:
+        return LatencySummary(0, math.nan, math.nan, math.nan, math.nan, math.nan)
+    return LatencySummary(
+        count=len(ordered),
+        mean=sum(ordered) / len(ordered),
+        p50=percentile(ordered, 50),
+        p95=percentile(ordered, 95),
+        p99=percentile(ordered, 99),
+        max=ordered[-1],
+    )
+
+
+def json_ready(value):
+    """``value`` with the NaN of an empty summary replaced by ``None``, for ``json.dumps(allow_nan=False)``."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, Mapping):
+        return {k: json_ready(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_ready(v) for v in value]
+    return value
+
+
+def _cell(value) -> str:
+    if isinstance(value, float):
+        return "-" if math.isnan(value) else f"{value:.1f}"
+    return str(value)
+
+
+def format_table(rows: List[Mapping[str, object]], columns: Sequence[str]) -> str:
+    """Left-aligned first column, right-aligned numbers, like ``pytest --durations``."""
+    cells = [[_cell(row.get(col, "")) for col in columns] for row in rows]
+    widths = [max([len(col)] + [len(r[i]) for r in cells]) for i, col in enumerate(columns)]
+
+    def line(values: Sequence[str]) -> str:
+        first, *rest = values
+        return "  ".join([first.ljust(widths[0])] + [v.rjust(w) for v, w in zip(rest, widths[1:])])
+
+    return "\n".join([line(columns), line(["-" * w for w in widths])] + [line(r) for r in cells])
@@ -0,0 +1,525 @@
+"""In-memory stand-in for the app's backend routes.
+
+Mirrors the request/response shapes of ``app/api/admin/*`` (products,
+orders, stats, login) and Supabase's password login, backed by dicts
+seeded from ``harness.fixtures``. The storefront routes it also serves
+(``/api/health``, ``/api/cart``, ``/api/checkout``) and its own
+``sb-access-token`` cookie have no counterpart in the app: they are the
+stand-in's contract, and the cases that check them carry the
+``stub_contract`` marker (``-m "not stub_contract"`` leaves them out). Admin auth follows ``middleware.ts``: API calls without
+a session get 401, non-admin sessions get 403. The session comes from the
+stand-in's own ``sb-access-token`` cookie, a bearer token, or the
+``sb-<ref>-auth-token`` cookie that ``@supabase/ssr`` writes. With
+``rate_limits=True`` the admin login and orders routes also apply
+``src/lib/rateLimiter.ts``'s limits (see ``harness.rate_limiter``) and
+answer 429 as the app does.
+
+Transport lives in ``harness.stub_server``; this module is plain Python so
+it can also be driven directly.
+"""
+import copy
+import json
+import math
+import re
+import secrets
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.cookies import SimpleCookie
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+from harness.auth_state import stored_session
+from harness.fixtures import ADMIN_CREDENTIALS, CATALOG, CUSTOMER_CREDENTIALS, ORDERS
+from harness.locks import utc_timestamp
+from harness.mock_api import compile_path
+from harness.rate_limiter import API_LIMIT, LOGIN_LIMIT, MemoryRateLimiter
+
+SESSION_COOKIE = "sb-access-token"
+
+# Same table as app/api/admin/orders/[id]/route.ts
+VALID_TRANSITIONS = {
+    "pending": ["processing", "cancelled"],
+    "processing": ["shipped", "cancelled"],
+    "shipped": ["delivered", "cancelled"],
+    "delivered": [],
+    "cancelled": [],
+}
+
+SHIPPING_FIELDS = ("fullName", "addressLine1", "city", "postalCode", "country", "phoneNumber")
+
+
+@dataclass
+class StubRequest:
+    method: str
+    path: str
+    query: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    params: Dict[str, str] = field(default_factory=dict)
+    # the undecoded query string, for handlers that need repeated keys
+    raw_query: str = ""
+
+    def json(self) -> Any:
+        return json.loads(self.body or b"{}")
+
+    def json_object(self) -> Dict[str, Any]:
+        """The body as a JSON object; ``ValueError`` (a 400) for any other JSON value."""
+        body = self.json()
+        if not isinstance(body, dict):
+            raise ValueError(f"expected a JSON object, got {type(body).__name__}")
+        return body
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        jar = SimpleCookie()
+        jar.load(self.headers.get("cookie", ""))
+        return {name: morsel.value for name, morsel in jar.items()}
+
+    @property
+    def client_ip(self) -> str:
+        return self.headers.get("x-forwarded-for", "unknown").split(",")[0].strip()
+
+
+@dataclass
+class StubResponse:
+    status: int
+    payload: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class Router:
+    def __init__(self):
+        self._routes: List[Tuple[str, Pattern[str], Callable[[StubRequest], StubResponse]]] = []
+
+    def add(self, method: str, template: str, handler: Callable[[StubRequest], StubResponse]):
+        self._routes.append((method.upper(), re.compile(compile_path(template, capture=True)), handler))
+
+    def dispatch(self, request: StubRequest) -> StubResponse:
+        path_matched = False
+        for method, pattern, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            path_matched = True
+            if method == request.method:
+                request.params = match.groupdict()
+                return handler(request)
+        if path_matched:
+            return StubResponse(405, {"error": "Method not allowed"})
+        return StubResponse(404, {"error": "Not found"})
+
+
+def _int(value: Optional[str], default: int) -> int:
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        return default
+
+
+def paginate(rows: List[dict], page: int, page_size: int) -> dict:
+    start = (page - 1) * page_size
+    return {"rows": rows[start:start + page_size], "total": len(rows), "page": page, "pageSize": page_size}
+
+
+class StubBackend:
+    def __init__(self, rate_limits: bool = False):
+        self.rate_limits = rate_limits
+        self.lock = threading.Lock()
+        self.router = Router()
+        self._register_routes()
+        self.reset()
+
+    def reset(self):
+        """Back to the seeded fixture state."""
+        with self.lock:
+            self.products: Dict[str, dict] = {p["id"]: copy.deepcopy(p) for p in CATALOG}
+            self.orders: Dict[str, dict] = {o["id"]: copy.deepcopy(o) for o in ORDERS}
+            self.carts: Dict[str, Dict[str, dict]] = {}
+            self.users = {
+                ADMIN_CREDENTIALS["email"]: {"id": "admin-1", "password": ADMIN_CREDENTIALS["password"], "role": "admin"},
+                CUSTOMER_CREDENTIALS["email"]: {"id": "user-123", "password": CUSTOMER_CREDENTIALS["password"], "role": None},
+            }
+            self.sessions: Dict[str, dict] = {}
+            self._next_order = 1
+            self.login_limiter = MemoryRateLimiter(LOGIN_LIMIT)
+            self.api_limiter = MemoryRateLimiter(API_LIMIT)
+
+    def load_tables(self, products: Optional[List[dict]] = None, orders: Optional[List[dict]] = None):
+        """Replace the products and/or orders tables, e.g. with synthetic rows for load runs."""
+        with self.lock:
+            if products is not None:
+                self.products = {p["id"]: p for p in products}
+            if orders is not None:
+                self.orders = {o["id"]: o for o in orders}
+
+    def handle(self, request: StubRequest) -> StubResponse:
+        with self.lock:
+            return self.router.dispatch(request)
+
+    # -- auth -------------------------------------------------------------
+
+    def _user_payload(self, email: str) -> dict:
+        user = self.users[email]
+        return {"id": user["id"], "email": email, "app_metadata": {"role": user["role"]}}
+
+    def _open_session(self, email: str) -> dict:
+        token = secrets.token_hex(16)
+        self.sessions[token] = self._user_payload(email)
+        return {"access_token": token, "token_type": "bearer", "expires_in": 3600,
+                "refresh_token": secrets.token_hex(16), "user": self.sessions[token]}
+
+    def _session_user(self, request: StubRequest) -> Optional[dict]:
+        cookies = request.cookies
+        token = cookies.get(SESSION_COOKIE)
+        if token is None:
+            # the sb-<ref>-auth-token cookie(s) @supabase/ssr writes, as middleware.ts reads them
+            session = stored_session({"cookies": [{"name": k, "value": v} for k, v in cookies.items()]})
+            token = session.get("access_token") if session else None
+        auth = request.headers.get("authorization", "")
+        if auth.lower().startswith("bearer "):
+            token = auth[7:].strip()
+        return self.sessions.get(token) if token else None
+
+    def _require_admin(self, request: StubRequest) -> Optional[StubResponse]:
+        user = self._session_user(request)
+        if user is None:
+            return StubResponse(401, {"error": "Unauthorized"})
+        if user["app_metadata"]["role"] != "admin":
+            return StubResponse(403, {"error": "Forbidden"})
+        return None
+
+    def _check_credentials(self, body: dict) -> Optional[str]:
+        email, password = body.get("email"), body.get("password")
+        user = self.users.get(email or "")
+        if user is None or user["password"] != password:
+            return None
+        return email
+
+    def admin_login(self, request: StubRequest) -> StubResponse:
+        body = request.json_object()
+        if not body.get("email") or not body.get("password"):
+            return StubResponse(400, {"error": "Email and password are required"})
+        identifier = f"{request.client_ip}:{body['email'].lower()}"
+        if self.rate_limits:
+            check = self.login_limiter.check(identifier)
+            if not check.allowed:
+                return StubResponse(429, {"error": "Too many login attempts", "rateLimited": True,
+                                          "resetIn": check.reset_in})
+        email = self._check_credentials(body)
+        if email is None:
+            return StubResponse(401, {"error": "Invalid credentials"})
+        if self.users[email]["role"] != "admin":
+            return StubResponse(403, {"error": "Admin access required"})
+        self.login_limiter.reset(identifier)
+        session = self._open_session(email)
+        user = session["user"]
+        return StubResponse(
+            200,
+            {"success": True, "user": {"id": user["id"], "email": email, "role": "admin"}, "session": session},
+            {"Set-Cookie": f"{SESSION_COOKIE}={session['access_token']}; Path=/; HttpOnly"},
+        )
+
+    def password_grant(self, request: StubRequest) -> StubResponse:
+        """Supabase GoTrue ``POST /auth/v1/token?grant_type=password``."""
+        if request.query.get("grant_type") != "password":
+            return StubResponse(400, {"error": "unsupported_grant_type"})
+        email = self._check_credentials(request.json_object())
+        if email is None:
+            return StubResponse(400, {"error": "invalid_grant", "error_description": "Invalid login credentials"})
+        session = self._open_session(email)
+        return StubResponse(200, session, {"Set-Cookie": f"{SESSION_COOKIE}={session['access_token']}; Path=/; HttpOnly"})
+
+    def admin_page(self, request: StubRequest) -> StubResponse:
+        """``/admin/*`` pages: middleware redirects instead of answering 401/403."""
+        user = self._session_user(request)
+        if user is None:
+            return StubResponse(307, {}, {"Location": "/admin/login"})
+        if user["app_metadata"]["role"] != "admin":
+            return StubResponse(307, {}, {"Location": "/"})
+        return StubResponse(200, {"page": request.path})
+
+    # -- admin products -----------------------------------------------------
+
+    def list_products(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        q = request.query
+        page = max(1, _int(q.get("page"), 1))
+        page_size = min(100, max(1, _int(q.get("pageSize"), 50)))
+        rows = list(self.products.values())
+        search = q.get("q", "").strip().lower()
+        if search:
+            rows = [r for r in rows if search in (r["name"] or "").lower() or search in (r.get("name_ar") or "").lower()]
+        if q.get("category"):
+            rows = [r for r in rows if r["category"] == q["category"]]
+        if q.get("stock") == "low":
+            rows = [r for r in rows if (r.get("stockQuantity") or 0) < 5]
+        if q.get("missing") in ("true", "1"):
+            rows = [r for r in rows if not r.get("images") or not r.get("description")]
+        sort = q.get("sort", "created_at")
+        sort = sort if sort in ("created_at", "name", "price", "stockQuantity", "stock", "category") else "created_at"
+        rows.sort(key=lambda r: (r.get(sort) is None, r.get(sort)), reverse=q.get("dir") != "asc")
+        return StubResponse(200, paginate(rows, page, page_size))
+
+    def create_product(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        body = request.json_object()
+        name = body.get("name")
+        if not isinstance(name, str) or not name.strip():
+            return StubResponse(400, {"error": "Name is required"})
+        try:
+            price = float(body.get("price"))
+        except (TypeError, ValueError):
+            price = -1
+        if price < 0:
+            return StubResponse(400, {"error": "Valid price is required"})
+        stock = _int(str(body.get("stock", 0)), 0)
+        product = {
+            "id": f"prod-{secrets.token_hex(4)}",
+            "name": name.strip(),
+            "name_ar": body.get("name_ar"),
+            "price": price,
+            "description": (body.get("description") or "").strip(),
+            "images": body.get("images") if isinstance(body.get("images"), list) else [],
+            "category": body.get("category") or "uncategorized",
+            "stock": stock,
+            "stockQuantity": stock,
+            "stockStatus": "in-stock" if stock > 0 else "out-of-stock",
+            "sales_count": 0,
+            "created_at": utc_timestamp(),
+        }
+        self.products[product["id"]] = product
+        return StubResponse(201, {"product": product})
+
+    def get_product(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        product = self.products.get(request.params["id"])
+        if product is None:
+            return StubResponse(404, {"error": "Product not found"})
+        return StubResponse(200, product)
+
+    def update_product(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        product = self.products.get(request.params["id"])
+        if product is None:
+            return StubResponse(404, {"error": "Product not found"})
+        updates = {k: v for k, v in request.json_object().items() if k in product and k != "id"}
+        if not updates:
+            return StubResponse(200, {"message": "No changes to apply", "product": product})
+        product.update(updates)
+        return StubResponse(200, {"product": product})
+
+    def delete_product(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        if self.products.pop(request.params["id"], None) is None:
+            return StubResponse(404, {"error": "Product not found"})
+        return StubResponse(200, {"message": "Product deleted successfully"})
+
+    # -- admin orders -------------------------------------------------------
+
+    def list_orders(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        if self.rate_limits:
+            check = self.api_limiter.check(f"admin_api:{request.client_ip}")
+            if not check.allowed:
+                return StubResponse(429, {"error": "Too many requests. Please try again later."},
+                                    {"Retry-After": str(math.ceil(check.reset_in / 1000))})
+        q = request.query
+        page = max(1, _int(q.get("page"), 1))
+        page_size = _int(q.get("pageSize"), 25)
+        page_size = 25 if page_size < 1 else min(page_size, 100)
+        rows = list(self.orders.values())
+        for key in ("status", "payment_status", "payment_method"):
+            if q.get(key) and q[key] != "all":
+                rows = [r for r in rows if r.get(key) == q[key]]
+        if q.get("from"):
+            rows = [r for r in rows if r["created_at"] >= q["from"]]
+        if q.get("to"):
+            rows = [r for r in rows if r["created_at"] <= q["to"]]
+        search = q.get("q", "").strip().lower()
+        if search:
+            fields = ("customer_name", "phone", "email", "id")
+            rows = [r for r in rows if any(search in str(r.get(f, "")).lower() for f in fields)]
+        sort = "total_amount" if q.get("sort") == "total_amount" else "created_at"
+        rows.sort(key=lambda r: r[sort], reverse=q.get("dir") != "asc")
+        return StubResponse(200, paginate(rows, page, page_size))
+
+    def get_order(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        order = self.orders.get(request.params["id"])
+        if order is None:
+            return StubResponse(404, {"error": "Order not found"})
+        return StubResponse(200, order)
+
+    def update_order(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        order = self.orders.get(request.params["id"])
+        if order is None:
+            return StubResponse(404, {"error": "Order not found"})
+        body = request.json_object()
+        new_status, notes = body.get("status"), body.get("notes")
+        updates = {}
+        if new_status and new_status != order["status"]:
+            allowed = VALID_TRANSITIONS.get(order["status"], [])
+            if new_status not in allowed:
+                return StubResponse(400, {
+                    "error": f"Invalid status transition: {order['status']} → {new_status}",
+                    "allowed": allowed,
+                })
+            updates["status"] = new_status
+        if "notes" in body:
+            updates["notes"] = notes
+        if not updates:
+            return StubResponse(200, {"message": "No changes to apply", "order": order})
+        order.update(updates)
+        return StubResponse(200, {"message": "Order updated successfully", "order": order})
+
+    def stats(self, request: StubRequest) -> StubResponse:
+        denied = self._require_admin(request)
+        if denied:
+            return denied
+        now = datetime.now(timezone.utc)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        days = [(today - timedelta(days=i)).date().isoformat() for i in range(6, -1, -1)]
+        daily = {day: {"date": day, "count": 0, "revenue": 0.0} for day in days}
+        orders = list(self.orders.values())
+        todays = [o for o in orders if o["created_at"] >= today.isoformat().replace("+00:00", "Z")]
+        for order in orders:
+            bucket = daily.get(order["created_at"][:10])
+            if bucket:
+                bucket["count"] += 1
+                bucket["revenue"] += float(order["total_amount"] or 0)
+        products = list(self.products.values())
+        return StubResponse(200, {
+            "orders_today_count": len(todays),
+            "revenue_today": sum(float(o["total_amount"] or 0) for o in todays),
+            "pending_count": sum(1 for o in orders if o["status"] == "pending"),
+            "shipped_count": sum(1 for o in orders if o["status"] == "shipped"),
+            "low_stock_count": sum(1 for p in products if (p.get("stockQuantity") or 0) < 5),
+            "needs_review_count": sum(1 for p in products if p.get("images") is None),
+            "pending_reviews_count": 0,
+            "total_products": len(products),
+            "orders_last_7_days": list(daily.values()),
+        })
+
+    # -- storefront ---------------------------------------------------------
+
+    def checkout(self, request: StubRequest) -> StubResponse:
+        body = request.json_object()
+        cart = body.get("cart") or []
+        shipping = body.get("shipping") or {}
+        missing = [f for f in SHIPPING_FIELDS if not str(shipping.get(f, "")).strip()]
+        if missing:
+            return StubResponse(400, {"error": "Invalid shipping details", "fields": missing})
+        if not cart:
+            return StubResponse(400, {"error": "Cart is empty"})
+        items, total = [], 0.0
+        for line in cart:
+            product = self.products.get(line.get("productId"))
+            quantity = _int(str(line.get("quantity", 0)), 0)
+            if product is None or quantity < 1:
+                return StubResponse(400, {"error": f"Invalid cart item: {line.get('productId')}"})
+            if product["stockQuantity"] < quantity:
+                return StubResponse(409, {"error": f"Insufficient stock for {product['id']}"})
+            items.append({"productId": product["id"], "quantity": quantity, "price": product["price"]})
+            total += product["price"] * quantity
+        for item in items:
+            product = self.products[item["productId"]]
+            product["stockQuantity"] -= item["quantity"]
+            product["stock"] = product["stockQuantity"]
+            product["sales_count"] = (product.get("sales_count") or 0) + item["quantity"]
+        order_id = f"{10000 + self._next_order}"
+        self._next_order += 1
+        self.orders[order_id] = {
+            "id": order_id,
+            "created_at": utc_timestamp(),
+            "customer_name": shipping["fullName"],
+            "email": shipping.get("email", ""),
+            "phone": shipping["phoneNumber"],
+            "status": "pending",
+            "payment_status": "unpaid",
+            "payment_method": "card" if body.get("payment") else "cod",
+            "items": items,
+            "total_amount": round(total, 2),
+        }
+        return StubResponse(200, {"orderId": order_id, "status": "success", "message": "Order placed successfully"})
+
+    def _cart(self, request: StubRequest) -> Dict[str, dict]:
+        user = self._session_user(request)
+        return self.carts.setdefault(user["id"] if user else request.client_ip, {})
+
+    def get_cart(self, request: StubRequest) -> StubResponse:
+        return StubResponse(200, {"items": list(self._cart(request).values())})
+
+    def add_cart_item(self, request: StubRequest) -> StubResponse:
+        body = request.json_object()
+        product = self.products.get(body.get("productId"))
+        quantity = _int(str(body.get("quantity", 1)), 1)
+        if product is None or quantity < 1:
+            return StubResponse(400, {"error": "Invalid cart item"})
+        cart = self._cart(request)
+        for item in cart.values():
+            if item["productId"] == product["id"]:
+                item["quantity"] += quantity
+                return StubResponse(200, item)
+        item = {"id": f"item-{secrets.token_hex(4)}", "productId": product["id"], "name": product["name"],
+                "quantity": quantity, "price": product["price"]}
+        cart[item["id"]] = item
+        return StubResponse(200, item)
+
+    def update_cart_item(self, request: StubRequest) -> StubResponse:
+        item = self._cart(request).get(request.params["id"])
+        quantity = _int(str(request.json_object().get("quantity")), 0)
+        if item is None:
+            return StubResponse(404, {"error": "Cart item not found"})
+        if quantity < 1:
+            return StubResponse(400, {"error": "Quantity must be at least 1"})
+        item["quantity"] = quantity
+        return StubResponse(200, item)
+
+    def remove_cart_item(self, request: StubRequest) -> StubResponse:
+        if self._cart(request).pop(request.params["id"], None) is None:
+            return StubResponse(404, {"error": "Cart item not found"})
+        return StubResponse(200, {"success": True})
+
+    def health(self, request: StubRequest) -> StubResponse:
+        return StubResponse(200, {"status": "ok"})
+
+    def _register_routes(self):
+        add = self.router.add
+        add("GET", "/api/health", self.health)
+        # middleware.ts also guards /api/admin/login; the stand-in lets it through
+        add("POST", "/api/admin/login", self.admin_login)
+        add("POST", "/auth/v1/token", self.password_grant)
+        add("GET", "/api/admin/products", self.list_products)
+        add("POST", "/api/admin/products", self.create_product)
+        add("GET", "/api/admin/products/{id}", self.get_product)
+        add("PATCH", "/api/admin/products/{id}", self.update_product)
+        add("DELETE", "/api/admin/products/{id}", self.delete_product)
+        add("GET", "/api/admin/orders", self.list_orders)
+        add("GET", "/api/admin/orders/{id}", self.get_order)
+        add("PATCH", "/api/admin/orders/{id}", self.update_order)
+        add("GET", "/api/admin/stats", self.stats)
+        # stand-in only: the app has no checkout or cart API routes
+        add("POST", "/api/checkout", self.checkout)
+        add("GET", "/api/cart", self.get_cart)
+        add("POST", "/api/cart/items", self.add_cart_item)
+        add("PUT", "/api/cart/items/{id}", self.update_cart_item)
+        add("DELETE", "/api/cart/items/{id}", self.remove_cart_item)
+        add("GET", "/admin/login", lambda request: StubResponse(200, {"page": "/admin/login"}))
+        add("GET", "/admin/{page}", self.admin_page)
@@ -0,0 +1,161 @@
+"""Minimal asyncio HTTP/1.1 server fronting :class:`StubBackend`.
+
+Started once per session on a port from the worker's budget. It speaks
+keep-alive so a pooled ``requests.Session`` reuses its connections, and
+runs on its own loop thread so sync tests can call it directly.
+
+Any object with a ``handle(StubRequest)`` method can be served. The method
+may be a coroutine function, for backends that simulate latency without
+blocking the loop. A ``bytes`` payload is sent as-is (HTML by default);
+anything else is sent as JSON.
+"""
+import asyncio
+import inspect
+import json
+import threading
+import time
+from http import HTTPStatus
+from typing import Optional, Set
+from urllib.parse import parse_qsl, urlsplit
+
+from harness.ports import free_port
+from harness.stub_backend import StubBackend, StubRequest, StubResponse
+
+MAX_BODY = 10 * 1024 * 1024
+
+
+class StubServer:
+    def __init__(self, backend: Optional[StubBackend] = None, host: str = "127.0.0.1", port: Optional[int] = None):
+        self.backend = backend or StubBackend()
+        self.host = host
+        self.port = port
+        self.requests_served = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 5.0) -> "StubServer":
+        if self.port is None:
+            self.port = free_port(host=self.host)
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def serve():
+            asyncio.set_event_loop(self._loop)
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port)
+            )
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="stub-server", daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout):
+            raise RuntimeError(f"Stub server did not start on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            # idle keep-alive connections would otherwise outlive the loop
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[StubRequest]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return StubRequest(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body, raw_query=url.query)
+
+    def _encode(self, response: StubResponse, keep_alive: bool) -> bytes:
+        if isinstance(response.payload, bytes):
+            body, content_type = response.payload, "text/html; charset=utf-8"
+        else:
+            body = b"" if response.payload is None else json.dumps(response.payload).encode("utf-8")
+            content_type = "application/json"
+        reason = HTTPStatus(response.status).phrase
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **response.headers,
+        }
+        head = f"HTTP/1.1 {response.status} {reason}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        return head.encode("latin-1") + b"\r\n" + body
+
+    async def _dispatch(self, request: StubRequest) -> StubResponse:
+        """The backend's response, with a handler's exception turned into a 400 or 500."""
+        try:
+            response = self.backend.handle(request)
+            if inspect.isawaitable(response):
+                response = await response
+            return response
+        except asyncio.CancelledError:
+            raise
+        except ValueError as exc:  # json.JSONDecodeError or a non-object body from request.json_object()
+            return StubResponse(400, {"error": f"{type(exc).__name__}: {exc}"})
+        except Exception as exc:
+            return StubResponse(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as exc:
+                    writer.write(self._encode(StubResponse(400, {"error": str(exc)}), keep_alive=False))
+                    break
+                if request is None:
+                    break
+                started = time.perf_counter()
+                response = await self._dispatch(request)
+                response.headers.setdefault("Server-Timing", f"app;dur={(time.perf_counter() - started) * 1000:.3f}")
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                writer.write(self._encode(response, keep_alive))
+                await writer.drain()
+                self.requests_served += 1
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # cancelled by stop(); returning normally keeps asyncio from logging it
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
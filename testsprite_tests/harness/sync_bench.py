@@ -0,0 +1,416 @@
+"""Baseline benchmark for the product sync path.
+
+``syncService.syncBulk`` works through product ids one at a time, with a
+fixed 2s ``setTimeout`` before each. ``/api/sync/bulk`` caps a call at 50
+ids, and ``/api/cron/sync`` syncs every stale product in one request. This
+measures items/second, per-item latency, failure rate and database round
+trips per item at several catalog sizes. Everything runs against two local
+stand-ins, both served by :class:`~harness.stub_server.StubServer`:
+
+* a fake storefront in Jumia's markup (``FakeScraperSite``) with
+  configurable latency and error rate;
+* a PostgREST stand-in (``harness.postgrest_stub``) holding ``products``,
+  ``product_sync_config`` and ``sync_logs``.
+
+``--mode model`` replays syncService's requests from Python: the same
+PostgREST calls, the scraper's retry and backoff, and the same delay.
+Nothing else needs to run::
+
+    python -m harness.sync_bench --sizes 100,1000,10000 --max-seconds 60
+
+``--mode app`` drives the real routes on ``next dev``. Start the app with
+``NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:<db-port>`` and any
+``SUPABASE_SERVICE_ROLE_KEY`` of 10+ characters. Source URLs use the host
+``jumia.localhost`` so the app picks its Jumia scraper. Map that host to
+127.0.0.1 if your resolver does not::
+
+    python -m harness.sync_bench --mode app --db-port 54391 --scraper-port 54392 --scenario bulk
+
+At the real delay a full run takes hours, so each (scenario, size) stops
+at ``--max-seconds`` and reports the projected full duration. Progress is
+read from ``sync_logs`` as the stand-in receives it. Each size uses its
+own id range, so a capped cron request still running in the app cannot
+pollute the next size's numbers.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from harness.aio_http import AsyncHttpPool, HttpResponse
+from harness.config import BASE_URL, BENCH_DIR
+from harness.locks import utc_timestamp
+from harness.postgrest_stub import OBJECT_MEDIA_TYPE, PostgrestStub
+from harness.stats import format_table, summarize
+from harness.stub_backend import StubRequest, StubResponse
+from harness.stub_server import StubServer
+
+SYNC_DELAY = 2.0          # syncBulk's setTimeout before every product
+BULK_LIMIT = 50           # /api/sync/bulk rejects larger batches
+SCRAPER_RETRIES = 3       # BaseScraper.fetchWithRetry defaults
+SCRAPER_HOST = "jumia.localhost"
+
+RELATIONS = {("products", "product_sync_config"): ("id", "product_id")}
+
+PRODUCT_PAGE = """<!doctype html><html><head>
+<meta property="og:image" content="https://cdn.example.test/products/{id}.jpg">
+</head><body>
+<h1 class="-fs20 -pts -pbxs">Synthetic product {id}</h1>
+<span class="-b -ubpt -tal -fs24 -prxs" itemprop="price" content="{price}">EGP {price}</span>
+{stock}
+</body></html>"""
+
+_PRICE = re.compile(r'itemprop="price"[^>]*content="(\d[\d,.]+)"')
+_IMAGE = re.compile(r'og:image"[^>]*content="([^"]+)"')
+
+
+class FakeScraperSite:
+    """Serves ``/dp/<id>`` product pages after a simulated network delay."""
+
+    def __init__(self, latency_ms: float = 150.0, jitter_ms: float = 50.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.hits = 0
+        self.errors = 0
+
+    async def handle(self, request: StubRequest) -> StubResponse:
+        self.hits += 1
+        delay = max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        match = re.fullmatch(r"/dp/(\d+)", request.path)
+        if match is None:
+            return StubResponse(404, b"<html>not found</html>")
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return StubResponse(503, b"<html>try again later</html>")
+        product_id = int(match.group(1))
+        # deterministic per product so repeated syncs are idempotent
+        price = 100 + (product_id * 37) % 4900
+        stock = "<p>Out of stock</p>" if product_id % 11 == 0 else ""
+        return StubResponse(200, PRODUCT_PAGE.format(id=product_id, price=price, stock=stock).encode())
+
+
+def sync_tables(ids: Sequence[int], scraper_origin: str) -> Dict[str, List[dict]]:
+    """products / product_sync_config / sync_logs rows for a catalog of ``ids``, all stale."""
+    products, configs = [], []
+    for product_id in ids:
+        products.append({
+            "id": product_id,
+            "name": f"Synthetic product {product_id}",
+            "price": 0,
+            "price_margin": 20,
+            "stockQuantity": 0,
+            "stockStatus": "out-of-stock",
+            "images": [],
+            "source_price": None,
+            "source_stock": None,
+        })
+        configs.append({
+            "product_id": product_id,
+            "source_url": f"{scraper_origin}/dp/{product_id}",
+            "source_platform": "jumia",
+            "sync_enabled": True,
+            "auto_update_price": True,
+            "auto_update_stock": True,
+            "last_synced_at": None,
+        })
+    return {"products": products, "product_sync_config": configs, "sync_logs": []}
+
+
+class ModelSync:
+    """syncService.syncProduct/syncBulk/syncStaleProducts, request for request."""
+
+    def __init__(self, db: AsyncHttpPool, site: AsyncHttpPool, delay: float = SYNC_DELAY, concurrency: int = 1):
+        self.db = db
+        self.site = site
+        self.delay = delay
+        self.concurrency = concurrency
+
+    async def _scrape(self, url: str) -> str:
+        path = url.split("/", 3)[3]
+        error: Optional[str] = None
+        for attempt in range(SCRAPER_RETRIES):
+            response = await self.site.get("/" + path)
+            if response.status == 200:
+                return response.body.decode()
+            error = f"HTTP {response.status}"
+            # fetchWithRetry backs off after every failure, the last one included
+            await asyncio.sleep(2 ** attempt)
+        raise RuntimeError(error)
+
+    async def _log(self, product_id: int, status: str, error: Optional[str] = None):
+        await self.db.post("/rest/v1/sync_logs", json={
+            "product_id": product_id, "sync_type": "full", "status": status, "error_message": error,
+        })
+
+    async def sync_product(self, product_id: int) -> bool:
+        try:
+            response = await self.db.get(
+                "/rest/v1/products",
+                params={"select": "*,product_sync_config(*)", "id": f"eq.{product_id}"},
+                headers={"Accept": OBJECT_MEDIA_TYPE},
+            )
+            if response.status != 200:
+                raise RuntimeError("Product not found")
+            product = response.json()
+            config = product["product_sync_config"][0]
+            html = await self._scrape(config["source_url"])
+            price_match, image_match = _PRICE.search(html), _IMAGE.search(html)
+            in_stock = "out of stock" not in html.lower()
+            updates = {"source_stock": 99 if in_stock else 0, "stockQuantity": 99 if in_stock else 0,
+                       "stockStatus": "in-stock" if in_stock else "out-of-stock"}
+            if price_match:
+                source_price = float(price_match.group(1))
+                updates["source_price"] = source_price
+                updates["price"] = round(source_price * (1 + product["price_margin"] / 100))
+            if image_match:
+                updates["images"] = [image_match.group(1)]
+            await self._expect(self.db.request(
+                "PATCH", "/rest/v1/product_sync_config",
+                params={"product_id": f"eq.{product_id}"}, json={"last_synced_at": utc_timestamp()},
+            ))
+            await self._expect(self.db.request(
+                "PATCH", "/rest/v1/products", params={"id": f"eq.{product_id}"}, json=updates,
+            ))
+            await self._log(product_id, "success")
+            return True
+        except Exception as exc:
+            await self._log(product_id, "failed", str(exc))
+            return False
+
+    @staticmethod
+    async def _expect(call) -> HttpResponse:
+        response = await call
+        if response.status >= 400:
+            raise RuntimeError(f"HTTP {response.status}")
+        return response
+
+    async def sync_bulk(self, product_ids: Sequence[int]) -> List[bool]:
+        queue = list(product_ids)
+        results: List[bool] = []
+
+        async def worker():
+            while queue:
+                product_id = queue.pop(0)
+                await asyncio.sleep(self.delay)
+                results.append(await self.sync_product(product_id))
+
+        await asyncio.gather(*(worker() for _ in range(max(1, self.concurrency))))
+        return results
+
+    async def stale_ids(self) -> List[int]:
+        day_ago = datetime.now(timezone.utc) - timedelta(days=1)
+        response = await self.db.get("/rest/v1/products", params={
+            "select": "id,product_sync_config!inner(last_synced_at,sync_enabled)",
+            "product_sync_config.sync_enabled": "eq.true",
+            "product_sync_config.or": f"(last_synced_at.is.null,last_synced_at.lt.{_iso(day_ago)})",
+        })
+        return [row["id"] for row in response.json()]
+
+
+@dataclass
+class SyncRun:
+    scenario: str
+    size: int
+    items: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    truncated: bool = False
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    db_calls_per_item: float = 0.0
+    scraper_hits_per_item: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failed / self.items if self.items else 0.0
+
+    @property
+    def projected_seconds(self) -> float:
+        return self.size / self.items_per_second if self.items_per_second else float("inf")
+
+    def row(self) -> dict:
+        return {
+            "scenario": self.scenario,
+            "size": self.size,
+            "items": self.items,
+            "items/s": self.items_per_second,
+            "fail%": self.failure_rate * 100,
+            "p50": self.latency_ms.get("p50", float("nan")),
+            "p95": self.latency_ms.get("p95", float("nan")),
+            "p99": self.latency_ms.get("p99", float("nan")),
+            "db/item": self.db_calls_per_item,
+            "projected": _duration(self.projected_seconds),
+        }
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "items_per_second": self.items_per_second,
+                "failure_rate": self.failure_rate, "projected_seconds": self.projected_seconds}
+
+
+def _duration(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "-"
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}h{rest // 60:02d}m" if hours else f"{rest // 60}m{rest % 60:02d}s"
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _parse_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class SyncBench:
+    def __init__(self, db_port: Optional[int], scraper_port: Optional[int], site: FakeScraperSite):
+        self.db = PostgrestStub(relations=RELATIONS)
+        self.site = site
+        self.db_server = StubServer(self.db, port=db_port)
+        self.site_server = StubServer(site, port=scraper_port)
+
+    def __enter__(self) -> "SyncBench":
+        self.db_server.start()
+        self.site_server.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.site_server.stop()
+        self.db_server.stop()
+
+    def seed(self, ids: Sequence[int]):
+        origin = f"http://{SCRAPER_HOST}:{self.site_server.port}"
+        for table, rows in sync_tables(ids, origin).items():
+            self.db.load(table, rows)
+
+    def _logs(self, ids: range) -> List[dict]:
+        return [log for log in self.db.rows("sync_logs") if log.get("product_id") in ids]
+
+    async def measure(self, scenario: str, ids: range, work, max_seconds: float) -> SyncRun:
+        """Run ``work`` until it finishes or ``max_seconds`` pass, then read results from sync_logs."""
+        calls_before, hits_before = sum(self.db.calls.values()), self.site.hits
+        started_wall = time.time()
+        started = time.monotonic()
+        task = asyncio.ensure_future(work)
+        done, _ = await asyncio.wait({task}, timeout=max_seconds)
+        run = SyncRun(scenario, len(ids), truncated=not done, elapsed=time.monotonic() - started)
+        if done:
+            task.result()
+        else:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        logs = sorted(self._logs(ids), key=lambda log: log["created_at"])
+        run.items = len(logs)
+        run.failed = sum(1 for log in logs if log["status"] != "success")
+        finished = [_parse_timestamp(log["created_at"]) for log in logs]
+        run.latency_ms = summarize(
+            (end - start) * 1000 for start, end in zip([started_wall] + finished, finished)
+        ).to_dict()
+        if run.items:
+            run.db_calls_per_item = (sum(self.db.calls.values()) - calls_before) / run.items
+            run.scraper_hits_per_item = (self.site.hits - hits_before) / run.items
+        return run
+
+
+async def run_model(bench: SyncBench, scenario: str, ids: range, args) -> SyncRun:
+    async with AsyncHttpPool(bench.db_server.base_url) as db, AsyncHttpPool(bench.site_server.base_url) as site:
+        model = ModelSync(db, site, delay=args.delay, concurrency=args.model_concurrency)
+
+        async def work():
+            if scenario == "cron":
+                await model.sync_bulk(await model.stale_ids())
+            else:
+                for start in range(0, len(ids), BULK_LIMIT):
+                    await model.sync_bulk(ids[start:start + BULK_LIMIT])
+
+        return await bench.measure(scenario, ids, work(), args.max_seconds)
+
+
+async def run_app(bench: SyncBench, scenario: str, ids: range, args) -> SyncRun:
+    headers = {"Authorization": f"Bearer {args.cron_secret}"} if args.cron_secret else {}
+    # a 50-id batch takes >100s at the real delay; never let the client give up first
+    async with AsyncHttpPool(args.app_url, timeout=BULK_LIMIT * (SYNC_DELAY + 30)) as app:
+        async def work():
+            if scenario == "cron":
+                response = await app.get("/api/cron/sync", headers=headers)
+                if response.status != 200:
+                    raise RuntimeError(f"/api/cron/sync answered {response.status}: {response.body[:200]!r}")
+                return
+            for start in range(0, len(ids), BULK_LIMIT):
+                response = await app.post("/api/sync/bulk", json={"productIds": list(ids[start:start + BULK_LIMIT])})
+                if response.status != 200:
+                    raise RuntimeError(f"/api/sync/bulk answered {response.status}: {response.body[:200]!r}")
+
+        return await bench.measure(scenario, ids, work(), args.max_seconds)
+
+
+TABLE_COLUMNS = ("scenario", "size", "items", "items/s", "fail%", "p50", "p95", "p99", "db/item", "projected")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness.sync_bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=("model", "app"), default="model")
+    parser.add_argument("--scenario", default="bulk,cron", help="comma-separated: bulk, cron")
+    parser.add_argument("--sizes", default="100,1000,10000", help="comma-separated catalog sizes")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="cap per scenario and size")
+    parser.add_argument("--delay", type=float, default=SYNC_DELAY, help="model: per-item delay (the app's is 2s)")
+    parser.add_argument("--model-concurrency", type=int, default=1, help="model: parallel sync workers (what-if)")
+    parser.add_argument("--scraper-latency-ms", type=float, default=150.0)
+    parser.add_argument("--scraper-error-rate", type=float, default=0.0, help="fraction of scraper responses that are 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app-url", default=BASE_URL)
+    parser.add_argument("--cron-secret", help="app: CRON_SECRET the dev server was started with")
+    parser.add_argument("--db-port", type=int, help="PostgREST stand-in port (fixed, for NEXT_PUBLIC_SUPABASE_URL)")
+    parser.add_argument("--scraper-port", type=int)
+    parser.add_argument("--out", type=Path, help="JSON report path (default: tmp/bench/sync-<time>.json)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    scenarios = [s for s in args.scenario.split(",") if s]
+    site = FakeScraperSite(args.scraper_latency_ms, args.scraper_latency_ms / 3, args.scraper_error_rate, args.seed)
+    runner = run_app if args.mode == "app" else run_model
+
+    runs: List[SyncRun] = []
+    with SyncBench(args.db_port, args.scraper_port, site) as bench:
+        if args.mode == "app":
+            print(f"expecting {args.app_url} started with NEXT_PUBLIC_SUPABASE_URL={bench.db_server.base_url}; "
+                  f"{SCRAPER_HOST} must resolve to 127.0.0.1")
+        block = 0
+        for scenario in scenarios:
+            for size in sizes:
+                block += 1
+                # a disjoint id range per run; see the module docstring
+                ids = range(block * 1_000_000, block * 1_000_000 + size)
+                bench.seed(ids)
+                run = asyncio.run(runner(bench, scenario, ids, args))
+                runs.append(run)
+                print(f"[{scenario} {size}] {run.items} items in {run.elapsed:.1f}s"
+                      f"{' (capped)' if run.truncated else ''}")
+
+    print(format_table([r.row() for r in runs], TABLE_COLUMNS))
+    out = args.out or BENCH_DIR / f"sync-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"mode": args.mode, "delay": args.delay, "runs": [r.to_dict() for r in runs]}, indent=2),
+                   encoding="utf-8")
+    print(f"report: {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from harness.dom import RECORD_SCRIPT, Field, _wire, diff_records
+
+
+def test_diff_records_reports_count_and_field_mismatches():
+    actual = [{"name": "A", "price": "1"}, {"name": "B", "price": "3"}]
+    expected = [{"name": "A", "price": "1"}, {"name": "B", "price": "2"}, {"name": "C", "price": "4"}]
+    assert diff_records(actual, expected, ["name", "price"], label="card") == [
+        "expected 3 cards, found 2",
+        "card 2 price: expected '2', got '3'",
+    ]
+
+
+def test_diff_records_compares_only_the_given_keys():
+    assert diff_records([{"name": "A", "extra": 1}], [{"name": "A"}], ["name"]) == []
+
+
+def test_wire_fills_field_defaults():
+    assert _wire({"title": Field("h1"), "imgs": Field("img", "@src", True)}) == [
+        ["title", "h1", "text", False],
+        ["imgs", "img", "@src", True],
+    ]
+
+
+# A minimal DOM, enough for RECORD_SCRIPT: the document has no innerText or
+# attributes of its own, so ``:scope`` on it must read <body>.
+FAKE_DOM = """
+const el = (text, attrs = {}, children = {}) => ({
+  innerText: text,
+  getAttribute: name => (name in attrs ? attrs[name] : null),
+  querySelector: sel => children[sel] || null,
+  querySelectorAll: sel => (children[sel] ? [children[sel]] : []),
+});
+const main = el(' Main ', {'data-id': 'm1'});
+global.document = {
+  body: el(' Body text ', {'data-page': 'home'}, {main}),
+  querySelector(sel) { return sel === 'main' ? main : this.body.querySelector(sel); },
+};
+const [root, fields] = JSON.parse(process.argv[1]);
+console.log(JSON.stringify((%s)([root, fields])));
+"""
+
+
+def run_record_script(root, fields):
+    if shutil.which("node") is None:
+        pytest.skip("node is not installed")
+    out = subprocess.run(
+        ["node", "-e", FAKE_DOM % RECORD_SCRIPT, json.dumps([root, _wire(fields)])],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def test_scope_on_the_document_reads_the_body():
+    fields = {"text": Field(":scope"), "page": Field(":scope", "@data-page"), "main": Field("main")}
+    assert run_record_script(None, fields) == {"text": "Body text", "page": "home", "main": "Main"}
+
+
+def test_scope_on_a_root_reads_the_root_and_missing_roots_are_none():
+    assert run_record_script("main", {"id": Field(":scope", "@data-id")}) == {"id": "m1"}
+    assert run_record_script("aside", {"id": Field(":scope", "@data-id")}) is None
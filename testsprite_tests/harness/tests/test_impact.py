@@ -0,0 +1,49 @@
+from harness.config import SUITE_DIR
+from harness.impact import select_affected
+
+PLAN = {
+    "TC001": {"features": ["Home Page"]},
+    "TC002": {"features": ["Shop Page"]},
+    "TC014": {},
+}
+FEATURES = {
+    "Home Page": ["src/components/home/"],
+    "Shop Page": ["app/[locale]/shop/", "src/views/ShopPage.tsx"],
+}
+
+
+def select(*changed):
+    return select_affected(changed, plan=PLAN, features=FEATURES, suite_dir=SUITE_DIR)
+
+
+def test_feature_files_select_their_cases_and_unmapped_ones():
+    selection = select("src/views/ShopPage.tsx")
+    assert selection.cases == {"TC002", "TC014"}
+    assert selection.features == {"Shop Page"}
+    assert not selection.full
+
+
+def test_directory_prefixes_own_files_below_them_only():
+    assert select("src/components/home/Hero.tsx").cases == {"TC001", "TC014"}
+    assert select("src/components/homepage.tsx").full
+
+
+def test_changed_case_selects_itself_and_cases_without_features():
+    assert select("testsprite_tests/TC002_Shop_Page_Product_Listing_Display.py").cases == {"TC002", "TC014"}
+
+
+def test_unowned_file_forces_a_full_run():
+    selection = select("src/views/ShopPage.tsx", "package.json")
+    assert selection.full
+    assert selection.cases == set(PLAN)
+    assert selection.unmapped == ["package.json"]
+
+
+def test_documentation_selects_nothing():
+    selection = select("README.md", "testsprite_tests/tmp/test_results.json")
+    assert not selection.cases and not selection.full
+    assert selection.describe() == "no affected cases"
+
+
+def test_harness_unit_tests_select_nothing():
+    assert not select("testsprite_tests/harness/tests/test_locks.py").full
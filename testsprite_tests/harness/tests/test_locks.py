@@ -0,0 +1,38 @@
+import json
+import os
+
+import pytest
+
+from harness.locks import LockHeld, file_lock, lock_is_live, read_lock, try_acquire
+
+
+def test_lock_is_exclusive_and_released(tmp_path):
+    path = tmp_path / "locks" / "x.lock"
+    with file_lock(path, "first"):
+        assert read_lock(path)["functionName"] == "first"
+        assert read_lock(path)["pid"] == os.getpid()
+        with pytest.raises(LockHeld):
+            with file_lock(path, "second", wait=0.1):
+                pass
+    assert not path.exists()
+
+
+def test_lock_of_a_dead_process_is_reclaimed(tmp_path):
+    path = tmp_path / "x.lock"
+    path.write_text(json.dumps({"pid": 2 ** 22 + 1, "startTime": "2026-01-01T00:00:00.000Z", "functionName": "gone"}))
+    assert not lock_is_live(path)
+    assert try_acquire(path, "mine")
+    assert read_lock(path)["functionName"] == "mine"
+
+
+def test_lock_older_than_stale_after_is_reclaimed(tmp_path):
+    path = tmp_path / "x.lock"
+    path.write_text(json.dumps({"pid": os.getpid(), "startTime": "2000-01-01T00:00:00.000Z", "functionName": "old"}))
+    assert not lock_is_live(path)
+
+
+def test_unreadable_lock_counts_as_held(tmp_path):
+    path = tmp_path / "x.lock"
+    path.write_text("{")
+    assert lock_is_live(path)
+    assert not try_acquire(path, "mine")
@@ -0,0 +1,34 @@
+from harness.mock_api import MockApi, compile_path
+
+
+def test_compile_path_captures_one_segment_per_param():
+    import re
+
+    pattern = re.compile(compile_path("/api/orders/{id}/items/{item}", capture=True))
+    assert pattern.fullmatch("/api/orders/o1/items/i2").groupdict() == {"id": "o1", "item": "i2"}
+    assert pattern.fullmatch("/api/orders/o1/x/items/i2") is None
+
+
+def test_match_ignores_query_and_falls_back():
+    api = MockApi().register("GET", "/api/products", {"rows": []})
+    assert api.match("get", "http://localhost/api/products?page=2").json() == {"rows": []}
+    assert api.match("POST", "http://localhost/api/products") is None
+    fallback = api.resolve("GET", "http://localhost/api/unknown")
+    assert (fallback.status, fallback.json()) == (200, {})
+
+
+def test_later_registration_wins_and_recompiles():
+    api = MockApi().register("GET", "/api/products/{id}", {"id": "any"})
+    assert api.match("GET", "/api/products/p1").json() == {"id": "any"}
+    api.register("GET", "/api/products/p1", {"id": "p1"}, status=201)
+    assert api.match("GET", "/api/products/p1").status == 201
+    assert api.match("GET", "/api/products/p2").json() == {"id": "any"}
+
+
+def test_alternation_picks_the_matching_route_among_many():
+    api = MockApi()
+    for i in range(50):
+        api.register("GET", f"/api/r{i}/{{id}}", {"route": i})
+    assert api.match("GET", "/api/r7/abc").json() == {"route": 7}
+    assert api.match("GET", "/api/r49/abc").json() == {"route": 49}
+    assert api.match("GET", "/api/r50/abc") is None
@@ -0,0 +1,36 @@
+from harness.plan_engine import UNSUPPORTED, CaseResult, Step, _unsupported, build_tree, runnable
+
+
+def steps(*descriptions):
+    return {"steps": [{"type": "action", "description": d} for d in descriptions]}
+
+
+PLAN = {
+    "TC009": steps("Navigate to the Login Page", "Enter valid registered email and password", "Fly to the moon"),
+    "TC010": steps("Navigate to the Login Page", "Enter incorrect email or password", "Submit the login form"),
+    "TC099": steps("Navigate to the Login Page"),
+}
+
+
+def test_build_tree_shares_common_prefixes():
+    root = build_tree(PLAN)
+    assert list(root.children) == [Step("action", "Navigate to the Login Page")]
+    login = root.children[Step("action", "Navigate to the Login Page")]
+    assert login.cases == ["TC099"]
+    assert len(login.children) == 2
+    assert sorted(root.all_cases()) == ["TC009", "TC010", "TC099"]
+    assert [depth for depth, _ in root.walk()] == [0, 1, 2, 1, 2]
+
+
+def test_subtree_whose_cases_cannot_finish_is_not_runnable():
+    login = build_tree(PLAN).children[Step("action", "Navigate to the Login Page")]
+    valid, invalid = login.children.values()
+    assert not runnable(valid)
+    assert runnable(invalid)
+    assert runnable(login)
+
+
+def test_unsupported_cases_stop_at_their_first_unmatched_step():
+    results = {}
+    _unsupported(build_tree(PLAN), results)
+    assert results == {"TC009": CaseResult("TC009", UNSUPPORTED, Step("action", "Fly to the moon"))}
@@ -0,0 +1,77 @@
+import itertools
+
+import pytest
+
+from harness import result_cache
+from harness.result_cache import ResultCache, app_hash, harness_imports
+
+
+@pytest.fixture
+def suite(tmp_path):
+    """A suite dir with one case importing harness.a, which imports harness.b."""
+    (tmp_path / "harness").mkdir()
+    (tmp_path / "harness" / "a.py").write_text("from harness import b\n")
+    (tmp_path / "harness" / "b.py").write_text("X = 1\n")
+    (tmp_path / "harness" / "unused.py").write_text("")
+    (tmp_path / "conftest.py").write_text("")
+    case = tmp_path / "TC001_Case.py"
+    case.write_text("def test():\n    from harness.a import b\n")
+    return case
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "app_hash", lambda: "app")
+    monkeypatch.setattr(result_cache, "load_plan", lambda: {"TC001": {"title": "Case"}})
+    monkeypatch.setattr(result_cache, "LOCKS_DIR", tmp_path / "locks")
+    ticks = itertools.count()
+    monkeypatch.setattr(result_cache, "utc_timestamp", lambda: f"t{next(ticks):06d}")
+    for name in ("TESTSPRITE_THROTTLE", "TESTSPRITE_BROWSERS", "TESTSPRITE_DEVICES", "TESTSPRITE_HEADED"):
+        monkeypatch.delenv(name, raising=False)
+    return ResultCache(tmp_path / "cache.json", max_entries=2)
+
+
+def test_harness_imports_are_transitive_and_include_function_local_imports(suite):
+    assert harness_imports(suite, suite.parent) == {suite.parent / "harness" / "a.py", suite.parent / "harness" / "b.py"}
+
+
+def test_key_changes_with_imported_module_but_not_unused_one(suite, cache):
+    key = cache.key(suite, "http://app")
+    (suite.parent / "harness" / "unused.py").write_text("Y = 2\n")
+    assert cache.key(suite, "http://app") == key
+    (suite.parent / "harness" / "b.py").write_text("X = 2\n")
+    assert cache.key(suite, "http://app") != key
+
+
+def test_key_changes_with_target_and_settings(suite, cache, monkeypatch):
+    key = cache.key(suite, "http://app")
+    assert cache.key(suite, "--serve start") != key
+    monkeypatch.setenv("TESTSPRITE_THROTTLE", "4g")
+    assert cache.key(suite, "http://app") != key
+    monkeypatch.delenv("TESTSPRITE_THROTTLE")
+    monkeypatch.setattr(result_cache, "AXE_ENABLED", True)
+    assert cache.key(suite, "http://app") != key
+
+
+def test_app_hash_covers_env_files_by_glob(tmp_path):
+    (tmp_path / ".env").write_text("A=1\n")
+    before = app_hash(tmp_path, (".env", ".env.*"))
+    (tmp_path / ".env.local").write_text("B=2\n")
+    assert app_hash(tmp_path, (".env", ".env.*")) != before
+
+
+def record(tc, outcome="passed"):
+    return {"file": f"{tc}_Case.py", "outcome": outcome, "duration": 1.0}
+
+
+def test_only_fully_passing_cases_are_stored(cache):
+    cache.store({"TC001": "k1", "TC002": "k2"}, [record("TC001"), record("TC002"), record("TC002", "failed")])
+    assert set(cache.lookup({"TC001": "k1", "TC002": "k2"})) == {"TC001"}
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.store({"TC001": "k1"}, [record("TC001")])
+    cache.store({"TC002": "k2"}, [record("TC002")])
+    cache.lookup({"TC001": "k1"})  # k2 is now the least recently used
+    cache.store({"TC003": "k3"}, [record("TC003")])
+    assert set(cache.lookup({"TC001": "k1", "TC002": "k2", "TC003": "k3"})) == {"TC001", "TC003"}
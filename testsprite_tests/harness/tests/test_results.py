@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from harness import results
+from harness.results import append_attempt, append_jsonl, compact, latest_runs, prune_log, read_attempts
+
+
+@pytest.fixture(autouse=True)
+def locks(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, "LOCKS_DIR", tmp_path / "locks")
+
+
+def attempt(run, nodeid, outcome="passed", started="2026-01-01T00:00:00.000Z"):
+    return {
+        "run": run, "nodeid": nodeid, "file": nodeid.split("::")[0], "codeHash": run,
+        "outcome": outcome, "duration": 1.0, "error": "boom" if outcome == "failed" else "", "started": started,
+    }
+
+
+def test_append_jsonl_writes_one_line_per_record(tmp_path):
+    path = tmp_path / "nested" / "log.jsonl"
+    append_jsonl(path, {"a": 1})
+    append_jsonl(path, {"b": 2})
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"a": 1}, {"b": 2}]
+
+
+def test_read_attempts_skips_a_torn_line_and_filters_by_run(tmp_path):
+    log = tmp_path / "attempts.jsonl"
+    append_attempt(attempt("r1", "TC001_A.py::test"), log)
+    append_attempt(attempt("r2", "TC001_A.py::test"), log)
+    with open(log, "a") as fh:
+        fh.write('{"run": "r2", "nodeid"')
+    assert [r["run"] for r in read_attempts(log)] == ["r1", "r2"]
+    assert [r["run"] for r in read_attempts(log, run="r1")] == ["r1"]
+
+
+def test_latest_runs_keeps_the_last_run_and_the_last_retry():
+    records = [
+        attempt("r1", "TC001_A.py::test", "failed"),
+        attempt("r2", "TC001_A.py::test", "failed"),
+        attempt("r2", "TC001_A.py::test"),
+        attempt("r1", "TC002_B.py::test"),
+    ]
+    latest = latest_runs(records)
+    assert [(r["run"], r["outcome"]) for r in latest["TC001"]] == [("r2", "passed")]
+    assert [r["run"] for r in latest["TC002"]] == ["r1"]
+
+
+def test_compact_folds_the_latest_run_and_keeps_other_entries(tmp_path):
+    log, out = tmp_path / "attempts.jsonl", tmp_path / "test_results.json"
+    out.write_text(json.dumps([{"title": "TC009-Login", "testStatus": "PASSED", "code": "old"}]))
+    append_attempt(attempt("r1", "TC001_A.py::test"), log)
+    append_attempt(attempt("r2", "TC001_A.py::test", "failed"), log)
+    entries = compact(log, out)
+    by_id = {e["title"].split("-")[0]: e for e in entries}
+    assert set(by_id) == {"TC001", "TC009"}
+    assert by_id["TC001"]["testStatus"] == "FAILED"
+    assert by_id["TC001"]["testError"] == "boom"
+    assert by_id["TC009"]["code"] == "old"
+
+
+def test_prune_log_keeps_recent_runs_and_each_case_latest(tmp_path):
+    log, store = tmp_path / "attempts.jsonl", tmp_path / "code"
+    store.mkdir()
+    for run in ("r1", "r2", "r3"):
+        (store / f"{run}.py").write_text("")
+    append_attempt(attempt("r1", "TC002_B.py::test"), log)
+    append_attempt(attempt("r2", "TC001_A.py::test"), log)
+    append_attempt(attempt("r3", "TC001_A.py::test"), log)
+    prune_log(log, keep_runs=1, store=store)
+    assert [r["run"] for r in read_attempts(log)] == ["r1", "r3"]  # r1 is still TC002's latest
+    assert sorted(p.stem for p in store.glob("*.py")) == ["r1", "r3"]
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from harness.fixtures import ADMIN_CREDENTIALS, CUSTOMER_CREDENTIALS
+from harness.rate_limiter import LOGIN_LIMIT
+from harness.stub_backend import SESSION_COOKIE, StubBackend, StubRequest
+
+
+@pytest.fixture
+def backend():
+    return StubBackend()
+
+
+def request(method, path, body=None, token=None, **kwargs):
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    return StubRequest(method, path, headers=headers, body=json.dumps(body).encode() if body is not None else b"",
+                       **kwargs)
+
+
+def login(backend, credentials=ADMIN_CREDENTIALS):
+    response = backend.handle(request("POST", "/api/admin/login", credentials))
+    return response.payload["session"]["access_token"] if response.status == 200 else response
+
+
+def test_admin_routes_need_an_admin_session(backend):
+    assert backend.handle(request("GET", "/api/admin/products")).status == 401
+    grant = backend.handle(request("POST", "/auth/v1/token", CUSTOMER_CREDENTIALS, query={"grant_type": "password"}))
+    assert grant.status == 200
+    assert backend.handle(request("GET", "/api/admin/products", token=grant.payload["access_token"])).status == 403
+    assert backend.handle(request("GET", "/api/admin/products", token=login(backend))).status == 200
+
+
+def test_login_sets_the_session_cookie_and_rejects_bad_passwords(backend):
+    response = backend.handle(request("POST", "/api/admin/login", ADMIN_CREDENTIALS))
+    assert response.headers["Set-Cookie"].startswith(f"{SESSION_COOKIE}=")
+    bad = backend.handle(request("POST", "/api/admin/login", dict(ADMIN_CREDENTIALS, password="nope")))
+    assert bad.status == 401
+
+
+def test_non_object_body_raises_value_error(backend):
+    with pytest.raises(ValueError, match="expected a JSON object"):
+        backend.handle(request("POST", "/api/admin/login", []))
+
+
+def test_unknown_path_and_method(backend):
+    assert backend.handle(request("GET", "/api/nope")).status == 404
+    assert backend.handle(request("PUT", "/api/admin/stats")).status == 405
+
+
+def test_order_status_follows_the_transition_table(backend):
+    token = login(backend)
+    ok = backend.handle(request("PATCH", "/api/admin/orders/order123", {"status": "processing"}, token))
+    assert ok.status == 200 and ok.payload["order"]["status"] == "processing"
+    bad = backend.handle(request("PATCH", "/api/admin/orders/order123", {"status": "pending"}, token))
+    assert bad.status == 400
+    assert bad.payload["allowed"] == ["shipped", "cancelled"]
+
+
+def test_product_crud_and_validation(backend):
+    token = login(backend)
+    assert backend.handle(request("POST", "/api/admin/products", {"name": " ", "price": 1}, token)).status == 400
+    created = backend.handle(request("POST", "/api/admin/products", {"name": "Cot", "price": 99, "stock": 2}, token))
+    product_id = created.payload["product"]["id"]
+    assert created.payload["product"]["stockStatus"] == "in-stock"
+    listed = backend.handle(request("GET", "/api/admin/products", token=token, query={"q": "cot"}))
+    assert [p["id"] for p in listed.payload["rows"]] == [product_id]
+    assert backend.handle(request("DELETE", f"/api/admin/products/{product_id}", token=token)).status == 200
+    assert backend.handle(request("GET", f"/api/admin/products/{product_id}", token=token)).status == 404
+
+
+def test_login_rate_limit_answers_429_and_resets_on_success():
+    backend = StubBackend(rate_limits=True)
+    backend.login_limiter.cleanup_probability = 0
+    wrong = dict(ADMIN_CREDENTIALS, password="nope")
+    for _ in range(LOGIN_LIMIT.limit - 1):
+        assert backend.handle(request("POST", "/api/admin/login", wrong)).status == 401
+    assert isinstance(login(backend), str)  # the 5th attempt succeeds and clears the window
+    for _ in range(LOGIN_LIMIT.limit):
+        backend.handle(request("POST", "/api/admin/login", wrong))
+    limited = backend.handle(request("POST", "/api/admin/login", ADMIN_CREDENTIALS))
+    assert limited.status == 429 and limited.payload["rateLimited"]
+
+
+def test_reset_restores_the_seeded_state(backend):
+    token = login(backend)
+    backend.handle(request("DELETE", "/api/admin/products/stroller-001", token=token))
+    backend.reset()
+    assert "stroller-001" in backend.products
+    assert backend.sessions == {}
@@ -0,0 +1,30 @@
+import pytest
+
+from harness.throttle import PROFILES, parse_profile, profiles_from_env
+
+
+def test_combined_profile_takes_network_and_cpu():
+    profile = parse_profile("fast-3g+cpu-4x")
+    assert profile.name == "fast-3g+cpu-4x"
+    assert profile.latency_ms == PROFILES["fast-3g"].latency_ms
+    assert profile.download_bps == PROFILES["fast-3g"].download_bps
+    assert profile.cpu_rate == 4
+
+
+def test_cpu_only_profile_leaves_network_alone():
+    profile = parse_profile("cpu-6x")
+    assert not profile.throttles_network
+    assert profile.cpu_rate == 6
+
+
+def test_unknown_part_is_rejected():
+    with pytest.raises(ValueError, match="Unknown throttle profile 'edge'"):
+        parse_profile("4g+edge")
+
+
+def test_profiles_from_env(monkeypatch):
+    monkeypatch.setenv("TESTSPRITE_THROTTLE", " 4g+cpu-4x, ,slow-3g")
+    assert profiles_from_env() == ["4g+cpu-4x", "slow-3g"]
+    monkeypatch.setenv("TESTSPRITE_THROTTLE", "3g")
+    with pytest.raises(ValueError):
+        profiles_from_env()
@@ -0,0 +1,110 @@
+"""Network and CPU throttling profiles, applied over the Chrome DevTools Protocol.
+
+The storefront cases run against localhost on a developer machine, where
+every page looks instant. A profile makes a page load the way it does on a
+customer's phone. Pick one per test::
+
+    @pytest.mark.throttle("4g+cpu-4x")
+    def test_...(page, page_perf): ...
+
+or for every browser case in a run. Several comma-separated profiles
+parametrize each case over ``throttle_profile``, one run per profile::
+
+    python -m harness.runner TC002 TC003 --throttle fast-3g,4g+cpu-4x
+
+Profiles combine with ``+``: a network profile and a CPU slowdown. The
+numbers match the DevTools and Lighthouse presets. Throttling needs CDP,
+so it only applies on Chromium, and other engines skip a throttled case.
+"""
+import os
+from dataclasses import dataclass, replace
+from typing import Dict, List
+
+THROTTLE_ENV = "TESTSPRITE_THROTTLE"
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    latency_ms: float = 0
+    download_bps: float = -1  # bytes per second; -1 disables the limit
+    upload_bps: float = -1
+    cpu_rate: float = 1
+
+    @property
+    def throttles_network(self) -> bool:
+        return self.latency_ms > 0 or self.download_bps >= 0 or self.upload_bps >= 0
+
+
+PROFILES: Dict[str, Profile] = {
+    p.name: p
+    for p in (
+        Profile("slow-3g", latency_ms=2000, download_bps=500 * 1000 / 8 * 0.8, upload_bps=500 * 1000 / 8 * 0.8),
+        Profile("fast-3g", latency_ms=562.5, download_bps=1.6 * 1000 * 1000 / 8 * 0.9, upload_bps=750 * 1000 / 8 * 0.9),
+        Profile("4g", latency_ms=150, download_bps=1.6384 * 1000 * 1000 / 8, upload_bps=750 * 1000 / 8),
+        Profile("cpu-4x", cpu_rate=4),
+        Profile("cpu-6x", cpu_rate=6),
+    )
+}
+
+
+def parse_profile(spec: str) -> Profile:
+    """``"fast-3g+cpu-4x"`` -> one :class:`Profile` with both network and CPU settings."""
+    combined = Profile(spec)
+    for part in spec.split("+"):
+        try:
+            profile = PROFILES[part.strip()]
+        except KeyError:
+            raise ValueError(f"Unknown throttle profile {part!r}; expected {sorted(PROFILES)} joined by '+'") from None
+        if profile.throttles_network:
+            combined = replace(
+                combined,
+                latency_ms=profile.latency_ms,
+                download_bps=profile.download_bps,
+                upload_bps=profile.upload_bps,
+            )
+        if profile.cpu_rate != 1:
+            combined = replace(combined, cpu_rate=profile.cpu_rate)
+    return combined
+
+
+def profiles_from_env() -> List[str]:
+    """Profile specs of the run (``--throttle``); raises ``ValueError`` on an unknown name."""
+    specs = [s.strip() for s in os.environ.get(THROTTLE_ENV, "").split(",") if s.strip()]
+    for spec in specs:
+        parse_profile(spec)
+    return specs
+
+
+def _commands(profile: Profile) -> List[tuple]:
+    commands = []
+    if profile.throttles_network:
+        commands += [
+            ("Network.enable", {}),
+            ("Network.emulateNetworkConditions", {
+                "offline": False,
+                "latency": profile.latency_ms,
+                "downloadThroughput": profile.download_bps,
+                "uploadThroughput": profile.upload_bps,
+            }),
+        ]
+    if profile.cpu_rate != 1:
+        commands.append(("Emulation.setCPUThrottlingRate", {"rate": profile.cpu_rate}))
+    return commands
+
+
+def supports_throttling(page) -> bool:
+    return page.context.browser.browser_type.name == "chromium"
+
+
+def apply_throttle(page, profile: Profile):
+    """Throttle ``page`` for the rest of its life; call before the first ``goto``.
+
+    Returns the CDP session, which must stay referenced while the page is used.
+    """
+    if not supports_throttling(page):
+        raise RuntimeError(f"Throttle profile {profile.name!r} needs Chromium (CDP)")
+    session = page.context.new_cdp_session(page)
+    for method, params in _commands(profile):
+        session.send(method, params)
+    return session